@@ -79,6 +79,8 @@ def generate_prompt_matches():
     - Cómo se vio el equipo en el campo
     - Aspectos positivos y áreas de mejora
     - Un resumen ejecutivo del partido y sus implicaciones para el club
+    - Si historical_context está disponible, cómo se comparó cada equipo con el promedio de sus últimos partidos
+    - Si league_context está disponible, dónde se sitúa cada equipo en la liga (percentil y posición)
 
     Si no hay datos suficientes para algún aspecto, omítelo en lugar de inventar información.
     Escribe en lenguaje claro y accesible para un presidente de club, evitando jerga técnica excesiva.
@@ -1,20 +1,15 @@
 import pandas as pd
 import os
 from data.extraccion_datos import (
+    ANALYZED_TEAM,
     get_credentials, 
     extract_match_specific_data, 
-    extract_historical_team_stats,
-    get_general_analysis,
-    get_offensive_analysis,
-    get_defensive_analysis,
-    get_transitions_analysis,
-    get_set_pieces_analysis,
-    get_general_offensive_analysis,
-    get_general_defensive_analysis,
-    get_general_transitions_analysis,
-    get_general_set_pieces_analysis
+    get_match_analysis
 )
-from statsbombpy import sb
+from data.event_store import get_events
+from data import analysis_cache
+from data.baseline import historical_context
+from data.percentiles import league_context
 
 def generar_datos(id_partido, local, visitante):
     """
@@ -31,8 +26,8 @@ def generar_datos(id_partido, local, visitante):
         tuple: (match_data, attack_data, defense_data, set_piece_data, transition_data)
     """
     # Determinar si Audax Italiano participa en el partido
-    es_audax_local = local == "Audax Italiano"
-    es_audax_visitante = visitante == "Audax Italiano"
+    es_audax_local = local == ANALYZED_TEAM
+    es_audax_visitante = visitante == ANALYZED_TEAM
     audax_participa = es_audax_local or es_audax_visitante
     
     if audax_participa:
@@ -64,17 +59,20 @@ def generar_datos(id_partido, local, visitante):
     goles_local = datos_partido.iloc[0]["home_score"]
     goles_visitante = datos_partido.iloc[0]["away_score"]
     fecha_partido = datos_partido.iloc[0]["match_date"]
+    # Versión de los datos del partido: si StatsBomb los corrige, la caché se descarta
+    version_partido = datos_partido.iloc[0].get("last_updated")
+    version_partido = None if pd.isna(version_partido) else version_partido
 
     # -----------------------
-    # FETCH EVENTS ONCE
+    # FETCH EVENTS ONCE (local cache first)
     # -----------------------
     creds = get_credentials()
-    events = sb.events(match_id=id_partido, creds=creds)
+    events = get_events(id_partido, creds, version=version_partido)
     
     # Filter events by team for Audax analysis
     if audax_participa:
-        events_audax = events[events['team'] == 'Audax Italiano']
-        events_rival = events[events['team'] != 'Audax Italiano']
+        events_audax = events[events['team'] == ANALYZED_TEAM]
+        events_rival = events[events['team'] != ANALYZED_TEAM]
     else:
         events_local = events[events['team'] == local]
         events_visitante = events[events['team'] == visitante]
@@ -88,15 +86,27 @@ def generar_datos(id_partido, local, visitante):
         print(f"Generando análisis enfocado en Audax Italiano...")
 
         # Análisis específico de Audax
-        general_data, attack_data, defense_data, set_piece_data, transition_data = generar_analisis_audax(events)
+        general_data, attack_data, defense_data, set_piece_data, transition_data = generar_analisis_audax(events, id_partido, version_partido)
         
     else:
         # ANÁLISIS GENERAL DEL PARTIDO
         print(f"Generando análisis general del partido {local} vs {visitante}...")
 
         # Análisis general del partido
-        general_data, attack_data, defense_data, set_piece_data, transition_data = generar_analisis_general(events)
+        general_data, attack_data, defense_data, set_piece_data, transition_data = generar_analisis_general(events, id_partido, version_partido)
         
+    # Comparación con el promedio de los últimos partidos de cada equipo (solo datos almacenados)
+    try:
+        contexto_historico = historical_context([local, visitante], fecha_partido, id_partido, matches=df_matches)
+    except Exception as e:
+        print(f'No se pudo calcular el contexto histórico: {e}')
+        contexto_historico = {}
+    # Percentil y posición de cada equipo en la liga
+    try:
+        contexto_liga = league_context([local, visitante], id_partido)
+    except Exception as e:
+        print(f'No se pudo calcular el contexto de liga: {e}')
+        contexto_liga = {}
 
     # Preparar datos completos del partido para el análisis general
     match_data_complete = {
@@ -112,38 +122,49 @@ def generar_datos(id_partido, local, visitante):
             "equipo_rival": equipo_rival if audax_participa else None
         },
         "match_events": general_data,
+        "historical_context": contexto_historico,
+        "league_context": contexto_liga,
     }
 
     return match_data_complete, attack_data, defense_data, set_piece_data, transition_data, events_audax
 
-def generar_analisis_audax(events):
+def analizar_partido(events, team, id_partido=None, version=None):
+    """
+    Secciones del análisis de un partido, reutilizando el resultado guardado si ni
+    los datos del partido (``last_updated``) ni el código de análisis cambiaron.
+
+    Args:
+        events: DataFrame de eventos del partido
+        team: Equipo analizado (None para ambos equipos)
+        id_partido: ID del partido; sin él no se usa la caché
+        version: ``last_updated`` del partido
+    """
+    if id_partido is None:
+        return get_match_analysis(events, team=team)
+    return analysis_cache.cached_analysis(id_partido, lambda: get_match_analysis(events, team=team),
+                                          team=team, version=version)
+
+def generar_analisis_audax(events, id_partido=None, version=None):
     """
     Genera análisis específico enfocado en el rendimiento de Audax Italiano.
     
     Args:
-        match_id: ID del partido
+        events: DataFrame de eventos del partido
+        id_partido: ID del partido (para reutilizar el análisis guardado)
+        version: ``last_updated`` del partido
         
     Returns:
         tuple: (general_data, attack_data, defense_data, set_piece_data, transition_data)
     """
     
-    # Usar las nuevas funciones de análisis para obtener datos más precisos
+    # Las cinco secciones se calculan con una sola pasada sobre los eventos
     if not events.empty:
-        # Obtener credenciales para las funciones de análisis
-        print(events.columns)
-        general_analysis = get_general_analysis(events)
-        
-        # Análisis ofensivo mejorado
-        offensive_analysis = get_offensive_analysis(events)
-        
-        # Análisis defensivo mejorado
-        defensive_analysis = get_defensive_analysis(events)
-        
-        # Análisis de transiciones mejorado
-        transitions_analysis = get_transitions_analysis(events)
-        
-        # Análisis de pelota parada mejorado
-        set_pieces_analysis = get_set_pieces_analysis(events)
+        analysis = analizar_partido(events, ANALYZED_TEAM, id_partido, version)
+        general_analysis = analysis['general']
+        offensive_analysis = analysis['offensive']
+        defensive_analysis = analysis['defensive']
+        transitions_analysis = analysis['transitions']
+        set_pieces_analysis = analysis['set_pieces']
     else:
         # Fallback a análisis original si no hay match_id
         general_analysis = {}
@@ -156,30 +177,27 @@ def generar_analisis_audax(events):
     return general_analysis, offensive_analysis, defensive_analysis, set_pieces_analysis, transitions_analysis
 
 
-def generar_analisis_general(events):
+def generar_analisis_general(events, id_partido=None, version=None):
     """
     Genera análisis general del partido comparando ambos equipos.
     
     Args:
-        match_id: ID del partido
+        events: DataFrame de eventos del partido
+        id_partido: ID del partido (para reutilizar el análisis guardado)
+        version: ``last_updated`` del partido
         
     Returns:
         tuple: (general_data, attack_data, defense_data, set_piece_data, transition_data)
     """
     
-    # Usar las nuevas funciones de análisis para obtener datos más precisos
+    # Las cinco secciones se calculan con una sola pasada sobre los eventos (ambos equipos)
     if not events.empty:
-        # Obtener credenciales para las funciones de análisis
-        # Análisis general del partido
-        general_analysis = get_general_analysis(events)
-        # Análisis ofensivo mejorado (general)
-        offensive_analysis = get_general_offensive_analysis(events)
-        # Análisis defensivo mejorado (general)
-        defensive_analysis = get_general_defensive_analysis(events)
-        # Análisis de transiciones mejorado (general)
-        transitions_analysis = get_general_transitions_analysis(events)
-        # Análisis de pelota parada mejorado (general)
-        set_pieces_analysis = get_general_set_pieces_analysis(events)
+        analysis = analizar_partido(events, None, id_partido, version)
+        general_analysis = analysis['general']
+        offensive_analysis = analysis['offensive']
+        defensive_analysis = analysis['defensive']
+        transitions_analysis = analysis['transitions']
+        set_pieces_analysis = analysis['set_pieces']
     else:
         # Fallback a análisis original si no hay match_id
         general_analysis = {}
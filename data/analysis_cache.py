@@ -0,0 +1,112 @@
+"""
+Caché en disco de los resultados del análisis por partido.
+
+Guarda el diccionario de secciones de ``get_match_analysis`` (incluidos los
+DataFrames de rankings) en ``ANALYSIS_CACHE_DIR/<match_id>_<equipo>.pkl.gz``. Cada
+entrada lleva la versión de los datos (``last_updated`` del partido) y la versión
+del código de análisis (hash de los módulos que lo calculan); si cualquiera de las
+dos cambia, la entrada se descarta y se vuelve a calcular.
+"""
+
+import gzip
+import hashlib
+import os
+import pickle
+import threading
+
+ANALYSIS_CACHE_DIR = os.getenv("SMARTAUDAX_ANALYSIS_CACHE_DIR", "outs_data/analysis_cache")
+
+# Módulos cuyo código determina el resultado del análisis
+ANALYSIS_MODULES = [
+    'extraccion_datos.py', 'metrics.py', 'possessions.py', 'sequences.py',
+    'event_graph.py', 'zones.py', 'event_frames.py', 'minutes.py', 'dimensions.py', 'lineups.py',
+]
+
+
+def _code_version():
+    digest = hashlib.sha256()
+    base = os.path.dirname(os.path.abspath(__file__))
+    for name in ANALYSIS_MODULES:
+        with open(os.path.join(base, name), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+CODE_VERSION = _code_version()
+
+
+def _path(match_id, team):
+    team_key = 'all' if team is None else str(team).replace(' ', '_')
+    return os.path.join(ANALYSIS_CACHE_DIR, f'{int(match_id)}_{team_key}.pkl.gz')
+
+
+def load(match_id, team=None, version=None):
+    """
+    Resultado almacenado del análisis de un partido, o None si no existe o está obsoleto.
+
+    Args:
+        match_id: ID del partido
+        team: Equipo analizado (None para ambos equipos)
+        version: ``last_updated`` del partido
+    """
+    path = _path(match_id, team)
+    if not os.path.exists(path):
+        return None
+    try:
+        with gzip.open(path, 'rb') as f:
+            entry = pickle.load(f)
+    except Exception as e:
+        print(f'Análisis en caché corrupto para {match_id}, se descarta: {e}')
+        _remove(path)
+        return None
+    if entry.get('data_version') != _version_key(version) or entry.get('code_version') != CODE_VERSION:
+        _remove(path)
+        return None
+    return entry['result']
+
+
+def save(match_id, result, team=None, version=None):
+    """Guarda el resultado del análisis de un partido (escritura atómica)."""
+    path = _path(match_id, team)
+    os.makedirs(ANALYSIS_CACHE_DIR, exist_ok=True)
+    entry = {'data_version': _version_key(version), 'code_version': CODE_VERSION, 'result': result}
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with gzip.open(tmp_path, 'wb', compresslevel=6) as f:
+        pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def cached_analysis(match_id, compute, team=None, version=None):
+    """
+    Lectura a través de la caché: devuelve el análisis almacenado o llama a
+    ``compute()`` y guarda el resultado.
+    """
+    result = load(match_id, team=team, version=version)
+    if result is not None:
+        return result
+    result = compute()
+    save(match_id, result, team=team, version=version)
+    return result
+
+
+def invalidate(match_ids):
+    """Elimina los análisis almacenados de los partidos indicados (todos los equipos)."""
+    if not os.path.isdir(ANALYSIS_CACHE_DIR):
+        return
+    prefixes = tuple(f'{int(match_id)}_' for match_id in match_ids)
+    if not prefixes:
+        return
+    for name in os.listdir(ANALYSIS_CACHE_DIR):
+        if name.startswith(prefixes):
+            _remove(os.path.join(ANALYSIS_CACHE_DIR, name))
+
+
+def _version_key(version):
+    return None if version is None else str(version)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
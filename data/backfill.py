@@ -0,0 +1,200 @@
+"""
+Carga histórica reanudable de temporadas completas.
+
+Cada combinación (partido, conjunto de datos) se registra en un manifiesto JSON
+al completarse o fallar. Si el proceso se interrumpe, al volver a ejecutarlo solo
+se descarga lo que falta (o, con ``retry_failed_only``, solo lo que falló).
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+
+from data.sb_client import sb
+from data.event_store import fetch_lineups, ingest_events
+from data.fingerprints import refresh_fingerprints
+from data.extraccion_datos import (
+    COMPETITION_ID,
+    SEASON_ID,
+    EVENTS_DATASET_DIR,
+    get_credentials,
+    read_match_dataset,
+    stream_concurrently,
+    write_match_partition,
+)
+
+MANIFEST_PATH = 'outs_data/backfill_manifest.json'
+
+# Cambios registrados entre dos escrituras del manifiesto
+MANIFEST_FLUSH_EVERY = int(os.getenv("SMARTAUDAX_MANIFEST_FLUSH_EVERY", "50"))
+
+_manifest_lock = threading.Lock()
+_unsaved = {}
+
+
+# Conjuntos de datos por partido: carpeta del dataset y función de descarga
+DATASETS = {
+    'events': (EVENTS_DATASET_DIR,
+               lambda creds, match_id: ingest_events(sb.events(match_id=match_id, creds=creds))),
+    'lineups': ('outs_data/sb_lineups',
+                lambda creds, match_id: fetch_lineups(match_id, creds)),
+    'player_match_stats': ('outs_data/sb_player_match_stats',
+                           lambda creds, match_id: sb.player_match_stats(match_id=match_id, creds=creds)),
+}
+
+
+# --------------------------
+# Manifiesto
+# --------------------------
+def load_manifest(path=MANIFEST_PATH):
+    """Carga el manifiesto de la carga histórica (vacío si no existe)."""
+    if not os.path.exists(path):
+        return {'seasons': {}}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    """Guarda el manifiesto de forma atómica."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _season_key(competition_id, season_id):
+    return f'{competition_id}/{season_id}'
+
+
+def mark_item(manifest, competition_id, season_id, match_id, dataset, status, version=None, error=None,
+              path=MANIFEST_PATH, flush_every=MANIFEST_FLUSH_EVERY):
+    """
+    Registra el estado de un (partido, dataset). El manifiesto se persiste cada
+    ``flush_every`` cambios; ``flush_manifest`` guarda los que queden pendientes.
+    """
+    with _manifest_lock:
+        season = manifest['seasons'].setdefault(_season_key(competition_id, season_id), {})
+        season.setdefault(str(match_id), {})[dataset] = {
+            'status': status,
+            'version': version,
+            'error': error,
+            'updated': datetime.now().isoformat(timespec='seconds')
+        }
+        _unsaved[path] = _unsaved.get(path, 0) + 1
+        if _unsaved[path] >= flush_every:
+            save_manifest(manifest, path)
+            _unsaved[path] = 0
+
+
+def flush_manifest(manifest, path=MANIFEST_PATH):
+    """Persiste los cambios del manifiesto que aún no se han guardado."""
+    with _manifest_lock:
+        if _unsaved.get(path):
+            save_manifest(manifest, path)
+            _unsaved[path] = 0
+
+
+def pending_items(manifest, competition_id, season_id, versions, datasets, retry_failed_only=False):
+    """
+    Devuelve los (match_id, dataset) que quedan por descargar.
+
+    Args:
+        manifest: Manifiesto cargado
+        competition_id: ID de la competición
+        season_id: ID de la temporada
+        versions: dict {match_id: last_updated} de los partidos disponibles
+        datasets: Nombres de los conjuntos de datos a cargar
+        retry_failed_only: Si es True, solo se devuelven los elementos fallidos
+
+    Returns:
+        list: Tuplas (match_id, dataset)
+    """
+    season = manifest['seasons'].get(_season_key(competition_id, season_id), {})
+    items = []
+    for match_id, version in versions.items():
+        for dataset in datasets:
+            entry = season.get(str(match_id), {}).get(dataset)
+            if retry_failed_only:
+                if entry is not None and entry['status'] == 'failed':
+                    items.append((match_id, dataset))
+            elif entry is None or entry['status'] != 'done' or entry.get('version') != version:
+                # Pendiente, fallido o con datos corregidos por StatsBomb desde la última carga
+                items.append((match_id, dataset))
+    return items
+
+
+# --------------------------
+# Carga histórica
+# --------------------------
+def backfill(seasons=None, datasets=None, retry_failed_only=False, max_workers=None, manifest_path=MANIFEST_PATH):
+    """
+    Carga (o completa) los datos por partido de una o varias temporadas.
+
+    Args:
+        seasons: Lista de tuplas (competition_id, season_id). Por defecto, la temporada actual.
+        datasets: Conjuntos de datos a cargar (por defecto todos los de DATASETS)
+        retry_failed_only: Reintentar solo los elementos que fallaron previamente
+        max_workers: Número máximo de descargas simultáneas
+        manifest_path: Ruta del manifiesto
+
+    Returns:
+        dict: Número de elementos 'done' y 'failed' en esta ejecución
+    """
+    creds = get_credentials()
+    seasons = seasons or [(COMPETITION_ID, SEASON_ID)]
+    datasets = list(datasets or DATASETS)
+    manifest = load_manifest(manifest_path)
+    summary = {'done': 0, 'failed': 0}
+
+    for competition_id, season_id in seasons:
+        try:
+            matches = sb.matches(competition_id=competition_id, season_id=season_id, creds=creds)
+        except Exception as e:
+            print(f'Error al obtener los partidos de la temporada {competition_id}/{season_id}: {e}')
+            continue
+        matches = matches[matches['match_status'] == 'available']
+        versions = {int(row.match_id): (str(row.last_updated) if 'last_updated' in matches.columns else None)
+                    for row in matches.itertuples()}
+
+        items = pending_items(manifest, competition_id, season_id, versions, datasets, retry_failed_only)
+        print(f'Temporada {competition_id}/{season_id}: {len(items)} elementos pendientes')
+
+        def fetch(item):
+            match_id, dataset = item
+            try:
+                return DATASETS[dataset][1](creds, match_id), None
+            except Exception as e:
+                return None, e
+
+        try:
+            for (match_id, dataset), (data, error) in stream_concurrently(fetch, items, max_workers=max_workers):
+                if error is None:
+                    try:
+                        write_match_partition(data, DATASETS[dataset][0], season_id, match_id)
+                    except Exception as e:
+                        error = e
+                if error is None:
+                    mark_item(manifest, competition_id, season_id, match_id, dataset, 'done',
+                              version=versions[match_id], path=manifest_path)
+                    summary['done'] += 1
+                    print(f'Partido {match_id} completado en {dataset}')
+                else:
+                    mark_item(manifest, competition_id, season_id, match_id, dataset, 'failed',
+                              version=versions[match_id], error=str(error), path=manifest_path)
+                    summary['failed'] += 1
+                    print(f'Error en partido {match_id} ({dataset}): {error}')
+        finally:
+            # Los cambios pendientes se guardan también si la carga se interrumpe
+            flush_manifest(manifest, manifest_path)
+
+        if 'events' in datasets:
+            # Huellas de los partidos de la temporada con eventos almacenados
+            try:
+                refresh_fingerprints(DATASETS['events'][0], read_match_dataset, season_id=season_id,
+                                     versions=versions)
+            except Exception as e:
+                print(f'Error al calcular las huellas de la temporada {competition_id}/{season_id}: {e}')
+
+    return summary
@@ -0,0 +1,207 @@
+"""
+Línea base histórica por equipo ("promedio de últimos N partidos").
+
+Las estadísticas de equipo de cada partido salen de la tabla materializada
+``team_match_stats`` (que ``sync_matches`` completa con los partidos nuevos) y
+se reúnen en un historial ordenado por equipo y fecha. Con el historial ordenado,
+los últimos N partidos de un equipo antes de una fecha son un corte
+obtenido con dos ``searchsorted``, y la línea base de todos los partidos de la
+temporada a la vez es un ``rolling`` agrupado por equipo.
+"""
+
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from data.extraccion_datos import MATCHES_CSV, TEAM_MATCH_STATS_PATH, load_team_match_stats, update_team_match_stats
+
+# Número de partidos anteriores que forman la línea base
+BASELINE_WINDOW = int(os.getenv("SMARTAUDAX_BASELINE_WINDOW", "5"))
+
+# Métricas que se comparan en el informe
+CONTEXT_COLUMNS = [
+    'team_match_goals', 'team_match_np_xg', 'team_match_np_shots', 'team_match_np_shots_on_target',
+    'team_match_xa', 'team_match_passes', 'team_match_passing_ratio', 'team_match_deep_progressions',
+    'team_match_crosses', 'team_match_pressures', 'team_match_counterpressures',
+    'team_match_pressure_regains', 'team_match_ball_recoveries', 'team_match_tackles',
+    'team_match_interceptions', 'team_match_obv',
+]
+
+_history = {}
+_history_lock = threading.Lock()
+
+
+def _versions(matches):
+    if 'last_updated' not in matches.columns:
+        return [None] * len(matches)
+    return [None if pd.isna(v) else str(v) for v in matches['last_updated']]
+
+
+def team_history(matches, creds=None, max_workers=None):
+    """
+    Estadísticas de equipo de todos los partidos de la lista, ordenadas por equipo y fecha.
+
+    Args:
+        matches: Lista de partidos con ``match_id`` y ``match_date`` (``sb_matches.csv``)
+        creds: Credenciales de la API para completar antes la tabla con los partidos
+            pendientes; sin ellas solo se lee la tabla materializada y los partidos que
+            aún no están en ella se omiten
+        max_workers: Número máximo de lecturas simultáneas de partidos pendientes
+
+    Returns:
+        pd.DataFrame: Una fila por (equipo, partido) con ``match_date`` y las columnas
+            ``team_match_*``
+    """
+    match_ids = [int(m) for m in matches['match_id']]
+    versions = _versions(matches)
+    if creds is not None:
+        # La tabla materializada solo calcula los partidos que aún no tiene
+        update_team_match_stats(match_ids, dict(zip(match_ids, versions)), creds=creds, max_workers=max_workers)
+
+    mtime = os.path.getmtime(TEAM_MATCH_STATS_PATH) if os.path.exists(TEAM_MATCH_STATS_PATH) else None
+    key = (tuple(match_ids), tuple(versions), mtime)
+    with _history_lock:
+        history = _history.get(key)
+    if history is not None:
+        return history
+
+    stats = load_team_match_stats()[0]
+    if stats.empty:
+        return pd.DataFrame(columns=['match_id', 'team_id', 'team_name', 'match_date'])
+
+    dates = pd.DataFrame({'match_id': match_ids, 'match_date': pd.to_datetime(matches['match_date']).to_numpy()})
+    history = stats.merge(dates, on='match_id', how='inner')
+    history['team_id'] = history['team_id'].astype('int64')
+    history = history.sort_values(['team_id', 'match_date', 'match_id'], kind='stable', ignore_index=True)
+
+    with _history_lock:
+        # Solo se conserva el historial de la lista de partidos más reciente
+        _history.clear()
+        _history[key] = history
+    return history
+
+
+def stat_columns(history, columns=None):
+    """Columnas numéricas de estadísticas del historial (o las pedidas que existan)."""
+    if columns is not None:
+        return [col for col in columns if col in history.columns]
+    return [col for col in history.columns
+            if col.startswith('team_match_') and pd.api.types.is_numeric_dtype(history[col])]
+
+
+def resolve_history_team(history, team):
+    """ID del equipo a partir de su nombre o ID (None si no está en el historial)."""
+    if team is None or history.empty:
+        return None
+    if isinstance(team, str):
+        ids = history.loc[history['team_name'] == team, 'team_id']
+        return int(ids.iloc[0]) if not ids.empty else None
+    return int(team)
+
+
+def last_matches(history, team, date, n=BASELINE_WINDOW):
+    """
+    Últimos ``n`` partidos de un equipo anteriores a ``date``.
+
+    Args:
+        history: Historial de ``team_history``
+        team: Nombre o ID del equipo
+        date: Fecha de referencia (los partidos de esa fecha no se incluyen)
+        n: Tamaño de la ventana
+
+    Returns:
+        pd.DataFrame: Filas del historial, de la más antigua a la más reciente
+    """
+    team_id = resolve_history_team(history, team)
+    if team_id is None:
+        return history.iloc[[]]
+    team_ids = history['team_id'].to_numpy()
+    start, stop = np.searchsorted(team_ids, team_id, 'left'), np.searchsorted(team_ids, team_id, 'right')
+    dates = history['match_date'].to_numpy()[start:stop]
+    end = start + np.searchsorted(dates, np.datetime64(pd.Timestamp(date)), 'left')
+    return history.iloc[max(start, end - n):end]
+
+
+def baseline(history, team, date, n=BASELINE_WINDOW, columns=None):
+    """
+    Promedio de las estadísticas de un equipo en sus últimos ``n`` partidos antes de ``date``.
+
+    Returns:
+        pd.Series: Media por columna (vacía si el equipo no tiene partidos anteriores)
+    """
+    window = last_matches(history, team, date, n)
+    return window[stat_columns(history, columns)].mean()
+
+
+def compare(current, reference):
+    """
+    Diferencias entre las estadísticas de un partido y su línea base.
+
+    Args:
+        current: Estadísticas del partido (pd.Series)
+        reference: Línea base (pd.Series de ``baseline``)
+
+    Returns:
+        pd.DataFrame: Columnas ``actual``, ``promedio``, ``diferencia`` y ``diferencia_pct``
+    """
+    frame = pd.DataFrame({'actual': current, 'promedio': reference}).dropna(subset=['promedio'])
+    frame['diferencia'] = frame['actual'] - frame['promedio']
+    frame['diferencia_pct'] = frame['diferencia'] / frame['promedio'].where(frame['promedio'] != 0) * 100
+    return frame
+
+
+def rolling_baselines(history, n=BASELINE_WINDOW, columns=None):
+    """
+    Línea base de cada fila del historial: media de los ``n`` partidos anteriores del
+    mismo equipo, calculada para toda la temporada de una vez.
+
+    Returns:
+        pd.DataFrame: Alineado con ``history`` (nulo en el primer partido de cada equipo)
+    """
+    columns = stat_columns(history, columns)
+    previous = history.groupby('team_id', sort=False)[columns].shift(1)
+    rolled = previous.groupby(history['team_id'].to_numpy(), sort=False).rolling(n, min_periods=1).mean()
+    return rolled.reset_index(level=0, drop=True).reindex(history.index)
+
+
+def _round_dict(values, digits=3):
+    return {k: (None if pd.isna(v) else round(float(v), digits)) for k, v in values.items()}
+
+
+def historical_context(teams, date, match_id=None, matches=None, n=BASELINE_WINDOW, columns=CONTEXT_COLUMNS):
+    """
+    Contexto histórico para el informe de un partido, solo con datos almacenados
+    (sin llamadas a la API).
+
+    Args:
+        teams: Nombres de los equipos a comparar
+        date: Fecha del partido
+        match_id: ID del partido (para comparar sus estadísticas con la línea base)
+        matches: Lista de partidos (por defecto ``MATCHES_CSV``)
+        n: Tamaño de la ventana
+        columns: Métricas a incluir
+
+    Returns:
+        dict: {equipo: {'partidos', 'promedio', 'actual', 'diferencia'}}
+    """
+    if matches is None:
+        matches = pd.read_csv(MATCHES_CSV)
+    history = team_history(matches)
+    context = {}
+    for team in teams:
+        window = last_matches(history, team, date, n)
+        if window.empty:
+            continue
+        columns_used = stat_columns(history, columns)
+        reference = window[columns_used].mean()
+        entry = {'partidos': [int(m) for m in window['match_id']], 'promedio': _round_dict(reference)}
+        team_id = resolve_history_team(history, team)
+        current = history[(history['match_id'] == match_id).to_numpy() & (history['team_id'] == team_id).to_numpy()]
+        if match_id is not None and not current.empty:
+            deltas = compare(current.iloc[0][columns_used].astype(float), reference)
+            entry['actual'] = _round_dict(deltas['actual'])
+            entry['diferencia'] = _round_dict(deltas['diferencia'])
+        context[team] = entry
+    return context
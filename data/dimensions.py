@@ -0,0 +1,98 @@
+"""
+Tablas de dimensiones de jugadores y equipos indexadas por ID de StatsBomb.
+
+Se actualizan al ingerir eventos (caché, dataset Parquet, carga histórica) y se
+comparten entre partidos: el análisis agrupa por ``player_id``/``team_id`` y los
+nombres solo se resuelven al mostrar resultados, con un único nombre por ID
+aunque StatsBomb lo escriba distinto en otro partido.
+"""
+
+import os
+import threading
+
+import pandas as pd
+
+DIMENSIONS_DIR = os.getenv("SMARTAUDAX_DIMENSIONS_DIR", "outs_data/dimensions")
+
+# Dimensión -> columnas (id, nombre) en los eventos
+DIMENSION_COLUMNS = {
+    'players': [('player_id', 'player'), ('pass_recipient_id', 'pass_recipient')],
+    'teams': [('team_id', 'team'), ('possession_team_id', 'possession_team')],
+}
+
+_lock = threading.Lock()
+_tables = {}
+
+
+def _path(kind):
+    return os.path.join(DIMENSIONS_DIR, f'{kind}.parquet')
+
+
+def load_dimension(kind):
+    """
+    Devuelve la dimensión ('players' o 'teams') como Serie id -> nombre.
+
+    Se mantiene en memoria y solo se vuelve a leer si el archivo cambió.
+    """
+    path = _path(kind)
+    if not os.path.exists(path):
+        return pd.Series(dtype=object)
+    mtime = os.path.getmtime(path)
+    cached = _tables.get(kind)
+    if cached is None or cached[0] != mtime:
+        table = pd.read_parquet(path)
+        cached = (mtime, table.set_index('id')['name'])
+        _tables[kind] = cached
+    return cached[1]
+
+
+def _pairs(events, kind):
+    """Pares (id, nombre) únicos presentes en los eventos para una dimensión."""
+    frames = []
+    for id_col, name_col in DIMENSION_COLUMNS[kind]:
+        if id_col in events.columns and name_col in events.columns:
+            pairs = events[[id_col, name_col]].dropna().drop_duplicates(id_col)
+            frames.append(pairs.set_axis(['id', 'name'], axis=1))
+    if not frames:
+        return pd.DataFrame(columns=['id', 'name'])
+    pairs = pd.concat(frames, ignore_index=True).drop_duplicates('id')
+    return pairs.astype({'id': 'int64', 'name': str})
+
+
+def update_dimensions(events):
+    """Añade a las dimensiones los jugadores y equipos de un partido recién ingerido."""
+    with _lock:
+        for kind in DIMENSION_COLUMNS:
+            new = _pairs(events, kind)
+            if new.empty:
+                continue
+            current = load_dimension(kind).rename_axis('id').reset_index(name='name')
+            # El nombre más reciente reemplaza al anterior para el mismo ID
+            merged = pd.concat([current, new], ignore_index=True).drop_duplicates('id', keep='last')
+            merged = merged.astype({'id': 'int64'}).sort_values('id', ignore_index=True)
+            if len(merged) == len(current) and merged['name'].tolist() == current.sort_values('id')['name'].tolist():
+                continue
+
+            os.makedirs(DIMENSIONS_DIR, exist_ok=True)
+            tmp_path = f'{_path(kind)}.tmp'
+            merged.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, _path(kind))
+
+
+def display_names(ids, kind='players', events=None):
+    """
+    Resuelve IDs a nombres para mostrar.
+
+    Args:
+        ids: IDs a resolver
+        kind: 'players' o 'teams'
+        events: Eventos de respaldo para IDs que aún no están en la dimensión
+
+    Returns:
+        list: Nombres en el mismo orden que ``ids``
+    """
+    ids = pd.Index(ids)
+    names = pd.Series(ids, index=ids).map(load_dimension(kind))
+    if events is not None and names.isna().any():
+        names = names.fillna(pd.Series(ids, index=ids).map(_pairs(events, kind).set_index('id')['name']))
+    return names.fillna(pd.Series(ids.astype(str), index=ids)).tolist()
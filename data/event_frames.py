@@ -0,0 +1,147 @@
+"""
+Normalización de los eventos de StatsBomb al momento de cargarlos.
+
+``prepare_events`` se aplica una única vez cuando los eventos entran al sistema
+(caché local, dataset Parquet) para que el análisis y las visualizaciones trabajen
+con columnas numéricas en lugar de recorrer listas fila a fila.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Columnas de destino de cada tipo de evento; un evento solo tiene una de ellas
+END_LOCATION_COLUMNS = ['pass_end_location', 'carry_end_location', 'shot_end_location', 'goalkeeper_end_location']
+
+
+def split_points(series, dims=2):
+    """
+    Convierte una columna de listas [x, y(, z)] en una matriz float (NaN si falta).
+
+    Args:
+        series: Columna con listas de coordenadas o valores nulos
+        dims: Número de coordenadas a extraer
+
+    Returns:
+        np.ndarray: Matriz de forma (len(series), dims)
+    """
+    values = np.full((len(series), dims), np.nan)
+    valid = series.notna().to_numpy()
+    if valid.any():
+        points = pd.DataFrame(series[valid].tolist()).to_numpy(dtype=float)
+        k = min(dims, points.shape[1])
+        values[valid, :k] = points[:, :k]
+    return values
+
+
+def add_coordinate_columns(events):
+    """
+    Añade las coordenadas como columnas float: ``location_x``, ``location_y`` y
+    ``end_x``, ``end_y``, ``end_z`` (destino del pase, conducción, tiro o portero).
+
+    No hace nada si las columnas ya existen.
+    """
+    if 'location_x' in events.columns or events.empty:
+        return events
+
+    columns = {}
+    if 'location' in events.columns:
+        location = split_points(events['location'], 2)
+        columns['location_x'], columns['location_y'] = location[:, 0], location[:, 1]
+    else:
+        columns['location_x'] = columns['location_y'] = np.full(len(events), np.nan)
+
+    end = np.full((len(events), 3), np.nan)
+    for col in END_LOCATION_COLUMNS:
+        if col in events.columns:
+            points = split_points(events[col], 3)
+            fill = np.isnan(end[:, 0]) & ~np.isnan(points[:, 0])
+            end[fill] = points[fill]
+    columns['end_x'], columns['end_y'], columns['end_z'] = end[:, 0], end[:, 1], end[:, 2]
+
+    return events.assign(**columns)
+
+
+# Columnas que leen el análisis (data/extraccion_datos.py) y las visualizaciones (pages/reportes.py)
+ANALYSIS_COLUMNS = [
+    'id', 'index', 'match_id', 'period', 'timestamp', 'minute', 'second', 'duration',
+    'type', 'possession', 'possession_team', 'possession_team_id', 'play_pattern',
+    'team', 'team_id', 'player', 'player_id', 'position',
+    'location_x', 'location_y', 'end_x', 'end_y', 'end_z',
+    'under_pressure', 'counterpress', 'related_events', 'tactics',
+    'pass_length', 'pass_outcome', 'pass_cross', 'pass_type', 'pass_recipient',
+    'pass_assisted_shot_id', 'pass_shot_assist', 'pass_goal_assist',
+    'shot_outcome', 'shot_statsbomb_xg', 'shot_type', 'shot_key_pass_id',
+    'duel_type', 'duel_outcome', 'substitution_replacement', 'substitution_replacement_id',
+    'foul_committed_card', 'bad_behaviour_card',
+]
+
+# Texto repetido con pocos valores distintos: se guarda como categoría
+CATEGORICAL_COLUMNS = [
+    'type', 'possession_team', 'play_pattern', 'team', 'player', 'position',
+    'pass_outcome', 'pass_type', 'pass_recipient', 'shot_outcome', 'shot_type',
+    'duel_type', 'duel_outcome', 'substitution_replacement', 'foul_committed_card', 'bad_behaviour_card',
+]
+
+# Banderas que StatsBomb solo informa cuando son verdaderas (True/NaN)
+BOOLEAN_COLUMNS = ['under_pressure', 'counterpress', 'pass_cross', 'pass_shot_assist', 'pass_goal_assist']
+
+# IDs de StatsBomb: claves enteras compactas (nulas cuando el evento no tiene jugador)
+ID_COLUMNS = ['team_id', 'possession_team_id', 'player_id', 'substitution_replacement_id']
+
+FLOAT_COLUMNS = ['location_x', 'location_y', 'end_x', 'end_y', 'end_z', 'duration', 'pass_length', 'shot_statsbomb_xg']
+INTEGER_COLUMNS = ['index', 'period', 'minute', 'second', 'possession']
+
+
+def compact_events(events, full_width=False, report=True):
+    """
+    Reduce la memoria de un DataFrame de eventos.
+
+    - Proyecta a ANALYSIS_COLUMNS (salvo ``full_width=True``).
+    - Convierte el texto repetido en categorías: las máscaras ``events['type'] == 'Shot'``
+      comparan códigos enteros en lugar de strings.
+    - Reduce los tipos numéricos (float32, enteros pequeños) y las banderas a bool.
+
+    Args:
+        events: Eventos normalizados con ``prepare_events``
+        full_width: Conservar todas las columnas (solo se reducen los tipos)
+        report: Imprimir la memoria ahorrada
+
+    Returns:
+        pd.DataFrame: Eventos compactados
+    """
+    if events.empty:
+        return events
+    before = events.memory_usage(deep=True).sum() if report else 0
+
+    if not full_width:
+        events = events[[col for col in ANALYSIS_COLUMNS if col in events.columns]]
+    events = events.copy()
+
+    for col in CATEGORICAL_COLUMNS:
+        # object o str (dtype de texto por defecto desde pandas 3)
+        if col in events.columns and pd.api.types.is_string_dtype(events[col].dtype):
+            events[col] = events[col].astype('category')
+    for col in BOOLEAN_COLUMNS:
+        if col in events.columns and events[col].dtype != bool:
+            events[col] = events[col].fillna(False).astype(bool)
+    for col in ID_COLUMNS:
+        if col in events.columns:
+            events[col] = events[col].astype('Int32')
+    for col in FLOAT_COLUMNS:
+        if col in events.columns:
+            events[col] = events[col].astype('float32')
+    for col in INTEGER_COLUMNS:
+        if col in events.columns and not events[col].isna().any():
+            events[col] = pd.to_numeric(events[col], downcast='integer')
+
+    if report:
+        after = events.memory_usage(deep=True).sum()
+        match_id = events['match_id'].iloc[0] if 'match_id' in events.columns else ''
+        print(f'Eventos {match_id}: {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB '
+              f'({(1 - after / before) * 100:.0f}% menos)')
+    return events
+
+
+def prepare_events(events):
+    """Normaliza un DataFrame de eventos recién cargado (idempotente)."""
+    return add_coordinate_columns(events)
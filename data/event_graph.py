@@ -0,0 +1,156 @@
+"""
+Índice de relaciones entre eventos de un partido.
+
+StatsBomb enlaza los eventos con ``related_events`` (duelo y regate, presión y
+conducción presionada...), ``pass_assisted_shot_id`` (pase clave -> tiro) y
+``shot_key_pass_id`` (tiro -> pase clave). ``EventGraph`` indexa esas relaciones
+una vez por partido como lista de adyacencia (CSR) sobre las posiciones de los
+eventos ordenados, de modo que cada consulta es una búsqueda en un índice hash
+más un corte de array.
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from data.sequences import order_events
+
+_graphs = {}
+_graphs_lock = threading.Lock()
+_MAX_GRAPHS = 8
+
+
+class EventGraph:
+    """Relaciones entre los eventos de un partido (o de un subconjunto de sus eventos)."""
+
+    def __init__(self, events):
+        self.events = order_events(events)
+        self._ids = pd.Index(self.events['id'])
+        n = len(self.events)
+
+        # Aristas related_events: origen -> destino, agrupadas por origen
+        related = self.events['related_events'] if 'related_events' in self.events.columns else pd.Series(index=self.events.index, dtype=object)
+        exploded = related.reset_index(drop=True).explode().dropna()
+        targets = self._ids.get_indexer(exploded.to_numpy())
+        known = targets >= 0
+        sources = exploded.index.to_numpy()[known]
+        self._targets = targets[known]
+        self._offsets = np.searchsorted(sources, np.arange(n + 1))
+
+        # Inicio de la posesión de cada evento (para las cadenas hasta un tiro)
+        keys = [self.events[col] for col in ('match_id', 'possession') if col in self.events.columns]
+        if keys:
+            self._possession_start = np.arange(n) - self.events.groupby(keys, sort=False).cumcount().to_numpy()
+        else:
+            self._possession_start = np.zeros(n, dtype=int)
+
+    def position(self, event_id):
+        """Posición de un evento en ``events`` (None si no está)."""
+        position = self._ids.get_indexer([event_id])[0]
+        return None if position < 0 else position
+
+    def _get(self, event_id):
+        position = self.position(event_id)
+        return None if position is None else self.events.iloc[position]
+
+    def related(self, event_id, types=None):
+        """Eventos relacionados con ``event_id``, opcionalmente filtrados por tipo."""
+        position = self.position(event_id)
+        if position is None:
+            return self.events.iloc[[]]
+        related = self.events.iloc[self._targets[self._offsets[position]:self._offsets[position + 1]]]
+        if types is not None:
+            related = related[related['type'].isin(types)]
+        return related
+
+    def shot_for_key_pass(self, pass_id):
+        """Tiro generado por un pase clave (None si el pase no terminó en tiro)."""
+        key_pass = self._get(pass_id)
+        if key_pass is None or pd.isna(key_pass.get('pass_assisted_shot_id')):
+            return None
+        return self._get(key_pass['pass_assisted_shot_id'])
+
+    def key_pass_for_shot(self, shot_id):
+        """Pase clave de un tiro (None si fue una acción individual)."""
+        shot = self._get(shot_id)
+        if shot is None or pd.isna(shot.get('shot_key_pass_id')):
+            return None
+        return self._get(shot['shot_key_pass_id'])
+
+    def duel_partner(self, event_id):
+        """Eventos del rival enlazados a un duelo o regate."""
+        event = self._get(event_id)
+        if event is None:
+            return self.events.iloc[[]]
+        related = self.related(event_id)
+        return related[related['team'] != event['team']]
+
+    def pressures_on(self, event_id):
+        """Presiones sufridas por un evento (conducción, pase...)."""
+        return self.related(event_id, types=['Pressure'])
+
+    def chain_to_shot(self, shot_id):
+        """Eventos de la posesión que termina en el tiro, desde su inicio hasta el tiro."""
+        position = self.position(shot_id)
+        if position is None:
+            return self.events.iloc[[]]
+        return self.events.iloc[self._possession_start[position]:position + 1]
+
+    # --------------------------
+    # Consultas vectorizadas
+    # --------------------------
+    def related_pairs(self, source_mask, target_types=None):
+        """
+        Pares (origen, destino) de ``related_events`` para los eventos de ``source_mask``.
+
+        Args:
+            source_mask: Máscara booleana sobre ``events``
+            target_types: Tipos de evento destino a conservar
+
+        Returns:
+            pd.DataFrame: Columnas ``source`` y ``target`` con posiciones en ``events``
+        """
+        counts = np.diff(self._offsets)
+        sources = np.repeat(np.arange(len(self.events)), counts)
+        keep = np.asarray(source_mask)[sources]
+        pairs = pd.DataFrame({'source': sources[keep], 'target': self._targets[keep]})
+        if target_types is not None:
+            pairs = pairs[self.events['type'].iloc[pairs['target']].isin(target_types).to_numpy()]
+        return pairs.reset_index(drop=True)
+
+    def key_pass_shots(self):
+        """
+        Pases clave con el tiro que generaron.
+
+        Returns:
+            pd.DataFrame: Pases clave con ``shot_position`` y el ``shot_statsbomb_xg`` del tiro
+                (solo los tiros presentes en ``events``)
+        """
+        if 'pass_assisted_shot_id' not in self.events.columns:
+            return self.events.iloc[[]].assign(shot_position=[], shot_xg=[])
+        key_passes = self.events[self.events['pass_assisted_shot_id'].notna()]
+        shots = self._ids.get_indexer(key_passes['pass_assisted_shot_id'].to_numpy())
+        key_passes = key_passes[shots >= 0].assign(shot_position=shots[shots >= 0])
+        xg = self.events['shot_statsbomb_xg'].to_numpy() if 'shot_statsbomb_xg' in self.events.columns else np.zeros(len(self.events))
+        return key_passes.assign(shot_xg=xg[key_passes['shot_position'].to_numpy()])
+
+
+def graph_for(events):
+    """
+    Índice de relaciones de un conjunto de eventos, reutilizado mientras los eventos
+    del partido no cambien (análisis y figuras comparten el mismo índice).
+    """
+    if events.empty:
+        return EventGraph(events)
+    key = (events['match_id'].iloc[0] if 'match_id' in events.columns else None,
+           len(events), events['id'].iloc[0], events['id'].iloc[-1])
+    with _graphs_lock:
+        graph = _graphs.get(key)
+    if graph is None:
+        graph = EventGraph(events)
+        with _graphs_lock:
+            if len(_graphs) >= _MAX_GRAPHS:
+                _graphs.pop(next(iter(_graphs)))
+            _graphs[key] = graph
+    return graph
@@ -0,0 +1,276 @@
+"""
+Almacén local en disco de datos por partido (eventos, alineaciones, estadísticas de jugador).
+
+Cada partido se guarda como un archivo Parquet independiente dentro de
+``CACHE_DIR/<dataset>/<match_id>.parquet``. El tamaño total del almacén está
+limitado por ``CACHE_MAX_MB``; al superarlo se eliminan los archivos usados
+menos recientemente (LRU, usando la fecha de modificación como marca de acceso).
+"""
+
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from data import sb_client
+from data.dimensions import update_dimensions
+from data.event_frames import compact_events, prepare_events
+from data.lineups import lineups_to_table
+from data.sb_client import sb
+
+# --------------------------
+# Configuración
+# --------------------------
+CACHE_DIR = os.getenv("SMARTAUDAX_CACHE_DIR", "outs_data/cache")
+CACHE_MAX_MB = float(os.getenv("SMARTAUDAX_CACHE_MAX_MB", "512"))
+
+_JSON_COLUMNS_KEY = b"smartaudax.json_columns"
+_VERSION_KEY = b"smartaudax.version"
+_eviction_lock = threading.Lock()
+
+
+# --------------------------
+# Serialización Parquet
+# --------------------------
+def _needs_json(values):
+    """Indica si una columna object contiene diccionarios (o listas de diccionarios)."""
+    non_null = values.dropna()
+    if non_null.empty:
+        return False
+    first = non_null.iloc[0]
+    if isinstance(first, dict):
+        return True
+    if isinstance(first, list):
+        return any(isinstance(item, dict) for item in first)
+    try:
+        pa.array(non_null, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return True
+    return False
+
+
+def frame_to_table(df, version=None):
+    """
+    Convierte un DataFrame de StatsBomb a una tabla Arrow.
+
+    Las listas de números (``location``, ``pass_end_location``...) se guardan como
+    listas tipadas; las columnas anidadas con diccionarios (``tactics``,
+    ``shot_freeze_frame``...) se guardan como JSON y se marcan en los metadatos.
+    ``version`` (por ejemplo el ``last_updated`` del partido) se guarda también en
+    los metadatos para detectar datos obsoletos.
+    """
+    df = df.copy()
+    json_columns = []
+    for col in df.columns:
+        if df[col].dtype == object and _needs_json(df[col]):
+            df[col] = df[col].map(lambda v: json.dumps(v, default=str) if isinstance(v, (dict, list)) else None)
+            json_columns.append(col)
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # Coordenadas siempre como list<double>, aunque un partido traiga solo enteros
+    for i, field in enumerate(table.schema):
+        if pa.types.is_list(field.type) and pa.types.is_integer(field.type.value_type):
+            table = table.set_column(i, field.name, table.column(i).cast(pa.list_(pa.float64())))
+    metadata = dict(table.schema.metadata or {})
+    metadata[_JSON_COLUMNS_KEY] = json.dumps(json_columns).encode()
+    if version is not None:
+        metadata[_VERSION_KEY] = str(version).encode()
+    return table.replace_schema_metadata(metadata)
+
+
+def json_columns_of(schema):
+    """Columnas guardadas como JSON según los metadatos de un esquema Arrow."""
+    metadata = schema.metadata or {}
+    return json.loads(metadata.get(_JSON_COLUMNS_KEY, b"[]"))
+
+
+def table_to_frame(table, json_columns=None):
+    """Reconstruye el DataFrame original a partir de una tabla escrita con ``frame_to_table``."""
+    if json_columns is None:
+        json_columns = json_columns_of(table.schema)
+    list_columns = [field.name for field in table.schema if pa.types.is_list(field.type) or pa.types.is_large_list(field.type)]
+
+    df = table.to_pandas()
+    for col in json_columns:
+        if col in df.columns:
+            df[col] = df[col].map(lambda v: json.loads(v) if isinstance(v, str) else None)
+    # Arrow devuelve las listas como np.ndarray; el código de análisis espera listas
+    for col in list_columns:
+        df[col] = df[col].map(lambda v: v.tolist() if isinstance(v, np.ndarray) else v)
+    return df
+
+
+def write_parquet(df, path, version=None):
+    """Escribe un DataFrame en Parquet de forma atómica (archivo temporal + rename)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    pq.write_table(frame_to_table(df, version=version), tmp_path, compression="zstd")
+    os.replace(tmp_path, path)
+
+
+def read_parquet(path):
+    """Lee un archivo escrito con ``write_parquet``."""
+    return table_to_frame(pq.read_table(path))
+
+
+# --------------------------
+# Almacén por partido
+# --------------------------
+def _path(dataset, match_id):
+    return os.path.join(CACHE_DIR, dataset, f"{int(match_id)}.parquet")
+
+
+def stored_version(path):
+    """Versión con la que se guardó un archivo del almacén (None si no tiene)."""
+    version = (pq.read_schema(path).metadata or {}).get(_VERSION_KEY)
+    return version.decode() if version is not None else None
+
+
+def load(dataset, match_id, version=None):
+    """
+    Devuelve los datos almacenados de un partido o None si no están en caché.
+
+    Args:
+        dataset: Nombre del conjunto de datos ('events', 'player_match_stats'...)
+        match_id: ID del partido
+        version: Versión esperada de los datos (``last_updated`` del partido). Si se
+            indica y no coincide con la almacenada, la entrada se descarta.
+
+    Returns:
+        pd.DataFrame | None
+    """
+    path = _path(dataset, match_id)
+    if not os.path.exists(path):
+        return None
+    try:
+        if version is not None and stored_version(path) != str(version):
+            print(f'Caché obsoleta para {dataset}/{match_id}, se vuelve a descargar')
+            _remove(path)
+            return None
+        df = read_parquet(path)
+    except Exception as e:
+        print(f'Caché corrupta para {dataset}/{match_id}, se descarta: {e}')
+        _remove(path)
+        return None
+    # Marcar como usado recientemente para el desalojo LRU
+    now = time.time()
+    os.utime(path, (now, now))
+    return df
+
+
+def save(dataset, match_id, df, version=None):
+    """Guarda los datos de un partido y aplica el tope de tamaño del almacén."""
+    write_parquet(df, _path(dataset, match_id), version=version)
+    enforce_size_cap()
+
+
+def cached(dataset, match_id, fetch, version=None):
+    """
+    Lectura a través de la caché: devuelve los datos almacenados o llama a
+    ``fetch()`` y guarda el resultado.
+    """
+    df = load(dataset, match_id, version=version)
+    if df is not None:
+        return df
+    df = fetch()
+    save(dataset, match_id, df, version=version)
+    return df
+
+
+def ingest_events(events):
+    """Normaliza eventos recién descargados y registra sus jugadores y equipos en las dimensiones."""
+    events = prepare_events(events)
+    update_dimensions(events)
+    return events
+
+
+def get_events(match_id, creds, version=None, full_width=False):
+    """
+    Eventos de un partido, leídos desde la caché local o desde StatsBomb.
+
+    La caché guarda los eventos completos; al cargarlos se normalizan con
+    ``prepare_events`` y se compactan con ``compact_events`` (solo las columnas que
+    usa el análisis, salvo ``full_width=True``).
+    """
+    events = cached("events", match_id, lambda: ingest_events(sb_client.events(match_id, creds)), version=version)
+    # Entradas guardadas antes de añadir columnas nuevas a la normalización
+    return compact_events(prepare_events(events), full_width=full_width)
+
+
+def get_player_match_stats(match_id, creds, version=None):
+    """Estadísticas de jugador de un partido, leídas desde la caché local o desde StatsBomb."""
+    return cached("player_match_stats", match_id, lambda: sb.player_match_stats(match_id=int(match_id), creds=creds),
+                  version=version)
+
+
+def fetch_lineups(match_id, creds):
+    """Descarga las alineaciones de un partido y las normaliza con ``lineups_to_table``."""
+    table = lineups_to_table(sb.lineups(match_id=int(match_id), fmt='dict', creds=creds), match_id)
+    update_dimensions(table.rename(columns={'player_name': 'player'}))
+    return table
+
+
+def get_lineups(match_id, creds, version=None):
+    """Alineaciones de un partido en formato largo, leídas desde la caché local o desde StatsBomb."""
+    return cached("lineups", match_id, lambda: fetch_lineups(match_id, creds), version=version)
+
+
+def invalidate(match_ids, datasets=None):
+    """
+    Elimina de la caché los datos de los partidos indicados.
+
+    Args:
+        match_ids: IDs de partidos a invalidar
+        datasets: Conjuntos de datos a invalidar (por defecto, todos)
+    """
+    if not os.path.isdir(CACHE_DIR):
+        return
+    if datasets is None:
+        datasets = [d for d in os.listdir(CACHE_DIR) if os.path.isdir(os.path.join(CACHE_DIR, d))]
+    for dataset in datasets:
+        for match_id in match_ids:
+            _remove(_path(dataset, match_id))
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _cache_files():
+    files = []
+    for root, _, names in os.walk(CACHE_DIR):
+        for name in names:
+            if not name.endswith(".parquet"):
+                continue
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+    return files
+
+
+def cache_size_bytes():
+    """Tamaño total ocupado por el almacén en bytes."""
+    return sum(size for _, size, _ in _cache_files())
+
+
+def enforce_size_cap(max_mb=None):
+    """Elimina los archivos menos usados hasta que el almacén quede bajo el tope."""
+    max_bytes = (CACHE_MAX_MB if max_mb is None else max_mb) * 1024 * 1024
+    with _eviction_lock:
+        files = sorted(_cache_files())
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= max_bytes:
+                break
+            _remove(path)
+            total -= size
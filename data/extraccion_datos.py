@@ -5,15 +5,120 @@
 
 import pandas as pd
 import numpy as np
-from statsbombpy import sb
+from data.sb_client import sb
 import warnings
 warnings.filterwarnings("ignore", category=FutureWarning)
 from dotenv import load_dotenv
 import os
+import json
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import pyarrow as pa
+import pyarrow.dataset as ds
+from data import analysis_cache, event_store, fingerprints
+from data.event_graph import graph_for
+from data.metrics import SECTIONS, evaluate_season, first_row, match_view, resolve_team
+from data.minutes import minutes_played
+from data.possessions import chains_for
+from data.sequences import next_events, order_events, restart_sequences
+
+# Número máximo de descargas simultáneas contra la API de StatsBomb
+MAX_WORKERS = int(os.getenv("SB_MAX_WORKERS", "8"))
+
+# Chile, Primera Division 2025
+COMPETITION_ID = 103
+SEASON_ID = 315
+
+# Dataset Parquet de eventos particionado por temporada y partido
+EVENTS_DATASET_DIR = 'outs_data/sb_events'
+
+# Lista de partidos usada por la aplicación
+MATCHES_CSV = 'outs_data/sb_matches.csv'
+
+# Tabla materializada de estadísticas de equipo por partido (se actualiza de forma incremental)
+TEAM_MATCH_STATS_PATH = 'outs_data/sb_team_match_stats.parquet'
+
+# Columnas que indican que StatsBomb ha publicado o corregido datos de un partido
+MATCH_VERSION_COLUMNS = ['last_updated', 'last_updated_360', 'match_status']
+
+# Equipo analizado por defecto en los informes
+ANALYZED_TEAM = 'Audax Italiano'
+
+# Secciones del análisis de un partido, en el orden del informe
+ANALYSIS_SECTIONS = ['general', 'offensive', 'defensive', 'transitions', 'set_pieces']
+
+# Ratios de equipo: (numerador, denominador) sobre los totales del partido
+TEAM_MATCH_RATIOS = {
+    'team_match_np_xg_per_shot': ('team_match_np_xg', 'team_match_np_shots'),
+    'team_match_long_ball_ratio': ('team_match_successful_long_balls', 'team_match_long_balls'),
+    'team_match_aerial_ratio': ('team_match_successful_aerials', 'team_match_aerials'),
+    'team_match_passing_ratio': ('team_match_successful_passes', 'team_match_passes'),
+    'team_match_crossing_ratio': ('team_match_successful_crosses', 'team_match_crosses'),
+    'team_match_box_cross_ratio': ('team_match_crosses_into_box', 'team_match_crosses'),
+    'team_match_shot_touch_ratio': ('team_match_np_shots', 'team_match_touches'),
+    'team_match_pressure_duration_avg': ('team_match_pressure_duration_total', 'team_match_pressures'),
+    'team_match_counterpressure_duration_avg': ('team_match_counterpressure_duration_total', 'team_match_counterpressures'),
+    'team_match_xgchain_per_possession': ('team_match_xgchain', 'team_match_possession'),
+    'team_match_op_xgchain_per_possession': ('team_match_op_xgchain', 'team_match_possession'),
+    'team_match_xgbuildup_per_possession': ('team_match_xgbuildup', 'team_match_possession'),
+    'team_match_op_xgbuildup_per_possession': ('team_match_op_xgbuildup', 'team_match_possession'),
+}
 
 # --------------------------
 # Funciones de extracción
 # --------------------------
+def fetch_concurrently(fetch, ids, max_workers=None, label=''):
+    """
+    Ejecuta ``fetch(id)`` para cada partido con un número acotado de hilos.
+
+    Args:
+        fetch: Función que descarga los datos de un partido
+        ids: IDs de partidos
+        max_workers: Número máximo de descargas simultáneas (por defecto MAX_WORKERS)
+        label: Nombre del conjunto de datos para los mensajes de progreso
+
+    Returns:
+        list: Resultados en el mismo orden que ``ids``
+    """
+    ids = list(ids)
+    if not ids:
+        return []
+    workers = max(1, min(max_workers or MAX_WORKERS, len(ids)))
+
+    def task(id):
+        result = fetch(id)
+        print(f'Partido {id} completado en {label}')
+        return result
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(task, ids))
+
+def stream_concurrently(fetch, ids, max_workers=None):
+    """
+    Igual que ``fetch_concurrently`` pero entrega cada resultado en cuanto llega.
+
+    Nunca hay más de ``max_workers`` partidos descargados y sin consumir, de modo
+    que la memoria no crece con el tamaño de la temporada.
+
+    Yields:
+        tuple: (id, resultado) en orden de finalización
+    """
+    pending_ids = iter(list(ids))
+    workers = max(1, max_workers or MAX_WORKERS)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        in_flight = {}
+        for id in pending_ids:
+            in_flight[executor.submit(fetch, id)] = id
+            if len(in_flight) >= workers:
+                break
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                id = in_flight.pop(future)
+                yield id, future.result()
+                next_id = next(pending_ids, None)
+                if next_id is not None:
+                    in_flight[executor.submit(fetch, next_id)] = next_id
+
 def get_credentials():
     SB_USERNAME = os.getenv("STATSBOMB_USERNAME")
     SB_PASSWORD = os.getenv("STATSBOMB_PASSWORD")
@@ -21,7 +126,7 @@ def get_credentials():
 
 def extract_matches(creds):
     """Extrae los partidos de la competición y temporada indicadas."""
-    matches = sb.matches(competition_id=103, season_id=315, creds=creds) # Chile, Primera Division 2025 
+    matches = sb.matches(competition_id=COMPETITION_ID, season_id=SEASON_ID, creds=creds) # Chile, Primera Division 2025
     return matches[matches['match_status'] == 'available']
 
 def extract_available_ids(matches):
@@ -30,15 +135,32 @@ def extract_available_ids(matches):
     print(len(ids))
     return ids
 
-def extract_player_match_stats(creds, ids):
+def extract_player_match_stats(creds, ids, max_workers=None):
     """Extrae las estadísticas de jugador para cada partido y las concatena."""
-    # Inicia con un partido de referencia para tener la estructura
-    player_match_stats = sb.player_match_stats(match_id=3871964, creds=creds)
+    frames = fetch_concurrently(lambda id: sb.player_match_stats(match_id=id, creds=creds), ids,
+                                max_workers=max_workers, label='player_match_stats')
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+def load_player_match_stats(ids, versions=None):
+    """
+    Estadísticas de jugador de los partidos guardadas en el almacén local (las que
+    deja ``get_team_match_stats``), sin descargar nada.
+
+    Args:
+        ids: IDs de los partidos
+        versions: {match_id: last_updated} de los partidos
+
+    Returns:
+        pd.DataFrame: Estadísticas de jugador de los partidos almacenados
+    """
+    versions = versions or {}
+    frames = []
     for id in ids:
-        new_df = sb.player_match_stats(match_id=id, creds=creds)
-        player_match_stats = pd.concat([player_match_stats, new_df], ignore_index=True)
-        print(f'Partido {id} completado en player_match_stats')
-    return player_match_stats
+        version = versions.get(id)
+        stats = event_store.load('player_match_stats', id, version=None if pd.isna(version) else str(version))
+        if stats is not None:
+            frames.append(stats)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
 
 def extract_competitions(creds):
     """Extrae la información de competiciones."""
@@ -52,27 +174,20 @@ def extract_team_season_stats(creds):
     """Extrae las estadísticas de equipos a nivel de temporada."""
     return sb.team_season_stats(competition_id=103, season_id=107, creds=creds)
 
-def extract_events(creds, ids):
+def extract_events(creds, ids, max_workers=None):
     """Extrae los eventos para cada partido y los concatena."""
-    events = pd.DataFrame()
-    for id in ids:
-        new_df = sb.events(match_id=id, creds=creds)
-        events = pd.concat([events, new_df], ignore_index=True)
-        print(f'Partido {id} completado en events')
-    return events
+    frames = fetch_concurrently(lambda id: sb.events(match_id=id, creds=creds), ids,
+                                max_workers=max_workers, label='events')
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
 
-def extract_lineups(creds, ids):
+def extract_lineups(creds, ids, max_workers=None):
     """
-    Extrae los lineups usando el método estándar de la librería.
-    Cada llamada devuelve un diccionario, así que se envuelve en lista para generar una fila.
+    Extrae los lineups de cada partido como tabla larga (una fila por jugador y
+    tramo en una posición, ver ``data.lineups``) y los concatena.
     """
-    lineups = pd.DataFrame()
-    for id in ids:
-        new_data = sb.lineups(match_id=id, creds=creds)
-        new_df = pd.DataFrame([new_data])  # Convertir dict a fila de DataFrame
-        lineups = pd.concat([lineups, new_df], ignore_index=True)
-        print(f'Partido {id} completado en lineups')
-    return lineups
+    frames = fetch_concurrently(lambda id: event_store.get_lineups(id, creds), ids,
+                                max_workers=max_workers, label='lineups')
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
 
 def extract_team_match_stats(player_match_stats):
     """
@@ -82,9 +197,11 @@ def extract_team_match_stats(player_match_stats):
     # Primero, agrupamos las estadísticas sumando o usando el agregado apropiado
     # Se eliminan las columnas duplicadas y se corrigen los métodos de agregación
     print(f"Partido en team_match_stats")
-    team_match_stats = player_match_stats.groupby(['match_id', 'team_name',
-                                               'team_id', 'account_id']).agg({'player_match_minutes':'sum',
-                                                                              'player_match_np_xg_per_shot':'sum',
+    # Agrupar por claves enteras; el nombre del equipo se toma del primer registro.
+    # Los ratios (TEAM_MATCH_RATIOS) no se suman: se calculan después con los totales
+    team_match_stats = player_match_stats.groupby(['match_id', 'team_id',
+                                               'account_id']).agg({'team_name':'first',
+                                                                              'player_match_minutes':'sum',
                                                                               'player_match_np_xg':'sum',
                                                                               'player_match_np_shots':'sum',
                                                                               'player_match_goals':'sum',
@@ -101,20 +218,16 @@ def extract_team_match_stats(player_match_stats):
                                                                               'player_match_dribbles_faced':'sum',
                                                                               'player_match_touches_inside_box':'sum',
                                                                               'player_match_dribbles':'sum',
-                                                                              'player_match_challenge_ratio':'mean',
                                                                               'player_match_fouls':'sum',                                                                              
                                                                               'player_match_dispossessions':'sum',
                                                                               'player_match_long_balls':'sum',
                                                                               'player_match_successful_long_balls':'sum',
-                                                                              'player_match_long_ball_ratio':'mean',
                                                                               'player_match_shots_blocked':'sum',                                                                              
                                                                               'player_match_clearances':'sum',
                                                                               'player_match_aerials':'sum',
                                                                               'player_match_successful_aerials':'sum',
-                                                                              'player_match_aerial_ratio':'mean',
                                                                               'player_match_passes':'sum',                                                                              
                                                                               'player_match_successful_passes':'sum',
-                                                                              'player_match_passing_ratio':'mean',
                                                                               'player_match_op_passes':'sum',
                                                                               'player_match_forward_passes':'sum',
                                                                               'player_match_backward_passes':'sum',                                                                              
@@ -126,7 +239,6 @@ def extract_team_match_stats(player_match_stats):
                                                                               'player_match_np_shots_on_target':'sum',
                                                                               'player_match_crosses':'sum',
                                                                               'player_match_successful_crosses':'sum',
-                                                                              'player_match_crossing_ratio':'mean',
                                                                               'player_match_penalties_won':'sum',                                                                              
                                                                               'player_match_passes_inside_box':'sum',
                                                                               'player_match_op_xa':'sum',
@@ -140,25 +252,17 @@ def extract_team_match_stats(player_match_stats):
                                                                               'player_match_op_shots':'sum',                                                                              
                                                                               'player_match_touches':'sum',
                                                                               'player_match_pressure_regains':'sum',
-                                                                              'player_match_box_cross_ratio':'mean',
-                                                                              'player_match_deep_progressions':'sum',
-                                                                              'player_match_shot_touch_ratio':'mean',                                                                              
+                                                                              'player_match_deep_progressions':'sum',                                                                              
                                                                               'player_match_fouls_won':'sum',
                                                                               'player_match_xgchain':'sum',
                                                                               'player_match_op_xgchain':'sum',
                                                                               'player_match_xgbuildup':'sum',
                                                                               'player_match_op_xgbuildup':'sum',                                                                              
-                                                                              'player_match_xgchain_per_possession':'sum',
-                                                                              'player_match_op_xgchain_per_possession':'sum',
-                                                                              'player_match_xgbuildup_per_possession':'sum',
-                                                                              'player_match_op_xgbuildup_per_possession':'sum',
                                                                               'player_match_pressures':'sum',                                                                              
                                                                               'player_match_pressure_duration_total':'sum',
-                                                                              'player_match_pressure_duration_avg':'sum',
                                                                               'player_match_pressured_action_fails':'sum',
                                                                               'player_match_counterpressures':'sum',
                                                                               'player_match_counterpressure_duration_total':'sum',                                                                              
-                                                                              'player_match_counterpressure_duration_avg':'sum',
                                                                               'player_match_counterpressured_action_fails':'sum',
                                                                               'player_match_obv':'sum',
                                                                               'player_match_obv_pass':'sum',
@@ -174,53 +278,112 @@ def extract_team_match_stats(player_match_stats):
                                                                               'player_match_fhalf_ball_recoveries':'sum'})
 
     team_match_stats.reset_index(inplace=True)
+    team_match_stats.insert(1, 'team_name', team_match_stats.pop('team_name'))
     
     # Renombrar columnas
     rename_dict = {col: col.replace('player_match_', 'team_match_') for col in team_match_stats.columns}
     team_match_stats.rename(columns=rename_dict, inplace=True)
     
-    # Recalcular ratios correctamente
-    # 1. np_xg_per_shot
-    team_match_stats['team_match_np_xg_per_shot'] = team_match_stats['team_match_np_xg'] / team_match_stats['team_match_np_shots'].replace(0, np.nan)
-    
-    # 2. long_ball_ratio
-    team_match_stats['team_match_long_ball_ratio'] = team_match_stats['team_match_successful_long_balls'] / team_match_stats['team_match_long_balls'].replace(0, np.nan)
-    
-    # 3. aerial_ratio
-    team_match_stats['team_match_aerial_ratio'] = team_match_stats['team_match_successful_aerials'] / team_match_stats['team_match_aerials'].replace(0, np.nan)
-    
-    # 4. passing_ratio
-    team_match_stats['team_match_passing_ratio'] = team_match_stats['team_match_successful_passes'] / team_match_stats['team_match_passes'].replace(0, np.nan)
-    
-    # 5. crossing_ratio
-    team_match_stats['team_match_crossing_ratio'] = team_match_stats['team_match_successful_crosses'] / team_match_stats['team_match_crosses'].replace(0, np.nan)
-    
-    # 6. box_cross_ratio
-    team_match_stats['team_match_box_cross_ratio'] = team_match_stats['team_match_crosses_into_box'] / team_match_stats['team_match_crosses'].replace(0, np.nan)
-    
-    # 7. shot_touch_ratio
-    team_match_stats['team_match_shot_touch_ratio'] = team_match_stats['team_match_np_shots'] / team_match_stats['team_match_touches'].replace(0, np.nan)
-    
-    # 8. challenge_ratio - definido como el ratio de desafíos ganados vs. enfrentados
-    # Asumimos que no tenemos datos explícitos sobre desafíos ganados, así que tendríamos que calcularlo de otra forma
-    # Por simplicidad, lo mantenemos como un cálculo basado en los tackles exitosos vs. intentados
-    
-    # 9. Recalcular promedios de duración para presiones y contrapresiones
-    team_match_stats['team_match_pressure_duration_avg'] = team_match_stats['team_match_pressure_duration_total'] / team_match_stats['team_match_pressures'].replace(0, np.nan)
-    
-    team_match_stats['team_match_counterpressure_duration_avg'] = team_match_stats['team_match_counterpressure_duration_total'] / team_match_stats['team_match_counterpressures'].replace(0, np.nan)
-    
-    # 10. Recalcular métricas por posesión
-    team_match_stats['team_match_xgchain_per_possession'] = team_match_stats['team_match_xgchain'] / team_match_stats['team_match_possession'].replace(0, np.nan)
-    
-    team_match_stats['team_match_op_xgchain_per_possession'] = team_match_stats['team_match_op_xgchain'] / team_match_stats['team_match_possession'].replace(0, np.nan)
-    
-    team_match_stats['team_match_xgbuildup_per_possession'] = team_match_stats['team_match_xgbuildup'] / team_match_stats['team_match_possession'].replace(0, np.nan)
-    
-    team_match_stats['team_match_op_xgbuildup_per_possession'] = team_match_stats['team_match_op_xgbuildup'] / team_match_stats['team_match_possession'].replace(0, np.nan)
-    
+    # Recalcular los ratios a partir de los totales del equipo (la media de los
+    # ratios de los jugadores no es el ratio del equipo)
+    for ratio, (numerator, denominator) in TEAM_MATCH_RATIOS.items():
+        team_match_stats[ratio] = team_match_stats[numerator] / team_match_stats[denominator].replace(0, np.nan)
+
+    # challenge_ratio: tackles / (tackles + veces superado en el regate)
+    if 'player_match_dribbled_past' in player_match_stats.columns:
+        dribbled_past = player_match_stats.groupby(['match_id', 'team_id'])['player_match_dribbled_past'].sum()
+        contested = team_match_stats['team_match_tackles'] + dribbled_past.reindex(
+            pd.MultiIndex.from_frame(team_match_stats[['match_id', 'team_id']])).to_numpy()
+        team_match_stats['team_match_challenge_ratio'] = team_match_stats['team_match_tackles'] / contested.replace(0, np.nan)
+    else:
+        # Sin esa columna: media de los jugadores ponderada por los regates enfrentados
+        weights = player_match_stats['player_match_dribbles_faced']
+        weighted = (player_match_stats['player_match_challenge_ratio'] * weights).groupby(
+            [player_match_stats['match_id'], player_match_stats['team_id']]).sum(min_count=1)
+        faced = weights.where(player_match_stats['player_match_challenge_ratio'].notna()).groupby(
+            [player_match_stats['match_id'], player_match_stats['team_id']]).sum()
+        ratio = (weighted / faced.replace(0, np.nan)).reindex(
+            pd.MultiIndex.from_frame(team_match_stats[['match_id', 'team_id']]))
+        team_match_stats['team_match_challenge_ratio'] = ratio.to_numpy()
+
     return team_match_stats
 
+def load_team_match_stats(path=TEAM_MATCH_STATS_PATH):
+    """
+    Tabla materializada de estadísticas de equipo por partido.
+
+    Returns:
+        tuple: (DataFrame, {match_id: last_updated}); vacíos si la tabla no existe
+    """
+    if not os.path.exists(path):
+        return pd.DataFrame(), {}
+    versions = json.loads(event_store.stored_version(path) or '{}')
+    return event_store.read_parquet(path), {int(k): v for k, v in versions.items()}
+
+def update_team_match_stats(ids, versions=None, player_match_stats=None, creds=None,
+                            path=TEAM_MATCH_STATS_PATH, max_workers=None, only=None):
+    """
+    Actualiza la tabla materializada de estadísticas de equipo añadiendo solo los
+    partidos nuevos o corregidos (``last_updated`` distinto del almacenado) y
+    quitando los que ya no están en la lista.
+
+    Args:
+        ids: IDs de los partidos disponibles
+        versions: {match_id: last_updated} de los partidos
+        player_match_stats: Estadísticas de jugador ya descargadas (si se indican, los
+            partidos pendientes se agregan desde aquí)
+        creds: Credenciales de la API; sin ellas y sin ``player_match_stats`` solo se
+            usan datos del almacén local
+        path: Ruta de la tabla
+        max_workers: Número máximo de lecturas simultáneas
+        only: Si se indica, solo se completan estos partidos; el resto de pendientes
+            se deja para la carga completa (``main`` o ``backfill``)
+
+    Returns:
+        pd.DataFrame: Tabla completa de estadísticas de equipo por partido
+    """
+    ids = [int(id) for id in ids]
+    versions = {int(k): (None if pd.isna(v) else str(v)) for k, v in (versions or {}).items()}
+    table, stored_versions = load_team_match_stats(path)
+    present = set(table['match_id'].astype(int)) if not table.empty else set()
+    pending = [id for id in ids if id not in present or stored_versions.get(id) != versions.get(id)]
+    if only is not None:
+        only = {int(id) for id in only}
+        pending = [id for id in pending if id in only]
+    removed = present - set(ids)
+    if not pending and not removed:
+        return table
+
+    if not pending:
+        new_rows = pd.DataFrame()
+    elif player_match_stats is not None:
+        new_rows = extract_team_match_stats(player_match_stats[player_match_stats['match_id'].isin(pending)])
+    else:
+        def fetch(id):
+            try:
+                return get_team_match_stats(id, creds, version=versions.get(id))
+            except Exception as e:
+                print(f'Error al obtener datos del partido {id}: {e}')
+                return None
+        frames = [frame for frame in fetch_concurrently(fetch, pending, max_workers=max_workers,
+                                                        label='team_match_stats') if frame is not None]
+        new_rows = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    stale = set(pending) & present
+    if new_rows.empty and not stale and not removed:
+        return table
+
+    if not table.empty:
+        table = table[~table['match_id'].isin(list(removed | set(pending)))]
+    table = pd.concat([table, new_rows], ignore_index=True)
+    if not table.empty:
+        table = table.sort_values(['match_id', 'team_id'], kind='stable', ignore_index=True)
+    stored = {str(int(id)): versions.get(int(id)) for id in table['match_id'].unique()} if not table.empty else {}
+    event_store.write_parquet(table, path, version=json.dumps(stored))
+    print(f'team_match_stats: {new_rows["match_id"].nunique() if not new_rows.empty else 0} partidos añadidos, '
+          f'{len(removed)} eliminados')
+    return table
+
 # --------------------------
 # Función de exportación a CSV
 # --------------------------
@@ -228,23 +391,103 @@ def export_csv(df, filepath):
     df.to_csv(filepath, encoding='utf-8', index=False)
     print(f'Exportado {filepath}')
 
+# --------------------------
+# Dataset Parquet particionado
+# --------------------------
+def partition_path(root, season_id, match_id):
+    """Ruta del archivo de un partido dentro de un dataset particionado (estilo Hive)."""
+    return os.path.join(root, f'season_id={season_id}', f'match_id={int(match_id)}', 'part-0.parquet')
+
+def write_match_partition(df, root, season_id, match_id):
+    """Escribe los datos de un partido en su partición (match_id va en la ruta, no en el archivo)."""
+    path = partition_path(root, season_id, match_id)
+    event_store.write_parquet(df.drop(columns=['match_id'], errors='ignore'), path)
+    return path
+
+def stream_events_to_dataset(creds, ids, season_id=SEASON_ID, root=EVENTS_DATASET_DIR, max_workers=None):
+    """
+    Descarga los eventos de cada partido y los escribe en su partición en cuanto llegan.
+
+    A diferencia de ``extract_events`` no se mantiene la temporada completa en memoria:
+    solo los partidos en vuelo (como máximo ``max_workers``; con 1, un único partido).
+
+    Returns:
+        list: Rutas de las particiones escritas
+    """
+    paths = []
+    for id, events in stream_concurrently(lambda id: event_store.ingest_events(sb.events(match_id=id, creds=creds)), ids,
+                                          max_workers=max_workers):
+        paths.append(write_match_partition(events, root, season_id, id))
+        print(f'Partido {id} escrito en {root}')
+        del events
+    return paths
+
+def read_match_dataset(root=EVENTS_DATASET_DIR, season_id=None, match_ids=None, columns=None):
+    """
+    Lee un dataset particionado como DataFrame, con las columnas de listas y
+    coordenadas ya tipadas (sin parsear strings).
+
+    Args:
+        root: Carpeta raíz del dataset
+        season_id: Filtrar por temporada (opcional)
+        match_ids: Filtrar por partidos (opcional)
+        columns: Columnas a leer (opcional, por defecto todas)
+
+    Returns:
+        pd.DataFrame: Datos de los partidos, con columnas season_id y match_id
+    """
+    partitioning = ds.partitioning(pa.schema([('season_id', pa.int32()), ('match_id', pa.int64())]), flavor='hive')
+    dataset = ds.dataset(root, format='parquet', partitioning=partitioning)
+    fragments = list(dataset.get_fragments())
+    if not fragments:
+        return pd.DataFrame()
+
+    # Cada partido puede traer columnas distintas: unificar esquemas y columnas JSON
+    schemas = [fragment.physical_schema for fragment in fragments]
+    json_columns = sorted({col for schema in schemas for col in event_store.json_columns_of(schema)})
+    schema = pa.unify_schemas(schemas + [partitioning.schema], promote_options='permissive')
+    dataset = ds.dataset(root, schema=schema, format='parquet', partitioning=partitioning)
+
+    filter_expr = None
+    if season_id is not None:
+        filter_expr = ds.field('season_id') == season_id
+    if match_ids is not None:
+        match_filter = ds.field('match_id').isin([int(m) for m in match_ids])
+        filter_expr = match_filter if filter_expr is None else filter_expr & match_filter
+
+    table = dataset.to_table(columns=columns, filter=filter_expr)
+    return event_store.table_to_frame(table, json_columns=json_columns)
+
 # --------------------------
 # Función principal
 # --------------------------
-def main():
+def main(max_workers=None, stream=False):
+    """
+    Extrae todos los datos de la temporada.
+
+    Args:
+        max_workers: Número máximo de descargas simultáneas
+        stream: Si es True, los eventos se escriben partido a partido en el dataset
+            Parquet ``EVENTS_DATASET_DIR`` en lugar de acumularse en ``sb_events.csv``
+    """
     creds = get_credentials()
 
     # Extracción de datos
     matches = extract_matches(creds)
     available_ids = extract_available_ids(matches)
     
-    player_match_stats = extract_player_match_stats(creds, available_ids)
     competitions = extract_competitions(creds)
     player_season_stats = extract_player_season_stats(creds)
     team_season_stats = extract_team_season_stats(creds)
-    team_match_stats = extract_team_match_stats(player_match_stats)
-    events = extract_events(creds, available_ids)
-    lineups = extract_lineups(creds, available_ids)
+    versions = dict(zip(matches['match_id'], matches['last_updated'])) if 'last_updated' in matches.columns else None
+    # Solo se descargan los partidos que aún no están en la tabla team_match_stats
+    team_match_stats = update_team_match_stats(available_ids, versions, creds=creds, max_workers=max_workers)
+    player_match_stats = load_player_match_stats(available_ids, versions)
+    if stream:
+        stream_events_to_dataset(creds, available_ids, max_workers=max_workers)
+    else:
+        events = extract_events(creds, available_ids, max_workers=max_workers)
+    lineups = extract_lineups(creds, available_ids, max_workers=max_workers)
     
     # Exportación a CSV (ajusta las rutas según necesites)
     export_csv(matches, 'outs_data/sb_matches.csv')
@@ -253,7 +496,8 @@ def main():
     export_csv(player_season_stats, 'outs_data/sb_player_season_stats.csv')
     export_csv(team_season_stats, 'outs_data/sb_team_season_stats.csv')
     export_csv(team_match_stats, 'outs_data/sb_team_match_stats.csv')
-    export_csv(events, 'outs_data/sb_events.csv')
+    if not stream:
+        export_csv(events, 'outs_data/sb_events.csv')
     export_csv(lineups, 'outs_data/sb_lineups.csv')
     
 def extract_matches_only(creds):
@@ -274,10 +518,10 @@ def extract_match_specific_data(creds, match_id):
     Returns:
         dict: Diccionario con todos los datos del partido
     """
-    # Obtener datos específicos del partido
-    player_match_stats = extract_player_match_stats(creds, [match_id])
-    team_match_stats = extract_team_match_stats(player_match_stats)
-    events = extract_events(creds, [match_id])
+    # Obtener datos específicos del partido (eventos y estadísticas desde la caché local)
+    player_match_stats = event_store.get_player_match_stats(match_id, creds)
+    team_match_stats = get_team_match_stats(match_id, creds)
+    events = event_store.get_events(match_id, creds, full_width=True)
     lineups = extract_lineups(creds, [match_id])
 
     match_data = {
@@ -289,678 +533,418 @@ def extract_match_specific_data(creds, match_id):
     
     return match_data
 
-def update_matches_only():
+def diff_matches(old_matches, new_matches):
     """
-    Actualiza únicamente el archivo de matches sin extraer todo el resto de datos.
-    """
-    creds = get_credentials()
-    matches = extract_matches_only(creds)
-    export_csv(matches, 'outs_data/sb_matches.csv')
-    print("Archivo de matches actualizado exitosamente.")
+    Compara dos listas de partidos usando las columnas de MATCH_VERSION_COLUMNS.
 
-def extract_historical_team_stats(creds, match_ids):
-    """
-    Extrae estadísticas de equipo para múltiples partidos específicos.
-    
     Args:
-        creds: Credenciales de la API
-        match_ids: Lista de IDs de partidos
-        
-    Returns:
-        pd.DataFrame: DataFrame con estadísticas de equipo de todos los partidos
-    """
-    all_team_stats = pd.DataFrame()
-    
-    for match_id in match_ids:
-        try:
-            print(f'Obteniendo estadísticas históricas para partido {match_id}...')
-            # Obtener estadísticas de jugadores para este partido
-            player_match_stats = extract_player_match_stats(creds, [match_id])
-            # Convertir a estadísticas de equipo
-            team_match_stats = extract_team_match_stats(player_match_stats)
-            # Concatenar con el DataFrame principal
-            all_team_stats = pd.concat([all_team_stats, team_match_stats], ignore_index=True)
-        except Exception as e:
-            print(f'Error al obtener datos del partido {match_id}: {e}')
-            continue
-    
-    return all_team_stats
+        old_matches: Lista de partidos almacenada
+        new_matches: Lista de partidos recién descargada
 
-# --------------------------
-# Funciones de análisis mejorado
-# --------------------------
-def get_general_analysis(events):
-    """
-    Obtiene análisis general del partido incluyendo formaciones y goles.
-    
-    Args:
-        creds: Credenciales de la API
-        match_id: ID del partido
-        
     Returns:
-        dict: Diccionario con formaciones y datos de goles
+        dict: IDs de partidos 'new', 'changed' y 'removed'
     """
+    if old_matches.empty or 'match_id' not in old_matches.columns:
+        return {'new': new_matches['match_id'].tolist(), 'changed': [], 'removed': []}
 
-    print(events.columns)
-    goals = events[(events['type'] == 'Shot') & (events['shot_outcome'] == 'Goal')]
-    starting_xi = events[events['type'] == 'Starting XI']
-    
-    print("--------------------------------")
-    print(starting_xi)
-    # Extract formations
-    formations = {}
-    for _, row in starting_xi.iterrows():
-        team = row['team']
-        tactics = row.get('tactics', {})
-        formation = tactics.get('formation')
-        formations[team] = formation
-    
-    # Extract goal data
-    goal_data = []
-    for _, goal in goals.iterrows():
-        goal_info = {
-            'minute': goal.get('minute', ''),
-            'second': goal.get('second', ''),
-            'team': goal.get('team', {}).get('name', '') if isinstance(goal.get('team'), dict) else goal.get('team', ''),
-            'player': goal.get('player', {}).get('name', '') if isinstance(goal.get('player'), dict) else goal.get('player', '')
-        }
-        goal_data.append(goal_info)
+    columns = [col for col in MATCH_VERSION_COLUMNS if col in old_matches.columns and col in new_matches.columns]
+    old = old_matches.set_index('match_id')[columns].fillna('').astype(str)
+    new = new_matches.set_index('match_id')[columns].fillna('').astype(str)
+
+    common = new.index.intersection(old.index)
+    changed = (new.loc[common] != old.loc[common]).any(axis=1)
 
     return {
-        'formations': formations, 
-        'goals': goal_data,
-        'total_goals': len(goal_data)
+        'new': new.index.difference(old.index).tolist(),
+        'changed': changed[changed].index.tolist(),
+        'removed': old.index.difference(new.index).tolist()
     }
 
-def get_general_offensive_analysis(events):
+def sync_matches(creds=None, filepath=MATCHES_CSV):
     """
-    Obtiene análisis ofensivo general del partido para ambos equipos.
-    
-    Args:
-        creds: Credenciales de la API
-        match_id: ID del partido
-        
+    Sincroniza la lista de partidos de forma incremental.
+
+    Descarga la lista actual, la compara con la almacenada y solo reescribe el
+    archivo si hay diferencias. Los datos en caché de los partidos nuevos o
+    modificados (eventos y análisis calculados) se invalidan para no servir datos
+    corregidos desde una caché vieja, y solo esos partidos se añaden a la tabla
+    ``team_match_stats`` y a las huellas; la carga completa queda para ``main`` y
+    ``backfill``.
+
     Returns:
-        dict: Diccionario con estadísticas ofensivas generales
+        dict: IDs de partidos 'new', 'changed' y 'removed'
     """
-    
-    # Get all shots and passes
-    shots = events[events['type'] == 'Shot']
-    passes = events[events['type'] == 'Pass']
-    
-    # Successful passes are those where pass_outcome is NaN
-    successful_passes = passes[passes['pass_outcome'].isna()]
-    
-    # Long passes are those with pass_length > 20
-    long_passes = passes[passes['pass_length'] > 20]
-    successful_long_passes = successful_passes[successful_passes['pass_length'] > 20]
-
-    key_stats = {
-        'total_shots': len(shots),
-        'total_passes': len(passes),
-        'successful_passes': len(successful_passes),
-        'pass_accuracy': len(successful_passes) / len(passes) if len(passes) > 0 else 0,
-        'long_passes': len(long_passes),
-        'successful_long_passes': len(successful_long_passes),
-        'long_pass_accuracy': len(successful_long_passes) / len(long_passes) if len(long_passes) > 0 else 0,
-        'xG_total': shots['shot_statsbomb_xg'].sum().round(2) if 'shot_statsbomb_xg' in shots.columns else 0
-    }
+    creds = creds or get_credentials()
+    new_matches = extract_matches_only(creds)
+    old_matches = pd.read_csv(filepath) if os.path.exists(filepath) else pd.DataFrame()
+
+    delta = diff_matches(old_matches, new_matches)
+    if delta['new'] or delta['changed'] or delta['removed']:
+        export_csv(new_matches, filepath)
+    event_store.invalidate(delta['new'] + delta['changed'] + delta['removed'])
+    analysis_cache.invalidate(delta['new'] + delta['changed'] + delta['removed'])
+
+    # Solo los partidos nuevos o corregidos; los informes solo leen estas tablas
+    updated = delta['new'] + delta['changed']
+    available = new_matches
+    if 'match_status' in available.columns:
+        available = available[available['match_status'] == 'available']
+    versions = dict(zip(available['match_id'], available['last_updated'])) if 'last_updated' in available.columns else None
+    try:
+        update_team_match_stats(available['match_id'], versions, creds=creds, only=updated)
+    except Exception as e:
+        print(f'Error al actualizar team_match_stats: {e}')
+    # Huellas de los partidos cuyos eventos ya están en el dataset Parquet
+    try:
+        if updated:
+            fingerprints.refresh_fingerprints(EVENTS_DATASET_DIR, read_match_dataset, versions=versions,
+                                              match_ids=updated)
+    except Exception as e:
+        print(f'Error al actualizar las huellas de los partidos: {e}')
+
+    print(f"Partidos nuevos: {len(delta['new'])}, actualizados: {len(delta['changed'])}, eliminados: {len(delta['removed'])}")
+    return delta
 
-    # Get top shooters
-    top_shooters = shots['player'].apply(lambda x: x.get('name') if isinstance(x, dict) else x).value_counts().head(3)
-    
-    # Get top passers
-    passes['player_name'] = passes['player'].apply(lambda x: x.get('name') if isinstance(x, dict) else x)
-    successful_passes['player_name'] = successful_passes['player'].apply(lambda x: x.get('name') if isinstance(x, dict) else x)
-    
-    total_passes_per_player = passes['player_name'].value_counts()
-    successful_passes_per_player = successful_passes['player_name'].value_counts()
-    
-    passing_stats = pd.DataFrame({
-        'total_passes': total_passes_per_player,
-        'successful_passes': successful_passes_per_player
-    }).fillna(0)
-    
-    passing_stats['pass_success_pct'] = (passing_stats['successful_passes'] / passing_stats['total_passes'] * 100).round(1)
-    top_passers = passing_stats.nlargest(3, 'total_passes')
+def update_matches_only():
+    """
+    Actualiza únicamente el archivo de matches sin extraer todo el resto de datos.
 
-    return {
-        'key_stats': key_stats,
-        'top_shooters': top_shooters,
-        'top_passers': top_passers
-    }
+    Returns:
+        dict: IDs de partidos 'new', 'changed' y 'removed' (ver ``sync_matches``)
+    """
+    delta = sync_matches()
+    print("Archivo de matches actualizado exitosamente.")
+    return delta
 
-def get_general_defensive_analysis(events):
+def get_team_match_stats(match_id, creds=None, version=None):
     """
-    Obtiene análisis defensivo general del partido para ambos equipos.
-    
+    Estadísticas de equipo de un partido, guardadas en el almacén local (dataset
+    'team_match_stats') la primera vez que se calculan.
+
     Args:
-        creds: Credenciales de la API
         match_id: ID del partido
-        
+        creds: Credenciales de la API; sin ellas solo se usan datos ya almacenados
+        version: ``last_updated`` del partido
+
     Returns:
-        dict: Diccionario con estadísticas defensivas generales
+        pd.DataFrame | None: Una fila por equipo, o None si el partido no está en el
+            almacén y no hay credenciales para descargarlo
     """
-    
-    # Get different types of defensive events
-    pressures = events[events['type'] == 'Pressure']
-    duels = events[events['type'] == 'Duel']
-    blocks = events[events['type'] == 'Block']
-    interceptions = events[events['type'] == 'Interception']
-    ball_recoveries = events[events['type'] == 'Ball Recovery']
-    clearances = events[events['type'] == 'Clearance']
-    
-    successful_pressures = pressures[pressures['counterpress'] == True]
-    won_duels = duels[duels['duel_outcome'].apply(lambda x: x == 'Won' or x == "Success In Play")]
-
-    key_stats = {
-        'pressures': len(pressures),
-        'successful_pressures': len(successful_pressures),
-        'pressure_success_rate': len(successful_pressures) / len(pressures) if len(pressures) > 0 else 0,
-        'duels': len(duels),
-        'won_duels': len(won_duels),
-        'duel_success_rate': len(won_duels) / len(duels) if len(duels) > 0 else 0,
-        'blocks': len(blocks),
-        'interceptions': len(interceptions),
-        'ball_recoveries': len(ball_recoveries),
-        'clearances': len(clearances)
-    }
+    stats = event_store.load('team_match_stats', match_id, version=version)
+    if stats is not None:
+        return stats
+    if creds is not None:
+        player_match_stats = event_store.get_player_match_stats(match_id, creds, version=version)
+    else:
+        player_match_stats = event_store.load('player_match_stats', match_id, version=version)
+    if player_match_stats is None or player_match_stats.empty:
+        return None
+    stats = extract_team_match_stats(player_match_stats)
+    event_store.save('team_match_stats', match_id, stats, version=version)
+    return stats
+
+def extract_historical_team_stats(creds, match_ids, max_workers=None):
+    """
+    Extrae estadísticas de equipo para múltiples partidos específicos.
 
-    # Get top defenders
-    pressures_per_player = pressures['player'].value_counts()
-    duels_per_player = duels['player'].value_counts()
-    interceptions_per_player = interceptions['player'].value_counts()
-    
-    defensive_stats = pd.DataFrame({
-        'pressures': pressures_per_player,
-        'duels': duels_per_player,
-        'interceptions': interceptions_per_player
-    }).fillna(0)
-    
-    defensive_stats['total_defensive_actions'] = (defensive_stats['pressures'] + 
-                                                 defensive_stats['duels'] + 
-                                                 defensive_stats['interceptions'])
-    
-    top_defenders = defensive_stats.nlargest(3, 'total_defensive_actions')
+    Las estadísticas de cada partido se leen del almacén local (o se calculan una
+    vez y se guardan) en paralelo con ``fetch_concurrently``.
 
-    return {
-        'key_stats': key_stats,
-        'top_defenders': top_defenders
-    }
-
-def get_general_transitions_analysis(events):
-    """
-    Obtiene análisis de transiciones general del partido para ambos equipos.
-    
     Args:
-        creds: Credenciales de la API
-        match_id: ID del partido
-        
+        creds: Credenciales de la API (None para usar solo datos almacenados)
+        match_ids: Lista de IDs de partidos
+        max_workers: Número máximo de descargas simultáneas
+
     Returns:
-        dict: Diccionario con estadísticas de transiciones generales
+        pd.DataFrame: DataFrame con estadísticas de equipo de todos los partidos
     """
-    
-    # Get transition-related events
-    ball_recoveries = events[events['type'] == 'Ball Recovery']
-    carries = events[events['type'] == 'Carry']
-    pressures = events[events['type'] == 'Pressure']
-    interceptions = events[events['type'] == 'Interception']
-    
-    successful_pressures = pressures[pressures['counterpress'] == True]
-
-    key_stats = {
-        'ball_recoveries': len(ball_recoveries),
-        'carries': len(carries),
-        'pressures': len(pressures),
-        'successful_pressures': len(successful_pressures),
-        'pressure_success_rate': len(successful_pressures) / len(pressures) if len(pressures) > 0 else 0,
-        'interceptions': len(interceptions)
-    }
-    
-    # Get top transition players
-    recoveries_per_player = ball_recoveries['player'].value_counts()
-    carries_per_player = carries['player'].value_counts()
-    pressures_per_player = pressures['player'].value_counts()
-    
-    transition_stats = pd.DataFrame({
-        'ball_recoveries': recoveries_per_player,
-        'carries': carries_per_player,
-        'pressures': pressures_per_player
-    }).fillna(0)
-    
-    transition_stats['total_transition_actions'] = (transition_stats['ball_recoveries'] + 
-                                                   transition_stats['carries'] + 
-                                                   transition_stats['pressures'])
-    
-    top_transition_players = transition_stats.nlargest(3, 'total_transition_actions')
+    def fetch(match_id):
+        try:
+            return get_team_match_stats(match_id, creds)
+        except Exception as e:
+            print(f'Error al obtener datos del partido {match_id}: {e}')
+            return None
 
-    return {
-        'key_stats': key_stats,
-        'top_transition_players': top_transition_players
-    }
+    frames = [frame for frame in fetch_concurrently(fetch, match_ids, max_workers=max_workers,
+                                                    label='team_match_stats') if frame is not None]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
 
-def get_general_set_pieces_analysis(events):
+# --------------------------
+# Funciones de análisis mejorado
+# --------------------------
+def general_summaries(events):
     """
-    Obtiene análisis de pelota parada general del partido para ambos equipos.
-    
+    Formaciones iniciales y goles de cada partido.
+
     Args:
-        creds: Credenciales de la API
-        match_id: ID del partido
-        
+        events: DataFrame de eventos de uno o varios partidos
+
     Returns:
-        dict: Diccionario con estadísticas de pelota parada generales
+        dict: {match_id: {'formations', 'goals', 'total_goals'}}
     """
-    
-    free_kicks = events[events['type'] == 'Foul Won']
+    match_ids = events['match_id'] if 'match_id' in events.columns else pd.Series(0, index=events.index)
+    is_goal = ((events['type'] == 'Shot') & (events['shot_outcome'] == 'Goal')).to_numpy(dtype=bool)
+    is_starting_xi = (events['type'] == 'Starting XI').to_numpy(dtype=bool)
 
-    # Analyze set pieces using play_pattern column
-    corners = events[(events['play_pattern'] == 'From Corner') & (events['type'] == 'Pass')]
-
-    shots_from_free_kicks = events[(events['type'] == 'Shot') & (events['play_pattern'] == 'From Free Kick')]
-    
-    # Get passes from free kicks by checking next events after free kicks
-    passes_from_free_kicks = pd.DataFrame()
-    for _, free_kick in free_kicks.iterrows():
-        # Get the next event after this free kick
-        next_event = events[events['id'] > free_kick['id']].iloc[0] if len(events[events['id'] > free_kick['id']]) > 0 else None
-        if next_event is not None and next_event['type'] == 'Pass' and pd.isna(next_event.get('pass_outcome')):
-            passes_from_free_kicks = pd.concat([passes_from_free_kicks, pd.DataFrame([next_event])], ignore_index=True)
-    
-    # Get shots from corners by checking next events after corners
-    shots_from_corners = pd.DataFrame()
-    for _, corner in corners.iterrows():
-        # Get the next event after this corner
-        next_event = events[events['id'] > corner['id']].iloc[0] if len(events[events['id'] > corner['id']]) > 0 else None
-        if next_event is not None and next_event['type'] == 'Shot':
-            shots_from_corners = pd.concat([shots_from_corners, pd.DataFrame([next_event])], ignore_index=True)
-    
-    print(shots_from_corners)
-    
-    
-    # Analyze passes from set pieces
-    
-    # Analyze successful passes from set pieces
-    if not corners.empty:
-        successful_passes_corners = corners[corners['pass_outcome'].isna()]
-    else:
-        successful_passes_corners = pd.DataFrame()
-    if not passes_from_free_kicks.empty:
-        successful_passes_free_kicks = passes_from_free_kicks[passes_from_free_kicks['pass_outcome'].isna()]
-    else:
-        successful_passes_free_kicks = pd.DataFrame()
-    
-    # Analyze goals from set pieces
-    if not shots_from_corners.empty:
-        goals_from_corners = shots_from_corners[shots_from_corners['shot_outcome'].apply(lambda x: x == 'Goal' if x else False)]
-    else:
-        goals_from_corners = pd.DataFrame()
-    if not shots_from_free_kicks.empty:
-        goals_from_free_kicks = shots_from_free_kicks[shots_from_free_kicks['type'].apply(lambda x: x == 'Goal' if x else False)]
-    else:
-        goals_from_free_kicks = pd.DataFrame()
-    
-    # Analyze crosses
-    crosses = events[events['pass_cross'] == True]
-    successful_crosses = crosses[crosses['pass_outcome'].isna()]
-    
-    key_stats = {
-        'total_set_piece_events': len(corners) + len(free_kicks),
-        'corners': len(corners),
-        'free_kicks': len(free_kicks),
-        'shots_from_free_kicks': len(shots_from_free_kicks),
-        'goals_from_corners': len(goals_from_corners),
-        'goals_from_free_kicks': len(goals_from_free_kicks),
-        'total_goals_from_set_pieces': len(goals_from_corners) + len(goals_from_free_kicks),
-        'passes_from_free_kicks': len(passes_from_free_kicks),
-        'successful_passes_corners': len(successful_passes_corners),
-        'successful_passes_free_kicks': len(successful_passes_free_kicks),
-        'free_kick_pass_accuracy': len(successful_passes_free_kicks) / len(passes_from_free_kicks) if len(passes_from_free_kicks) > 0 else 0,
-        'crosses': len(crosses),
-        'successful_crosses': len(successful_crosses),
-        'cross_accuracy': len(successful_crosses) / len(crosses) if len(crosses) > 0 else 0
-    }
+    summaries = {int(match_id): {'formations': {}, 'goals': [], 'total_goals': 0} for match_id in match_ids.unique()}
+    for match_id, team, tactics in zip(match_ids[is_starting_xi], events['team'][is_starting_xi],
+                                       events['tactics'][is_starting_xi]):
+        summaries[int(match_id)]['formations'][str(team)] = tactics.get('formation') if isinstance(tactics, dict) else None
 
-    return {
-        'key_stats': key_stats,
-    }
+    goals = events.loc[is_goal, ['minute', 'second', 'team', 'player']].astype(object)
+    for match_id, goal in zip(match_ids[is_goal], goals.to_dict('records')):
+        summaries[int(match_id)]['goals'].append(goal)
+        summaries[int(match_id)]['total_goals'] += 1
+    return summaries
 
-def get_offensive_analysis(events):
+def get_general_analysis(events):
     """
-    Obtiene análisis ofensivo detallado del partido para Audax Italiano.
+    Obtiene análisis general del partido incluyendo formaciones y goles.
     
     Args:
-        creds: Credenciales de la API
-        match_id: ID del partido
+        events: DataFrame de eventos del partido
         
     Returns:
-        dict: Diccionario con estadísticas ofensivas y top jugadores
+        dict: Diccionario con formaciones y datos de goles
     """
-    events_audax = events[events['team'] == 'Audax Italiano']
-    shots = events_audax[events_audax['type'] == 'Shot']
-    passes = events_audax[events_audax['type'] == 'Pass']
-    
-    
-    # Successful passes are those where pass_outcome is NaN (no outcome means successful)
-    successful_passes = passes[passes['pass_outcome'].isna()]
-    
-    # Long passes are those with pass_length > 20
-    long_passes = passes[passes['pass_length'] > 20]
-    successful_long_passes = successful_passes[successful_passes['pass_length'] > 20]
-
-    key_stats = {
-        'total_shots': len(shots),
-        'total_passes': len(passes),
-        'successful_passes': len(successful_passes),
-        'pass_accuracy': len(successful_passes) / len(passes) if len(passes) > 0 else 0,
-        'long_passes': len(long_passes),
-        'successful_long_passes': len(successful_long_passes),
-        'long_pass_accuracy': len(successful_long_passes) / len(long_passes) if len(long_passes) > 0 else 0,
-        'xG_total': shots['shot_statsbomb_xg'].sum().round(2) if 'shot_statsbomb_xg' in shots.columns else 0
-    }
-
-    # Get top shooters
-    top_shooters = shots['player'].apply(lambda x: x.get('name') if isinstance(x, dict) else x).value_counts().head(3)
-    
-    # Calculate passing statistics for each player
-    # Extract player names from passes
-    passes['player_name'] = passes['player'].apply(lambda x: x.get('name') if isinstance(x, dict) else x)
-    successful_passes['player_name'] = successful_passes['player'].apply(lambda x: x.get('name') if isinstance(x, dict) else x)
-    
-    # Count total passes and successful passes per player
-    total_passes_per_player = passes['player_name'].value_counts()
-    successful_passes_per_player = successful_passes['player_name'].value_counts()
-    
-    # Create a DataFrame with passing statistics
-    passing_stats = pd.DataFrame({
-        'total_passes': total_passes_per_player,
-        'successful_passes': successful_passes_per_player
-    }).fillna(0)
-    
-    # Calculate pass success percentage
-    passing_stats['pass_success_pct'] = (passing_stats['successful_passes'] / passing_stats['total_passes'] * 100).round(1)
-    
-    # Get top passers by total passes
-    top_passers_total = passing_stats.nlargest(3, 'total_passes')
-    
-    # Get top passers by success percentage (minimum 5 passes)
-    top_passers_accuracy = passing_stats[passing_stats['total_passes'] >= 5].nlargest(3, 'pass_success_pct')
+    summaries = general_summaries(events)
+    return next(iter(summaries.values())) if summaries else {'formations': {}, 'goals': [], 'total_goals': 0}
 
+def team_events(events, team_id):
+    """Eventos de un equipo (todos si ``team_id`` es None)."""
+    if team_id is None:
+        return events
+    return events[(events['team_id'] == team_id).fillna(False).to_numpy(dtype=bool)]
 
-    return {
-        'key_stats': key_stats,
-        'top_shooters': top_shooters,
-        'top_passers_total': top_passers_total,
-        'top_passers_accuracy': top_passers_accuracy,
-        'all_passing_stats': passing_stats
-    }
+def _match_ids(events):
+    return events['match_id'] if 'match_id' in events.columns else pd.Series(0, index=events.index)
 
-def get_defensive_analysis(events):
+def pressured_rival_carries(events, team_id):
     """
-    Obtiene análisis defensivo detallado del partido para Audax Italiano.
-    
-    Args:
-        creds: Credenciales de la API
-        match_id: ID del partido
-        
+    Conducciones del rival con al menos una presión del equipo enlazada en
+    ``related_events``, por partido.
+
     Returns:
-        dict: Diccionario con estadísticas defensivas y top defensores
+        pd.Series: Conteo indexado por match_id
     """
-    events_audax = events[events['team'] == 'Audax Italiano']
-    
-    # Get different types of defensive events
-    pressures = events_audax[events_audax['type'] == 'Pressure']
-    duels = events_audax[events_audax['type'] == 'Duel']
-    blocks = events_audax[events_audax['type'] == 'Block']
-    interceptions = events_audax[events_audax['type'] == 'Interception']
-    ball_recoveries = events_audax[events_audax['type'] == 'Ball Recovery']
-    clearances = events_audax[events_audax['type'] == 'Clearance']
-    
-
-    successful_pressures = pressures[pressures['counterpress'] == True]
-
+    graph = graph_for(events)
+    team_ids = graph.events['team_id']
+    is_rival_carry = ((graph.events['type'] == 'Carry') & (team_ids != team_id)).fillna(False).to_numpy(dtype=bool)
+    pairs = graph.related_pairs(is_rival_carry, target_types=['Pressure'])
+    pairs = pairs[(team_ids.iloc[pairs['target']] == team_id).fillna(False).to_numpy(dtype=bool)]
+    match_ids = _match_ids(graph.events).to_numpy()
+    counts = pairs['source'].groupby(match_ids[pairs['source'].to_numpy()]).nunique()
+    return counts.reindex(_match_ids(events).unique(), fill_value=0).rename_axis('match_id')
+
+def chain_stats(events, team_id=None):
+    """
+    Posesiones tras recuperación y contragolpes por partido (las cadenas se
+    comparten con las figuras de transiciones).
 
-    won_duels = duels[duels['duel_outcome'].apply(lambda x: x == 'Won' or x == "Success In Play")]
-    
-    # Aerial duels
-    aerial_duels = len(events[events['duel_type'].apply(lambda x: x == 'Aerial Lost')])
-    won_aerial_duels = aerial_duels - len(duels[duels['duel_type'].apply(lambda x: x == 'Aerial Lost')])
-
-    key_stats = {
-        'pressures': len(pressures),
-        'successful_pressures': len(successful_pressures),
-        'pressure_success_rate': len(successful_pressures) / len(pressures) if len(pressures) > 0 else 0,
-        'duels': len(duels),
-        'won_duels': len(won_duels),
-        'duel_success_rate': len(won_duels) / len(duels) if len(duels) > 0 else 0,
-        'aerial_duels': aerial_duels,
-        'won_aerial_duels': won_aerial_duels,
-        'aerial_success_rate': won_aerial_duels / aerial_duels if aerial_duels > 0 else 0,
-        'blocks': len(blocks),
-        'interceptions': len(interceptions),
-        'ball_recoveries': len(ball_recoveries),
-        'clearances': len(clearances)
-    }
+    Returns:
+        pd.DataFrame: Estadísticas indexadas por match_id
+    """
+    columns = ['possessions_from_regains', 'regains_ending_in_shot', 'counterattacks',
+               'counterattacks_ending_in_shot', 'counterattack_avg_duration']
+    match_ids = _match_ids(events).unique()
+    chains = chains_for(events)
+    if chains.empty:
+        return pd.DataFrame(0, index=pd.Index(match_ids, name='match_id'), columns=columns)
+    if team_id is not None:
+        chains = chains[(chains['team_id'] == team_id).fillna(False).to_numpy(dtype=bool)]
+
+    regains = chains['regain'].to_numpy(dtype=bool)
+    counters = chains['counterattack'].to_numpy(dtype=bool)
+    shots = chains['ended_in_shot'].to_numpy(dtype=bool)
+    stats = pd.DataFrame({
+        'possessions_from_regains': regains,
+        'regains_ending_in_shot': regains & shots,
+        'counterattacks': counters,
+        'counterattacks_ending_in_shot': counters & shots,
+        'counter_duration': np.where(counters, chains['duration'].to_numpy(dtype=float), 0.0),
+    }).groupby(chains['match_id'].to_numpy()).sum()
+    stats['counterattack_avg_duration'] = (
+        stats.pop('counter_duration') / stats['counterattacks'].where(stats['counterattacks'] > 0)).fillna(0).round(1)
+    stats[columns[:4]] = stats[columns[:4]].astype(int)
+    return stats[columns].reindex(match_ids, fill_value=0).rename_axis('match_id')
+
+def set_piece_stats(events, by_match=False):
+    """
+    Estadísticas de pelota parada de un conjunto de eventos (un equipo o ambos).
 
+    Cada falta recibida y cada córner se enlaza con el evento siguiente mediante
+    ``shift`` sobre los eventos ordenados por ``index``, y cada saque (córner o tiro
+    libre en pase) con los tiros de su posesión, sin recorrer los eventos fila a fila.
 
+    Args:
+        events: DataFrame de eventos de uno o varios partidos
+        by_match: Devolver un DataFrame indexado por match_id en lugar de un dict
 
+    Returns:
+        dict | pd.DataFrame: Estadísticas clave de pelota parada
+    """
+    events = order_events(events)
+    match_ids = _match_ids(events)
+    following = next_events(events, columns=['type', 'pass_outcome', 'shot_outcome'])
+
+    is_free_kick = events['type'] == 'Foul Won'
+    is_corner = (events['play_pattern'] == 'From Corner') & (events['type'] == 'Pass')
+    is_free_kick_shot = (events['type'] == 'Shot') & (events['play_pattern'] == 'From Free Kick')
+    # Pase inmediatamente después de una falta recibida
+    is_pass_from_free_kick = is_free_kick & (following['type'] == 'Pass')
+    # Tiro inmediatamente después de un córner
+    is_shot_from_corner = is_corner & (following['type'] == 'Shot')
+    is_cross = events['pass_cross'] == True
+
+    counts = pd.DataFrame({
+        'corners': is_corner,
+        'free_kicks': is_free_kick,
+        'shots_from_free_kicks': is_free_kick_shot,
+        'goals_from_corners': is_shot_from_corner & (following['shot_outcome'] == 'Goal'),
+        'goals_from_free_kicks': is_free_kick_shot & (events['shot_outcome'] == 'Goal'),
+        'passes_from_free_kicks': is_pass_from_free_kick,
+        'successful_passes_free_kicks': is_pass_from_free_kick & following['pass_outcome'].isna(),
+        'successful_passes_corners': is_corner & events['pass_outcome'].isna(),
+        'crosses': is_cross,
+        'successful_crosses': is_cross & events['pass_outcome'].isna(),
+    }).fillna(False).astype(int).groupby(match_ids.to_numpy()).sum()
+
+    # Tiros en la misma posesión que el saque
+    restart_type = events['pass_type'] if 'pass_type' in events.columns else pd.Series(index=events.index, dtype=object)
+    for name, restart in (('shots_after_corners', 'Corner'), ('shots_after_free_kicks', 'Free Kick')):
+        shots = restart_sequences(events, (restart_type == restart).to_numpy(dtype=bool), types=['Shot'])
+        counts[name] = shots.groupby(_match_ids(shots).to_numpy()).size().reindex(counts.index, fill_value=0)
+
+    stats = pd.DataFrame({
+        'total_set_piece_events': counts['corners'] + counts['free_kicks'],
+        'corners': counts['corners'],
+        'free_kicks': counts['free_kicks'],
+        'shots_from_free_kicks': counts['shots_from_free_kicks'],
+        'goals_from_corners': counts['goals_from_corners'],
+        'goals_from_free_kicks': counts['goals_from_free_kicks'],
+        'total_goals_from_set_pieces': counts['goals_from_corners'] + counts['goals_from_free_kicks'],
+        'passes_from_free_kicks': counts['passes_from_free_kicks'],
+        'successful_passes_corners': counts['successful_passes_corners'],
+        'successful_passes_free_kicks': counts['successful_passes_free_kicks'],
+        'free_kick_pass_accuracy': (counts['successful_passes_free_kicks'] /
+                                    counts['passes_from_free_kicks'].where(counts['passes_from_free_kicks'] > 0)).fillna(0),
+        'shots_after_corners': counts['shots_after_corners'],
+        'shots_after_free_kicks': counts['shots_after_free_kicks'],
+        'crosses': counts['crosses'],
+        'successful_crosses': counts['successful_crosses'],
+        'cross_accuracy': (counts['successful_crosses'] / counts['crosses'].where(counts['crosses'] > 0)).fillna(0),
+    }).rename_axis('match_id')
+    if by_match:
+        return stats
+    return first_row(stats) if not stats.empty else first_row(stats.reindex([0], fill_value=0))
+
+def get_season_analysis(events, team=None, per90=False, min_minutes=0, lineups=None, sections=None):
+    """
+    Calcula las secciones del análisis para todos los partidos de un DataFrame de
+    eventos concatenado (por ejemplo, una temporada leída con ``read_match_dataset``).
 
-    # Count defensive actions per player
-    pressures_per_player = pressures['player'].value_counts()
-    successful_pressures_per_player = successful_pressures['player'].value_counts()
-    duels_per_player = duels['player'].value_counts()
-    won_duels_per_player = won_duels['player'].value_counts()
-    blocks_per_player = blocks['player'].value_counts()
-    interceptions_per_player = interceptions['player'].value_counts()
-    ball_recoveries_per_player = ball_recoveries['player'].value_counts()
-    clearances_per_player = clearances['player'].value_counts()
+    Todas las estadísticas se obtienen con operaciones agrupadas por ``match_id``,
+    sin recorrer los partidos uno a uno.
 
-    
-    # Create comprehensive defensive stats DataFrame
-    defensive_stats = pd.DataFrame({
-        'pressures': pressures_per_player,
-        'successful_pressures': successful_pressures_per_player,
-        'duels': duels_per_player,
-        'won_duels': won_duels_per_player,
-        'blocks': blocks_per_player,
-        'interceptions': interceptions_per_player,
-        'ball_recoveries': ball_recoveries_per_player,
-        'clearances': clearances_per_player
-    }).fillna(0)
-    
-    # Calculate success rates
-    defensive_stats['pressure_success_rate'] = (defensive_stats['successful_pressures'] / defensive_stats['pressures'] * 100).round(1)
-    defensive_stats['duel_success_rate'] = (defensive_stats['won_duels'] / defensive_stats['duels'] * 100).round(1)
-    
-    # Calculate total defensive actions
-    defensive_stats['total_defensive_actions'] = (defensive_stats['pressures'] + defensive_stats['duels'] + 
-                                                 defensive_stats['blocks'] + defensive_stats['interceptions'] + 
-                                                 defensive_stats['ball_recoveries'] + defensive_stats['clearances'])
-    
-    # Get top defenders by different metrics
-    top_defenders_total_actions = defensive_stats.nlargest(3, 'total_defensive_actions')
-    top_defenders_pressures = defensive_stats.nlargest(3, 'pressures')
-    top_defenders_duels = defensive_stats.nlargest(3, 'duels')
-    top_defenders_interceptions = defensive_stats.nlargest(3, 'interceptions')
+    Args:
+        events: Eventos de varios partidos con columna ``match_id``
+        team: Nombre o ID del equipo analizado; None para ambos equipos
+        per90: Dar las tablas por jugador (y sus rankings) por 90 minutos
+        min_minutes: Minutos mínimos para aparecer en las tablas por 90
+        lineups: Alineaciones de los partidos (``extract_lineups``); sin ellas los minutos
+            salen de los eventos 'Starting XI' y 'Substitution'
+        sections: Secciones a calcular (por defecto todas las de ANALYSIS_SECTIONS)
 
+    Returns:
+        dict: {'general': {match_id: resumen}, 'offensive', 'defensive', 'transitions',
+            'set_pieces'}; en cada sección ``key_stats`` es un DataFrame indexado por
+            match_id y las tablas por jugador están indexadas por (match_id, player)
+    """
+    sections = list(sections or ANALYSIS_SECTIONS)
+    team_id = resolve_team(events, team)
+    registry = [name for name in sections if name in SECTIONS]
+    results = {}
+    if registry:
+        minutes = minutes_played(lineups, events) if per90 else None
+        results = evaluate_season(events, team=team_id, sections=registry, minutes=minutes, min_minutes=min_minutes)
+
+    if 'defensive' in results and team_id is not None:
+        defensive = results['defensive']['key_stats']
+        defensive['pressured_rival_carries'] = pressured_rival_carries(events, team_id).reindex(defensive.index)
+    if 'transitions' in results:
+        transitions = results['transitions']['key_stats']
+        results['transitions']['key_stats'] = transitions.join(chain_stats(events, team_id))
+
+    if 'set_pieces' in sections:
+        set_pieces = set_piece_stats(team_events(events, team_id), by_match=True)
+        if registry:
+            # Partidos analizados: todos, o solo aquellos en los que juega el equipo
+            set_pieces = set_pieces.reindex(results[registry[0]]['key_stats'].index, fill_value=0)
+        results['set_pieces'] = {'key_stats': set_pieces}
+    if 'general' in sections:
+        results['general'] = general_summaries(events)
+
+    return {name: results[name] for name in ANALYSIS_SECTIONS if name in results}
+
+def get_match_analysis(events, team=None, per90=False, min_minutes=0, lineups=None):
+    """
+    Calcula las cinco secciones del análisis (general, ataque, defensa, transiciones
+    y pelota parada) de un partido para un equipo o para ambos equipos.
 
-    return {
-        'key_stats': key_stats,
-        'top_defenders_total_actions': top_defenders_total_actions,
-        'top_defenders_pressures': top_defenders_pressures,
-        'top_defenders_duels': top_defenders_duels,
-        'top_defenders_interceptions': top_defenders_interceptions,
-        'all_defensive_stats': defensive_stats
-    }
+    Es ``get_season_analysis`` aplicado a un único partido: las métricas por equipo
+    y jugador salen de una única agregación del registro de ``data.metrics``.
 
-def get_transitions_analysis(events):
-    """
-    Obtiene análisis de transiciones del partido para Audax Italiano.
-    
     Args:
-        creds: Credenciales de la API
-        match_id: ID del partido
-        
+        events: DataFrame de eventos del partido
+        team: Nombre o ID del equipo analizado; None para analizar ambos equipos
+        per90, min_minutes, lineups: Tablas por jugador por 90 minutos (ver ``get_season_analysis``)
+
     Returns:
-        dict: Diccionario con estadísticas de transiciones
+        dict: {'general', 'offensive', 'defensive', 'transitions', 'set_pieces'}
     """
-    events_audax = events[events['team'] == 'Audax Italiano']
-    
-    # Get transition-related events
-    ball_recoveries = events_audax[events_audax['type'] == 'Ball Recovery']
-    carries = events_audax[events_audax['type'] == 'Carry']
-    pressures = events_audax[events_audax['type'] == 'Pressure']
-    interceptions = events_audax[events_audax['type'] == 'Interception']
-    
-    # Filter successful pressures (counterpress)
-    successful_pressures = pressures[pressures['counterpress'] == True]
-    
-    # Analyze carries by field zones
-    # Assuming location is [x, y] where x is distance from goal (0-100)
-    carries_from_def_3rd = carries[carries['location'].apply(lambda x: x[0] < 33 if x else False)]
-    carries_from_mid_3rd = carries[carries['location'].apply(lambda x: 33 <= x[0] <= 66 if x else False)]
-    carries_from_att_3rd = carries[carries['location'].apply(lambda x: x[0] > 66 if x else False)]
-    
-    # Analyze ball recoveries by field zones
-    recoveries_in_def_3rd = ball_recoveries[ball_recoveries['location'].apply(lambda x: x[0] < 33 if x else False)]
-    recoveries_in_mid_3rd = ball_recoveries[ball_recoveries['location'].apply(lambda x: 33 <= x[0] <= 66 if x else False)]
-    recoveries_in_att_3rd = ball_recoveries[ball_recoveries['location'].apply(lambda x: x[0] > 66 if x else False)]
-
-    key_stats = {
-        'ball_recoveries': len(ball_recoveries),
-        'recoveries_def_3rd': len(recoveries_in_def_3rd),
-        'recoveries_mid_3rd': len(recoveries_in_mid_3rd),
-        'recoveries_att_3rd': len(recoveries_in_att_3rd),
-        'carries': len(carries),
-        'carries_from_def_3rd': len(carries_from_def_3rd),
-        'carries_from_mid_3rd': len(carries_from_mid_3rd),
-        'carries_from_att_3rd': len(carries_from_att_3rd),
-        'pressures': len(pressures),
-        'successful_pressures': len(successful_pressures),
-        'pressure_success_rate': len(successful_pressures) / len(pressures) if len(pressures) > 0 else 0,
-        'interceptions': len(interceptions)
-    }
-    
-    # Count transition actions per player
-    recoveries_per_player = ball_recoveries['player'].value_counts()
-    carries_per_player = carries['player'].value_counts()
-    pressures_per_player = pressures['player'].value_counts()
-    successful_pressures_per_player = successful_pressures['player'].value_counts()
-    interceptions_per_player = interceptions['player'].value_counts()
-    
-    # Create comprehensive transition stats DataFrame
-    transition_stats = pd.DataFrame({
-        'ball_recoveries': recoveries_per_player,
-        'carries': carries_per_player,
-        'pressures': pressures_per_player,
-        'successful_pressures': successful_pressures_per_player,
-        'interceptions': interceptions_per_player
-    }).fillna(0)
-    
-    # Calculate success rates
-    transition_stats['pressure_success_rate'] = (transition_stats['successful_pressures'] / transition_stats['pressures'] * 100).round(1)
-    
-    # Calculate total transition actions
-    transition_stats['total_transition_actions'] = (transition_stats['ball_recoveries'] + transition_stats['carries'] + 
-                                                   transition_stats['pressures'] + transition_stats['interceptions'])
-    
-    # Get top players by different transition metrics
-    top_transition_players = transition_stats.nlargest(3, 'total_transition_actions')
-    top_recovery_players = transition_stats.nlargest(3, 'ball_recoveries')
-    top_carry_players = transition_stats.nlargest(3, 'carries')
-    top_pressure_players = transition_stats.nlargest(3, 'pressures')
-
+    season = get_season_analysis(events, team, per90=per90, min_minutes=min_minutes, lineups=lineups)
+    general = next(iter(season['general'].values())) if season['general'] else {}
     return {
-        'key_stats': key_stats,
-        'top_transition_players': top_transition_players,
-        'top_recovery_players': top_recovery_players,
-        'top_carry_players': top_carry_players,
-        'top_pressure_players': top_pressure_players,
-        'all_transition_stats': transition_stats
+        'general': general,
+        'offensive': match_view(season['offensive']),
+        'defensive': match_view(season['defensive']),
+        'transitions': match_view(season['transitions']),
+        'set_pieces': match_view(season['set_pieces']),
     }
 
-def get_set_pieces_analysis(events):
-    """
-    Obtiene análisis de pelota parada general del partido para ambos equipos.
-    
-    Args:
-        creds: Credenciales de la API
-        match_id: ID del partido
-        
-    Returns:
-        dict: Diccionario con estadísticas de pelota parada generales
-    """
+def _section_analysis(events, section, team, per90=False, min_minutes=0, lineups=None):
+    season = get_season_analysis(events, team, per90=per90, min_minutes=min_minutes, lineups=lineups,
+                                 sections=[section])
+    return match_view(season[section])
 
-    events = events[events['team'] == 'Audax Italiano'].reset_index(drop=True)
-    
-    free_kicks = events[events['type'] == 'Foul Won']
+def get_offensive_analysis(events, team=ANALYZED_TEAM, per90=False, min_minutes=0, lineups=None):
+    """Análisis ofensivo de un equipo; solo calcula esa sección (ver ``get_match_analysis``)."""
+    return _section_analysis(events, 'offensive', team, per90, min_minutes, lineups)
 
-    # Analyze set pieces using play_pattern column
-    corners = events[(events['play_pattern'] == 'From Corner') & (events['type'] == 'Pass')]
+def get_defensive_analysis(events, team=ANALYZED_TEAM, per90=False, min_minutes=0, lineups=None):
+    """Análisis defensivo de un equipo; solo calcula esa sección (ver ``get_match_analysis``)."""
+    return _section_analysis(events, 'defensive', team, per90, min_minutes, lineups)
 
-    shots_from_free_kicks = events[(events['type'] == 'Shot') & (events['play_pattern'] == 'From Free Kick')]
-    
-    # Get passes from free kicks by checking next events after free kicks
-    passes_from_free_kicks = pd.DataFrame()
-    for _, free_kick in free_kicks.iterrows():
-        # Get the next event after this free kick
-        next_event = events[events['id'] > free_kick['id']].iloc[0] if len(events[events['id'] > free_kick['id']]) > 0 else None
-        if next_event is not None and next_event['type'] == 'Pass' and pd.isna(next_event.get('pass_outcome')):
-            passes_from_free_kicks = pd.concat([passes_from_free_kicks, pd.DataFrame([next_event])], ignore_index=True)
-    
-    # Get shots from corners by checking next events after corners
-    shots_from_corners = pd.DataFrame()
-    for _, corner in corners.iterrows():
-        # Get the next event after this corner
-        next_event = events[events['id'] > corner['id']].iloc[0] if len(events[events['id'] > corner['id']]) > 0 else None
-        if next_event is not None and next_event['type'] == 'Shot':
-            shots_from_corners = pd.concat([shots_from_corners, pd.DataFrame([next_event])], ignore_index=True)
-    
-    print(shots_from_corners)
-    
-    
-    # Analyze passes from set pieces
-    
-    # Analyze successful passes from set pieces
-    if not corners.empty:
-        successful_passes_corners = corners[corners['pass_outcome'].isna()]
-    else:
-        successful_passes_corners = pd.DataFrame()
-    if not passes_from_free_kicks.empty:
-        successful_passes_free_kicks = passes_from_free_kicks[passes_from_free_kicks['pass_outcome'].isna()]
-    else:
-        successful_passes_free_kicks = pd.DataFrame()
-    
-    # Analyze goals from set pieces
-    if not shots_from_corners.empty:
-        goals_from_corners = shots_from_corners[shots_from_corners['shot_outcome'].apply(lambda x: x == 'Goal' if x else False)]
-    else:
-        goals_from_corners = pd.DataFrame()
-    if not shots_from_free_kicks.empty:
-        goals_from_free_kicks = shots_from_free_kicks[shots_from_free_kicks['type'].apply(lambda x: x == 'Goal' if x else False)]
-    else:
-        goals_from_free_kicks = pd.DataFrame()
-    
-    # Analyze crosses
-    crosses = events[events['pass_cross'] == True]
-    successful_crosses = crosses[crosses['pass_outcome'].isna()]
-    
-    key_stats = {
-        'total_set_piece_events': len(corners) + len(free_kicks),
-        'corners': len(corners),
-        'free_kicks': len(free_kicks),
-        'shots_from_free_kicks': len(shots_from_free_kicks),
-        'goals_from_corners': len(goals_from_corners),
-        'goals_from_free_kicks': len(goals_from_free_kicks),
-        'total_goals_from_set_pieces': len(goals_from_corners) + len(goals_from_free_kicks),
-        'passes_from_free_kicks': len(passes_from_free_kicks),
-        'successful_passes_corners': len(successful_passes_corners),
-        'successful_passes_free_kicks': len(successful_passes_free_kicks),
-        'free_kick_pass_accuracy': len(successful_passes_free_kicks) / len(passes_from_free_kicks) if len(passes_from_free_kicks) > 0 else 0,
-        'crosses': len(crosses),
-        'successful_crosses': len(successful_crosses),
-        'cross_accuracy': len(successful_crosses) / len(crosses) if len(crosses) > 0 else 0
-    }
+def get_transitions_analysis(events, team=ANALYZED_TEAM, per90=False, min_minutes=0, lineups=None):
+    """Análisis de transiciones de un equipo; solo calcula esa sección (ver ``get_match_analysis``)."""
+    return _section_analysis(events, 'transitions', team, per90, min_minutes, lineups)
 
-    return {
-        'key_stats': key_stats,
-    }
+def get_set_pieces_analysis(events, team=ANALYZED_TEAM):
+    """Análisis de pelota parada de un equipo (ver ``get_match_analysis``)."""
+    return {'key_stats': set_piece_stats(team_events(events, resolve_team(events, team)))}
+
+def get_general_offensive_analysis(events):
+    """Análisis ofensivo de ambos equipos."""
+    return get_offensive_analysis(events, team=None)
+
+def get_general_defensive_analysis(events):
+    """Análisis defensivo de ambos equipos."""
+    return get_defensive_analysis(events, team=None)
+
+def get_general_transitions_analysis(events):
+    """Análisis de transiciones de ambos equipos."""
+    return get_transitions_analysis(events, team=None)
+
+def get_general_set_pieces_analysis(events):
+    """Análisis de pelota parada de ambos equipos."""
+    return get_set_pieces_analysis(events, team=None)
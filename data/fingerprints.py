@@ -0,0 +1,274 @@
+"""
+Huella de cada partido y búsqueda de partidos parecidos.
+
+La huella es un vector corto de rasgos del partido (reparto de la posesión y del
+xG, tiros, presión, recuperaciones altas, juego directo...) calculado con las
+estadísticas clave de las secciones del análisis para cada equipo
+(``data.metrics.team_key_stats``). Los dos equipos se ordenan por posesión (primero
+el que más pasa), de modo que un partido y su versión "local/visitante invertida"
+tienen la misma huella.
+
+Las huellas se guardan en ``FINGERPRINTS_PATH`` (una fila por partido) y se
+calculan a partir del dataset Parquet de eventos al sincronizar la lista de
+partidos o en la carga histórica (``refresh_fingerprints``); la búsqueda de
+vecinos usa solo esa matriz, sin volver a cargar eventos.
+"""
+
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from data import event_store
+from data.dimensions import display_names
+from data.metrics import safe_ratio, team_key_stats
+
+FINGERPRINTS_PATH = os.getenv("SMARTAUDAX_FINGERPRINTS_PATH", "outs_data/match_fingerprints.parquet")
+
+# Partidos leídos del dataset de eventos en cada lote de ``refresh_fingerprints``
+FINGERPRINT_BATCH = 20
+
+# Rasgos de la huella; sufijo _a: equipo con más posesión, _b: su rival
+FINGERPRINT_FEATURES = [
+    'possession_a', 'xg_share_a', 'xg_a', 'xg_b', 'shots_a', 'shots_b',
+    'pass_accuracy_a', 'pass_accuracy_b', 'long_pass_share_a', 'long_pass_share_b',
+    'pressures_a', 'pressures_b', 'high_recoveries_a', 'high_recoveries_b',
+    'duel_success_a', 'duel_success_b', 'ppda_a', 'ppda_b',
+]
+
+_table_lock = threading.Lock()
+_indexes = {}
+
+
+def match_features(events):
+    """
+    Huellas de todos los partidos de ``events`` a partir de las estadísticas clave
+    de las secciones de cada equipo (una única agregación para todos los partidos).
+
+    Args:
+        events: Eventos de uno o varios partidos
+
+    Returns:
+        pd.DataFrame: Una fila por match_id con ``team_a_id``, ``team_b_id``, ``team_a``,
+            ``team_b`` y FINGERPRINT_FEATURES (solo partidos con dos equipos)
+    """
+    stats = team_key_stats(events, ['offensive', 'defensive', 'transitions'])
+    by_team = pd.DataFrame({
+        'passes': stats['offensive', 'total_passes'],
+        'pass_accuracy': stats['offensive', 'pass_accuracy'],
+        'long_passes': stats['offensive', 'long_passes'],
+        'shots': stats['offensive', 'total_shots'],
+        'xg': stats['offensive', 'xG_total'],
+        'pressures': stats['defensive', 'pressures'],
+        'won_duels': stats['defensive', 'won_duels'],
+        'duel_success': stats['defensive', 'duel_success_rate'],
+        'interceptions': stats['defensive', 'interceptions'],
+        'high_recoveries': stats['transitions', 'recoveries_att_3rd'],
+    }).reset_index()
+    by_team = by_team[by_team.groupby('match_id')['team_id'].transform('size') == 2]
+    if by_team.empty:
+        return pd.DataFrame(columns=['team_a_id', 'team_b_id', 'team_a', 'team_b'] + FINGERPRINT_FEATURES,
+                            index=pd.Index([], name='match_id'))
+
+    # Equipo 'a': el que más pasa en cada partido
+    by_team = by_team.sort_values(['match_id', 'passes', 'team_id'], ascending=[True, False, True], kind='stable')
+    rank = by_team.groupby('match_id').cumcount().to_numpy()
+    a = by_team[rank == 0].set_index('match_id')
+    b = by_team[rank == 1].set_index('match_id').reindex(a.index)
+
+    features = pd.DataFrame(index=a.index)
+    features['team_a_id'] = a['team_id'].astype('int64')
+    features['team_b_id'] = b['team_id'].astype('int64')
+    features['team_a'] = display_names(features['team_a_id'], kind='teams', events=events)
+    features['team_b'] = display_names(features['team_b_id'], kind='teams', events=events)
+    features['possession_a'] = safe_ratio(a['passes'], a['passes'] + b['passes'])
+    features['xg_share_a'] = safe_ratio(a['xg'], a['xg'] + b['xg'])
+    for suffix, own, rival in (('a', a, b), ('b', b, a)):
+        features[f'xg_{suffix}'] = own['xg'].to_numpy(dtype=float)
+        features[f'shots_{suffix}'] = own['shots'].to_numpy(dtype=float)
+        features[f'pass_accuracy_{suffix}'] = own['pass_accuracy'].to_numpy(dtype=float)
+        features[f'long_pass_share_{suffix}'] = safe_ratio(own['long_passes'], own['passes'])
+        features[f'pressures_{suffix}'] = own['pressures'].to_numpy(dtype=float)
+        features[f'high_recoveries_{suffix}'] = own['high_recoveries'].to_numpy(dtype=float)
+        features[f'duel_success_{suffix}'] = own['duel_success'].to_numpy(dtype=float)
+        # Pases del rival por acción defensiva propia (menos = presión más intensa)
+        features[f'ppda_{suffix}'] = safe_ratio(rival['passes'], own['won_duels'] + own['interceptions'])
+    return features[['team_a_id', 'team_b_id', 'team_a', 'team_b'] + FINGERPRINT_FEATURES]
+
+
+def load_fingerprints(path=FINGERPRINTS_PATH):
+    """Tabla de huellas almacenada (vacía si no existe)."""
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    return event_store.read_parquet(path).set_index('match_id')
+
+
+def _versions(versions):
+    return {int(k): (None if pd.isna(v) else str(v)) for k, v in (versions or {}).items()}
+
+
+def stale_matches(table, match_ids, versions=None):
+    """
+    Partidos de ``match_ids`` sin huella o con una huella de otra versión de los datos.
+
+    Args:
+        table: Tabla de huellas (``load_fingerprints``)
+        match_ids: IDs de partidos
+        versions: {match_id: last_updated}; sin él solo cuentan los partidos sin huella
+    """
+    match_ids = [int(m) for m in match_ids]
+    if table.empty:
+        return match_ids
+    stored = table['data_version'].to_dict()
+    if versions is None:
+        return [m for m in match_ids if m not in stored]
+    versions = _versions(versions)
+    return [m for m in match_ids if m not in stored or stored[m] != versions.get(m)]
+
+
+def update_fingerprints(events, path=FINGERPRINTS_PATH, versions=None, replace=False):
+    """
+    Añade las huellas de los partidos de ``events`` a la tabla almacenada.
+
+    Args:
+        events: Eventos de uno o varios partidos
+        path: Ruta de la tabla
+        versions: {match_id: last_updated} de los partidos; las huellas guardadas con
+            otra versión se recalculan
+        replace: Recalcular también los partidos que ya tienen huella de la misma versión
+
+    Returns:
+        pd.DataFrame: Tabla de huellas completa
+    """
+    with _table_lock:
+        table = load_fingerprints(path)
+        if not replace:
+            pending = stale_matches(table, events['match_id'].unique(), versions)
+            events = events[events['match_id'].isin(pending).to_numpy(dtype=bool)]
+        if events.empty:
+            return table
+        features = match_features(events)
+        if features.empty:
+            return table
+        features['data_version'] = features.index.map(_versions(versions)) if versions is not None else None
+        table = pd.concat([table[~table.index.isin(features.index)], features]).sort_index()
+        event_store.write_parquet(table.reset_index(), path)
+    return table
+
+
+class FingerprintIndex:
+    """Matriz estandarizada de huellas con búsqueda de los k partidos más parecidos."""
+
+    def __init__(self, table, features=None):
+        self.features = [col for col in (features or FINGERPRINT_FEATURES) if col in table.columns]
+        self.matches = table.drop(columns=self.features + ['data_version'], errors='ignore')
+        self._row = pd.Index(table.index)
+        values = table[self.features].to_numpy(dtype='float64')
+        self.mean = np.nanmean(values, axis=0) if len(values) else np.zeros(len(self.features))
+        std = np.nanstd(values, axis=0) if len(values) else np.ones(len(self.features))
+        self.std = np.where(std > 0, std, 1.0)
+        self.matrix = np.nan_to_num((values - self.mean) / self.std).astype(np.float32)
+
+    def __len__(self):
+        return len(self.matrix)
+
+    def __contains__(self, match_id):
+        return self._row.get_indexer([int(match_id)])[0] >= 0
+
+    def nearest(self, vector, k=5, exclude=None):
+        """
+        Partidos más cercanos a una huella estandarizada.
+
+        Args:
+            vector: Huella estandarizada (mismo orden que ``features``)
+            k: Número de resultados
+            exclude: match_id a excluir
+
+        Returns:
+            pd.DataFrame: Partidos ordenados por ``distance``
+        """
+        distances = np.sqrt(((self.matrix - np.asarray(vector, dtype=np.float32)) ** 2).sum(axis=1))
+        candidates = np.ones(len(self.matrix), dtype=bool)
+        if exclude is not None:
+            candidates &= self._row.to_numpy() != int(exclude)
+        rows = np.flatnonzero(candidates)
+        if not len(rows):
+            return self.matches.iloc[[]].assign(distance=[])
+        k = min(k, len(rows))
+        top = rows[np.argpartition(distances[rows], k - 1)[:k]]
+        top = top[np.argsort(distances[top], kind='stable')]
+        return self.matches.iloc[top].assign(distance=distances[top].round(3))
+
+    def similar(self, match_id, k=5):
+        """Los ``k`` partidos con la huella más parecida a la de ``match_id``."""
+        row = self._row.get_indexer([int(match_id)])[0]
+        if row < 0:
+            raise ValueError(f'El partido {match_id} no tiene huella calculada')
+        return self.nearest(self.matrix[row], k=k, exclude=match_id)
+
+    def vector(self, features):
+        """Estandariza una huella sin estandarizar (dict o Series de FINGERPRINT_FEATURES)."""
+        values = pd.Series(features).reindex(self.features).to_numpy(dtype='float64')
+        return np.nan_to_num((values - self.mean) / self.std)
+
+
+def fingerprint_index(path=FINGERPRINTS_PATH):
+    """
+    Índice de huellas de la tabla almacenada, reconstruido solo cuando la tabla cambia.
+
+    Returns:
+        FingerprintIndex | None: None si todavía no hay huellas
+    """
+    if not os.path.exists(path):
+        return None
+    mtime = os.path.getmtime(path)
+    cached = _indexes.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    index = FingerprintIndex(load_fingerprints(path))
+    _indexes[path] = (mtime, index)
+    return index
+
+
+def stored_matches(root, season_id=None):
+    """IDs de los partidos con eventos en el dataset Parquet (por sus particiones)."""
+    if not os.path.isdir(root):
+        return []
+    seasons = [f'season_id={season_id}'] if season_id is not None else os.listdir(root)
+    return sorted({int(name.split('=', 1)[1]) for season in seasons if os.path.isdir(os.path.join(root, season))
+                   for name in os.listdir(os.path.join(root, season)) if name.startswith('match_id=')})
+
+
+def refresh_fingerprints(root, read_dataset, season_id=None, path=FINGERPRINTS_PATH, versions=None,
+                         batch_size=FINGERPRINT_BATCH, match_ids=None):
+    """
+    Calcula las huellas de todos los partidos del dataset Parquet de eventos que
+    aún no la tienen (o cuya versión cambió), leyéndolos por lotes.
+
+    Args:
+        root: Carpeta del dataset de eventos
+        read_dataset: Lector del dataset con la firma de ``read_match_dataset``
+        season_id: Limitar a una temporada
+        path: Ruta de la tabla de huellas
+        versions: {match_id: last_updated} de los partidos
+        batch_size: Partidos leídos por lote
+        match_ids: Si se indica, solo se consideran estos partidos
+
+    Returns:
+        pd.DataFrame: Tabla de huellas completa
+    """
+    table = load_fingerprints(path)
+    stored = stored_matches(root, season_id)
+    if match_ids is not None:
+        match_ids = {int(id) for id in match_ids}
+        stored = [id for id in stored if id in match_ids]
+    pending = stale_matches(table, stored, versions)
+    if not pending:
+        return table
+    print(f'Calculando huellas de {len(pending)} partidos')
+    for start in range(0, len(pending), batch_size):
+        events = read_dataset(root, season_id=season_id, match_ids=pending[start:start + batch_size])
+        if not events.empty:
+            table = update_fingerprints(events, path, versions=versions, replace=True)
+    return table
@@ -0,0 +1,115 @@
+"""
+Alineaciones de StatsBomb como tabla larga.
+
+``sb.lineups`` devuelve un diccionario por equipo con la lista de jugadores y, en
+cada jugador, la lista de posiciones ocupadas. ``lineups_to_table`` lo convierte
+en una fila por (jugador, tramo en una posición) con las claves enteras
+``match_id``, ``team_id`` y ``player_id``, de modo que titulares, minutos y
+filtros por jugador se resuelven con máscaras y ``merge`` sobre la tabla.
+"""
+
+import numpy as np
+import pandas as pd
+
+from data.dimensions import load_dimension
+
+LINEUP_COLUMNS = [
+    'match_id', 'team_id', 'team', 'player_id', 'player_name', 'player_nickname', 'jersey_number',
+    'position_id', 'position', 'start_period', 'start_minute', 'end_period', 'end_minute',
+    'start_reason', 'end_reason', 'starter',
+]
+
+SORT_KEYS = ['match_id', 'team_id', 'player_id', 'start_period', 'start_minute']
+
+
+def _team_players(data):
+    """(team_id, lista de jugadores) para un equipo en el formato 'dict' o 'dataframe' de ``sb.lineups``."""
+    if isinstance(data, pd.DataFrame):
+        return None, data.to_dict('records')
+    return data.get('team_id'), data.get('lineup', [])
+
+
+def clock_to_minutes(values):
+    """Convierte relojes 'MM:SS' de StatsBomb en minutos decimales (NaN si falta)."""
+    clock = pd.Series(values, dtype=object).str.split(':', expand=True)
+    if clock.shape[1] < 2:
+        return pd.Series(np.nan, index=clock.index)
+    clock = clock.iloc[:, :2].apply(pd.to_numeric, errors='coerce')
+    return clock[0] + clock[1] / 60
+
+
+def lineups_to_table(lineups, match_id):
+    """
+    Normaliza la respuesta de ``sb.lineups`` de un partido en una tabla larga.
+
+    Los jugadores convocados que no jugaron aparecen con una única fila sin
+    posición ni minutos. ``end_minute`` nulo indica que el jugador terminó el partido.
+
+    Args:
+        lineups: Diccionario {equipo: alineación} devuelto por ``sb.lineups``
+        match_id: ID del partido
+
+    Returns:
+        pd.DataFrame: Columnas LINEUP_COLUMNS, ordenado por SORT_KEYS
+    """
+    rows = []
+    for team, data in lineups.items():
+        team_id, players = _team_players(data)
+        for player in players:
+            for spell in player.get('positions') or [{}]:
+                rows.append({
+                    'team_id': team_id,
+                    'team': team,
+                    'player_id': player.get('player_id'),
+                    'player_name': player.get('player_name'),
+                    'player_nickname': player.get('player_nickname'),
+                    'jersey_number': player.get('jersey_number'),
+                    'position_id': spell.get('position_id'),
+                    'position': spell.get('position'),
+                    'start_period': spell.get('from_period'),
+                    'start_clock': spell.get('from'),
+                    'end_period': spell.get('to_period'),
+                    'end_clock': spell.get('to'),
+                    'start_reason': spell.get('start_reason'),
+                    'end_reason': spell.get('end_reason'),
+                })
+    if not rows:
+        return pd.DataFrame(columns=LINEUP_COLUMNS)
+
+    table = pd.DataFrame(rows)
+    table['match_id'] = int(match_id)
+    if table['team_id'].isna().any():
+        # Formato 'dataframe' sin team_id: se resuelve con la dimensión de equipos
+        teams = load_dimension('teams')
+        team_ids = pd.Series(teams.index, index=teams.values)
+        team_ids = team_ids[~team_ids.index.duplicated()]
+        table['team_id'] = table['team_id'].fillna(table['team'].map(team_ids))
+    table['start_minute'] = clock_to_minutes(table.pop('start_clock')).to_numpy()
+    table['end_minute'] = clock_to_minutes(table.pop('end_clock')).to_numpy()
+    # Titular: el jugador empezó el partido, aunque luego cambiara de posición
+    starting = table['start_reason'] == 'Starting XI'
+    table['starter'] = starting.groupby(table['player_id']).transform('any').to_numpy()
+
+    table = table.astype({
+        'team_id': 'Int32', 'player_id': 'Int32', 'jersey_number': 'Int16', 'position_id': 'Int16',
+        'start_period': 'Int8', 'end_period': 'Int8',
+        'start_minute': 'float32', 'end_minute': 'float32',
+    })
+    return table[LINEUP_COLUMNS].sort_values(SORT_KEYS, ignore_index=True)
+
+
+def starters(lineups):
+    """Titulares: una fila por (partido, jugador) con su posición inicial."""
+    first = lineups[lineups['starter'] & (lineups['start_reason'] == 'Starting XI')]
+    return first.drop_duplicates(['match_id', 'player_id'], ignore_index=True)
+
+
+def players_used(lineups):
+    """Jugadores que participaron (titulares y suplentes que entraron), una fila por (partido, jugador)."""
+    played = lineups[lineups['position_id'].notna()]
+    return played.drop_duplicates(['match_id', 'player_id'], ignore_index=True)
+
+
+def for_players(lineups, player_ids):
+    """Filtra la tabla a los jugadores indicados."""
+    return lineups[lineups['player_id'].isin(list(player_ids))]
@@ -0,0 +1,355 @@
+"""
+Registro declarativo de las métricas del análisis por partido.
+
+Cada métrica se declara una sola vez en EVENT_METRICS (tipo de evento, condición
+y, opcionalmente, columna a sumar). ``metric_table`` evalúa todas las métricas
+sobre los eventos y las agrega en un único ``groupby`` por (equipo, jugador); las
+secciones (SECTIONS) solo describen qué totales, ratios y rankings se leen de esa
+tabla, para un equipo concreto o para ambos equipos a la vez.
+
+Añadir una métrica es añadir una entrada a EVENT_METRICS y referenciarla en la
+sección que corresponda.
+"""
+
+import numpy as np
+import pandas as pd
+
+from data.dimensions import display_names
+from data.event_frames import add_coordinate_columns
+from data.minutes import per90
+from data.zones import GRIDS, assign_zones
+
+SUCCESSFUL_DUEL_OUTCOMES = ['Won', 'Success In Play']
+
+# Tercios del análisis de transiciones (x < 33, 33 <= x <= 66, x > 66)
+TRANSITION_THIRDS = GRIDS['thirds']
+
+
+def _assisted_xg(events):
+    """xG del tiro generado por cada pase clave (unión por ``pass_assisted_shot_id``)."""
+    if 'pass_assisted_shot_id' not in events.columns or 'shot_statsbomb_xg' not in events.columns:
+        return np.full(len(events), np.nan)
+    shots = events[events['type'] == 'Shot']
+    return events['pass_assisted_shot_id'].map(shots.set_index('id')['shot_statsbomb_xg']).to_numpy(dtype=float)
+
+
+# Columnas auxiliares calculadas una vez antes de evaluar las métricas
+DERIVED_COLUMNS = {
+    'third': lambda e: assign_zones(e['location_x'], e['location_y'], TRANSITION_THIRDS),
+    'assisted_xg': _assisted_xg,
+}
+
+# Métricas por evento: 'type' (tipo o lista de tipos), 'where' (condición adicional)
+# y 'value' (columna a sumar; por defecto se cuentan eventos)
+EVENT_METRICS = {
+    # Ataque
+    'shots': {'type': 'Shot'},
+    'goals': {'type': 'Shot', 'where': lambda e: e['shot_outcome'] == 'Goal'},
+    'xg': {'type': 'Shot', 'value': 'shot_statsbomb_xg'},
+    'passes': {'type': 'Pass'},
+    'successful_passes': {'type': 'Pass', 'where': lambda e: e['pass_outcome'].isna()},
+    'long_passes': {'type': 'Pass', 'where': lambda e: e['pass_length'] > 20},
+    'successful_long_passes': {'type': 'Pass', 'where': lambda e: e['pass_outcome'].isna() & (e['pass_length'] > 20)},
+    'key_passes': {'type': 'Pass', 'where': lambda e: e['assisted_xg'].notna()},
+    'xa': {'type': 'Pass', 'value': 'assisted_xg'},
+    # Defensa
+    'pressures': {'type': 'Pressure'},
+    'successful_pressures': {'type': 'Pressure', 'where': lambda e: e['counterpress'] == True},
+    'duels': {'type': 'Duel'},
+    'won_duels': {'type': 'Duel', 'where': lambda e: e['duel_outcome'].isin(SUCCESSFUL_DUEL_OUTCOMES)},
+    'aerials_lost': {'where': lambda e: e['duel_type'] == 'Aerial Lost'},
+    'blocks': {'type': 'Block'},
+    'interceptions': {'type': 'Interception'},
+    'clearances': {'type': 'Clearance'},
+    # Transiciones
+    'ball_recoveries': {'type': 'Ball Recovery'},
+    'recoveries_def_3rd': {'type': 'Ball Recovery', 'where': lambda e: e['third'] == 0},
+    'recoveries_mid_3rd': {'type': 'Ball Recovery', 'where': lambda e: e['third'] == 1},
+    'recoveries_att_3rd': {'type': 'Ball Recovery', 'where': lambda e: e['third'] == 2},
+    'carries': {'type': 'Carry'},
+    'carries_from_def_3rd': {'type': 'Carry', 'where': lambda e: e['third'] == 0},
+    'carries_from_mid_3rd': {'type': 'Carry', 'where': lambda e: e['third'] == 1},
+    'carries_from_att_3rd': {'type': 'Carry', 'where': lambda e: e['third'] == 2},
+}
+
+# Secciones del informe. En 'key_stats' cada valor es el nombre de una métrica
+# (total del equipo), una tupla (numerador, denominador) o una función
+# f(propio, rival) sobre los totales por partido (DataFrames indexados por
+# match_id); si devuelve None la estadística se omite.
+# 'players' define la tabla por jugador: columnas (métrica), porcentajes
+# (numerador, denominador), sumas de columnas y rankings (columna, n, mínimo).
+SECTIONS = {
+    'offensive': {
+        'key_stats': {
+            'total_shots': 'shots',
+            'total_passes': 'passes',
+            'successful_passes': 'successful_passes',
+            'pass_accuracy': ('successful_passes', 'passes'),
+            'long_passes': 'long_passes',
+            'successful_long_passes': 'successful_long_passes',
+            'long_pass_accuracy': ('successful_long_passes', 'long_passes'),
+            'xG_total': lambda own, rival: own['xg'].round(2),
+            'key_passes': 'key_passes',
+            'xA_total': lambda own, rival: own['xa'].round(2),
+        },
+        'players': {
+            'table': 'all_passing_stats',
+            'columns': {'shots': 'shots', 'total_passes': 'passes', 'successful_passes': 'successful_passes',
+                        'key_passes': 'key_passes'},
+            'rates': {'pass_success_pct': ('successful_passes', 'total_passes')},
+            'leaderboards': {
+                'top_shooters': ('shots', 3, None),
+                'top_passers_total': ('total_passes', 3, None),
+                'top_passers_accuracy': ('pass_success_pct', 3, ('total_passes', 5)),
+            },
+        },
+    },
+    'defensive': {
+        'key_stats': {
+            'pressures': 'pressures',
+            'successful_pressures': 'successful_pressures',
+            'pressure_success_rate': ('successful_pressures', 'pressures'),
+            'duels': 'duels',
+            'won_duels': 'won_duels',
+            'duel_success_rate': ('won_duels', 'duels'),
+            # Cada 'Aerial Lost' del rival es un duelo aéreo ganado
+            'aerial_duels': lambda own, rival: None if rival is None else own['aerials_lost'] + rival['aerials_lost'],
+            'won_aerial_duels': lambda own, rival: None if rival is None else rival['aerials_lost'],
+            'aerial_success_rate': lambda own, rival: None if rival is None else safe_ratio(
+                rival['aerials_lost'], own['aerials_lost'] + rival['aerials_lost']),
+            'blocks': 'blocks',
+            'interceptions': 'interceptions',
+            'ball_recoveries': 'ball_recoveries',
+            'clearances': 'clearances',
+        },
+        'players': {
+            'table': 'all_defensive_stats',
+            'columns': {'pressures': 'pressures', 'successful_pressures': 'successful_pressures',
+                        'duels': 'duels', 'won_duels': 'won_duels', 'blocks': 'blocks',
+                        'interceptions': 'interceptions', 'ball_recoveries': 'ball_recoveries',
+                        'clearances': 'clearances'},
+            'rates': {'pressure_success_rate': ('successful_pressures', 'pressures'),
+                      'duel_success_rate': ('won_duels', 'duels')},
+            'totals': {'total_defensive_actions': ['pressures', 'duels', 'blocks', 'interceptions',
+                                                   'ball_recoveries', 'clearances']},
+            'leaderboards': {
+                'top_defenders_total_actions': ('total_defensive_actions', 3, None),
+                'top_defenders_pressures': ('pressures', 3, None),
+                'top_defenders_duels': ('duels', 3, None),
+                'top_defenders_interceptions': ('interceptions', 3, None),
+            },
+        },
+    },
+    'transitions': {
+        'key_stats': {
+            'ball_recoveries': 'ball_recoveries',
+            'recoveries_def_3rd': 'recoveries_def_3rd',
+            'recoveries_mid_3rd': 'recoveries_mid_3rd',
+            'recoveries_att_3rd': 'recoveries_att_3rd',
+            'carries': 'carries',
+            'carries_from_def_3rd': 'carries_from_def_3rd',
+            'carries_from_mid_3rd': 'carries_from_mid_3rd',
+            'carries_from_att_3rd': 'carries_from_att_3rd',
+            'pressures': 'pressures',
+            'successful_pressures': 'successful_pressures',
+            'pressure_success_rate': ('successful_pressures', 'pressures'),
+            'interceptions': 'interceptions',
+        },
+        'players': {
+            'table': 'all_transition_stats',
+            'columns': {'ball_recoveries': 'ball_recoveries', 'carries': 'carries', 'pressures': 'pressures',
+                        'successful_pressures': 'successful_pressures', 'interceptions': 'interceptions'},
+            'rates': {'pressure_success_rate': ('successful_pressures', 'pressures')},
+            'totals': {'total_transition_actions': ['ball_recoveries', 'carries', 'pressures', 'interceptions']},
+            'leaderboards': {
+                'top_transition_players': ('total_transition_actions', 3, None),
+                'top_recovery_players': ('ball_recoveries', 3, None),
+                'top_carry_players': ('carries', 3, None),
+                'top_pressure_players': ('pressures', 3, None),
+            },
+        },
+    },
+}
+
+
+def safe_ratio(numerator, denominator):
+    """Cociente elemento a elemento (0 si el denominador es 0)."""
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator > 0)
+
+
+def metric_table(events, metrics=None):
+    """
+    Evalúa las métricas sobre los eventos y las agrega por (match_id, team_id, player_id).
+
+    Args:
+        events: Eventos de uno o varios partidos
+        metrics: Métricas a evaluar (por defecto EVENT_METRICS)
+
+    Returns:
+        pd.DataFrame: Una fila por (match_id, team_id, player_id) y una columna por
+            métrica; las acciones sin jugador quedan con ``player_id`` nulo
+    """
+    metrics = EVENT_METRICS if metrics is None else metrics
+    events = add_coordinate_columns(events)
+    events = events.assign(**{name: derive(events) for name, derive in DERIVED_COLUMNS.items()})
+    n = len(events)
+
+    values = {}
+    for name, spec in metrics.items():
+        mask = np.ones(n, dtype=bool)
+        if 'type' in spec:
+            types = spec['type'] if isinstance(spec['type'], list) else [spec['type']]
+            mask &= events['type'].isin(types).to_numpy(dtype=bool)
+        if 'where' in spec:
+            try:
+                mask &= pd.Series(spec['where'](events), index=events.index).fillna(False).to_numpy(dtype=bool)
+            except KeyError:
+                # La columna no existe en estos eventos (p. ej. sin duelos aéreos)
+                mask[:] = False
+        if 'value' in spec:
+            column = events[spec['value']] if spec['value'] in events.columns else pd.Series(0.0, index=events.index)
+            values[name] = np.where(mask, np.nan_to_num(column.to_numpy(dtype=float)), 0.0)
+        else:
+            values[name] = mask.astype(np.int32)
+
+    keys = [events[col] if col in events.columns else pd.Series(0 if col == 'match_id' else pd.NA, index=events.index)
+            for col in ('match_id', 'team_id', 'player_id')]
+    table = pd.DataFrame(values, index=events.index)
+    return table.groupby(keys, dropna=False, observed=True).sum().rename_axis(['match_id', 'team_id', 'player_id'])
+
+
+def resolve_team(events, team):
+    """ID del equipo a partir de su nombre o ID (None para ambos equipos)."""
+    if team is None or isinstance(team, (int, np.integer)):
+        return team
+    team_ids = events.loc[events['team'] == team, 'team_id'].dropna()
+    if team_ids.empty:
+        raise ValueError(f'El equipo {team} no aparece en los eventos')
+    return int(team_ids.iloc[0])
+
+
+def _totals(table, team_id):
+    """Totales por partido del equipo (o de ambos si ``team_id`` es None) y de su rival."""
+    by_team = table.groupby(level=['match_id', 'team_id'], dropna=False).sum()
+    by_match = by_team.groupby(level='match_id').sum()
+    if team_id is None:
+        return by_match, None
+    own = by_team[by_team.index.get_level_values('team_id').isin([team_id])].droplevel('team_id')
+    rival = by_match.loc[own.index] - own
+    return own, rival
+
+
+def _key_stats(spec, own, rival):
+    stats = {}
+    for name, definition in spec.items():
+        if callable(definition):
+            value = definition(own, rival)
+        elif isinstance(definition, tuple):
+            value = safe_ratio(own[definition[0]], own[definition[1]])
+        else:
+            value = own[definition]
+        if value is not None:
+            stats[name] = value
+    return pd.DataFrame(stats, index=own.index)
+
+
+def _player_tables(spec, table, team_id, events, minutes=None, min_minutes=0):
+    players = table
+    if team_id is not None:
+        players = players[players.index.get_level_values('team_id').isin([team_id])]
+    players = players.droplevel('team_id')
+    players = players[players.index.get_level_values('player_id').notna()]
+
+    stats = players[list(spec['columns'].values())].set_axis(list(spec['columns']), axis=1)
+    stats = stats[(stats > 0).any(axis=1)].astype(float)
+    for name, (numerator, denominator) in spec.get('rates', {}).items():
+        stats[name] = (stats[numerator] / stats[denominator] * 100).round(1)
+    for name, columns in spec.get('totals', {}).items():
+        stats[name] = stats[columns].sum(axis=1)
+    if minutes is not None:
+        # Conteos por 90 minutos (los porcentajes no cambian); los rankings ordenan por 90
+        stats = per90(stats, minutes, list(spec['columns']) + list(spec.get('totals', {})), min_minutes)
+    names = display_names(stats.index.get_level_values('player_id'), kind='players', events=events)
+    stats.index = pd.MultiIndex.from_arrays([stats.index.get_level_values('match_id'), names],
+                                            names=['match_id', 'player'])
+
+    result = {spec['table']: stats}
+    for name, (column, n, minimum) in spec.get('leaderboards', {}).items():
+        candidates = stats[stats[column] > 0] if minimum is None else stats[stats[minimum[0]] >= minimum[1]]
+        # Top-n de cada partido: orden estable por la columna y cabeza de cada grupo
+        top = candidates.sort_values(column, ascending=False, kind='stable')
+        top = top.groupby(level='match_id', sort=False).head(n)
+        result[name] = top.sort_index(level='match_id', sort_remaining=False, kind='stable')
+    return result
+
+
+def evaluate_season(events, team=None, sections=None, minutes=None, min_minutes=0):
+    """
+    Calcula las secciones del análisis para todos los partidos de ``events`` a la vez.
+
+    Args:
+        events: Eventos de uno o varios partidos (concatenados, con ``match_id``)
+        team: Nombre o ID del equipo analizado; None para ambos equipos a la vez
+        sections: Nombres de las secciones a calcular (por defecto todas las de SECTIONS)
+        minutes: Minutos de ``data.minutes.minutes_played``; si se indican, las tablas por
+            jugador se dan por 90 minutos
+        min_minutes: Minutos mínimos para aparecer en las tablas por 90
+
+    Returns:
+        dict: {sección: {'key_stats': DataFrame por match_id, tablas por jugador y
+            rankings indexados por (match_id, player)}}
+    """
+    team_id = resolve_team(events, team)
+    table = metric_table(events)
+    own, rival = _totals(table, team_id)
+
+    results = {}
+    for name in sections or SECTIONS:
+        spec = SECTIONS[name]
+        results[name] = {'key_stats': _key_stats(spec['key_stats'], own, rival)}
+        results[name].update(_player_tables(spec['players'], table, team_id, events, minutes, min_minutes))
+    return results
+
+
+def team_key_stats(events, sections=None):
+    """
+    Estadísticas clave de las secciones para cada equipo de cada partido, con los
+    dos equipos evaluados a la vez sobre una única tabla de métricas.
+
+    Args:
+        events: Eventos de uno o varios partidos
+        sections: Nombres de las secciones (por defecto todas las de SECTIONS)
+
+    Returns:
+        pd.DataFrame: Indexado por (match_id, team_id), columnas (sección, estadística)
+    """
+    table = metric_table(events)
+    own = table.groupby(level=['match_id', 'team_id']).sum()
+    by_match = own.groupby(level='match_id').sum()
+    rival = by_match.reindex(own.index.get_level_values('match_id')).set_axis(own.index) - own
+    return pd.concat({name: _key_stats(SECTIONS[name]['key_stats'], own, rival) for name in sections or SECTIONS},
+                     axis=1)
+
+
+def first_row(frame):
+    """Primera fila de un DataFrame como dict de escalares de Python (conserva el tipo de cada columna)."""
+    if frame.empty:
+        return {}
+    return {col: _scalar(frame[col].iloc[0]) for col in frame.columns}
+
+
+def _scalar(value):
+    return value.item() if hasattr(value, 'item') else value
+
+
+def match_view(section):
+    """Resultado de una sección de ``evaluate_season`` para un único partido."""
+    result = {}
+    for name, value in section.items():
+        if name == 'key_stats':
+            result[name] = first_row(value)
+        else:
+            result[name] = value.droplevel('match_id')
+    return result
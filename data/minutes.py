@@ -0,0 +1,151 @@
+"""
+Minutos jugados por jugador y partido, y valores por 90 minutos.
+
+Cada jugador tiene uno o varios tramos en el campo (inicio y fin en minutos de
+partido). Los tramos salen de la tabla de alineaciones (``data.lineups``) y, en
+los partidos sin alineaciones, de los eventos 'Starting XI', 'Substitution' y
+las tarjetas rojas. Los tramos abiertos (el jugador terminó el partido) se cierran
+con el último evento de cada partido. Todo se calcula con operaciones por columna
+y ``groupby`` sobre la temporada completa, sin recorrer jugadores.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Duración por defecto de un partido cuando no hay eventos para cerrar los tramos
+DEFAULT_MATCH_MINUTES = 90.0
+
+# Tarjetas con las que un jugador deja el campo
+SENDING_OFF_CARDS = ['Red Card', 'Second Yellow']
+
+SPELL_COLUMNS = ['match_id', 'team_id', 'player_id', 'start_minute', 'end_minute']
+
+
+def _clock(events):
+    return events['minute'].astype('float64') + events['second'].astype('float64') / 60
+
+
+def match_end_minutes(events):
+    """Minuto del último evento de cada partido (incluye el descuento y la prórroga)."""
+    return _clock(events).groupby(events['match_id'].to_numpy()).max().rename_axis('match_id')
+
+
+def spells_from_lineups(lineups):
+    """Tramos en el campo según la tabla de ``lineups_to_table`` (solo jugadores que jugaron)."""
+    played = lineups[lineups['position_id'].notna().to_numpy(dtype=bool)]
+    return played[SPELL_COLUMNS].astype({'start_minute': 'float64', 'end_minute': 'float64'})
+
+
+def spells_from_events(events):
+    """
+    Tramos en el campo reconstruidos con los eventos de un conjunto de partidos.
+
+    Los titulares salen del 'Starting XI', los cambios de 'Substitution' (sale
+    ``player_id`` y entra ``substitution_replacement_id``) y las expulsiones de las
+    tarjetas rojas o segundas amarillas.
+
+    Returns:
+        pd.DataFrame: Columnas SPELL_COLUMNS; ``end_minute`` nulo si el jugador terminó el partido
+    """
+    clock = _clock(events)
+    starting = events[(events['type'] == 'Starting XI').to_numpy(dtype=bool)]
+    lineup = starting['tactics'].map(lambda t: t.get('lineup', []) if isinstance(t, dict) else []).explode().dropna()
+    starters = pd.DataFrame({
+        'match_id': starting.loc[lineup.index, 'match_id'].to_numpy(),
+        'team_id': starting.loc[lineup.index, 'team_id'].to_numpy(),
+        'player_id': [entry.get('player', {}).get('id') for entry in lineup],
+        'start_minute': 0.0,
+    })
+
+    is_sub = (events['type'] == 'Substitution').to_numpy(dtype=bool)
+    subs = events[is_sub]
+    entries = pd.DataFrame({
+        'match_id': subs['match_id'].to_numpy(),
+        'team_id': subs['team_id'].to_numpy(),
+        'player_id': subs['substitution_replacement_id'].to_numpy() if 'substitution_replacement_id' in subs.columns
+        else pd.NA,
+        'start_minute': clock[is_sub].to_numpy(),
+    })
+    spells = pd.concat([starters, entries], ignore_index=True).dropna(subset=['player_id'])
+    spells['player_id'] = spells['player_id'].astype('int64')
+
+    # Salidas: sustituido o expulsado
+    sent_off = np.zeros(len(events), dtype=bool)
+    for col in ('foul_committed_card', 'bad_behaviour_card'):
+        if col in events.columns:
+            sent_off |= events[col].isin(SENDING_OFF_CARDS).to_numpy(dtype=bool)
+    leaving = is_sub | sent_off
+    exits = pd.DataFrame({
+        'match_id': events['match_id'].to_numpy()[leaving],
+        'player_id': events['player_id'].to_numpy()[leaving],
+        'end_minute': clock.to_numpy()[leaving],
+    }).dropna(subset=['player_id'])
+    exits['player_id'] = exits['player_id'].astype('int64')
+    exits = exits.groupby(['match_id', 'player_id'], as_index=False)['end_minute'].min()
+
+    spells = spells.merge(exits, on=['match_id', 'player_id'], how='left')
+    return spells[SPELL_COLUMNS]
+
+
+def minutes_played(lineups=None, events=None):
+    """
+    Minutos jugados por (match_id, team_id, player_id).
+
+    Se usan las alineaciones de los partidos que las tengan y los eventos para el
+    resto; los eventos también dan el final real de cada partido.
+
+    Args:
+        lineups: Tabla de alineaciones de ``lineups_to_table`` (uno o varios partidos)
+        events: Eventos de uno o varios partidos
+
+    Returns:
+        pd.Series: Minutos indexados por (match_id, team_id, player_id)
+    """
+    frames = []
+    lineup_matches = []
+    if lineups is not None and not lineups.empty:
+        frames.append(spells_from_lineups(lineups))
+        lineup_matches = lineups['match_id'].unique().tolist()
+    if events is not None and not events.empty:
+        pending = events[~events['match_id'].isin(lineup_matches).to_numpy(dtype=bool)]
+        if not pending.empty:
+            frames.append(spells_from_events(pending))
+    if not frames:
+        return pd.Series(dtype='float64', name='minutes',
+                         index=pd.MultiIndex.from_arrays([[], [], []], names=['match_id', 'team_id', 'player_id']))
+
+    spells = pd.concat(frames, ignore_index=True).dropna(subset=['team_id', 'player_id'])
+    if events is not None and not events.empty:
+        match_end = spells['match_id'].map(match_end_minutes(events))
+    else:
+        match_end = pd.Series(np.nan, index=spells.index)
+    # Sin eventos: el mayor minuto registrado del partido, al menos 90
+    known_end = spells.groupby('match_id')['end_minute'].transform('max').clip(lower=DEFAULT_MATCH_MINUTES)
+    match_end = match_end.fillna(known_end).fillna(DEFAULT_MATCH_MINUTES)
+
+    spells['minutes'] = (spells['end_minute'].fillna(match_end) - spells['start_minute']).clip(lower=0)
+    keys = [spells['match_id'].astype('int64'), spells['team_id'].astype('int64'), spells['player_id'].astype('int64')]
+    return spells['minutes'].groupby(keys).sum().rename_axis(['match_id', 'team_id', 'player_id'])
+
+
+def per90(stats, minutes, columns, min_minutes=0):
+    """
+    Convierte columnas de conteo en valores por 90 minutos.
+
+    Args:
+        stats: DataFrame indexado por (match_id, player_id) o por player_id
+        minutes: Minutos de ``minutes_played``
+        columns: Columnas de conteo a convertir
+        min_minutes: Minutos mínimos para conservar una fila
+
+    Returns:
+        pd.DataFrame: ``stats`` con la columna ``minutes`` y ``columns`` por 90 minutos,
+            sin las filas por debajo de ``min_minutes``
+    """
+    levels = list(stats.index.names)
+    by_player = minutes.groupby(level=[level for level in ('match_id', 'player_id') if level in levels]).sum()
+    stats = stats.join(by_player.rename('minutes'), how='left')
+    stats = stats[(stats['minutes'] >= min_minutes).to_numpy(dtype=bool)].copy()
+    factor = 90 / stats['minutes'].where(stats['minutes'] > 0)
+    stats[columns] = stats[columns].mul(factor, axis=0).round(2)
+    return stats
@@ -0,0 +1,266 @@
+"""
+Percentiles de liga por métrica.
+
+Para cada tabla de estadísticas (``team_match_stats``, ``team_season_stats`` y
+``player_season_stats``) se guarda, por métrica, el array ordenado de los valores
+de la liga. El percentil de cualquier valor es un ``searchsorted`` sobre ese array,
+de modo que consultar todos los equipos o jugadores a la vez es una operación
+vectorizada. En las métricas de LOWER_IS_BETTER (goles o xG concedidos, PPDA...)
+el percentil y la posición se invierten, de modo que percentil alto y posición 1
+siempre significan "mejor". Cuando la tabla cambia, solo las filas nuevas, modificadas o
+eliminadas se quitan o insertan en los arrays; no se vuelve a ordenar todo.
+"""
+
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from data.baseline import CONTEXT_COLUMNS
+from data.extraccion_datos import TEAM_MATCH_STATS_PATH, load_team_match_stats
+
+TEAM_SEASON_STATS_CSV = 'outs_data/sb_team_season_stats.csv'
+PLAYER_SEASON_STATS_CSV = 'outs_data/sb_player_season_stats.csv'
+
+# Tablas de la liga: (ruta, función de carga, columnas clave, prefijo de las métricas)
+SOURCES = {
+    'team_match': (TEAM_MATCH_STATS_PATH, lambda: load_team_match_stats()[0], ['match_id', 'team_id'], 'team_match_'),
+    'team_season': (TEAM_SEASON_STATS_CSV, lambda: pd.read_csv(TEAM_SEASON_STATS_CSV), ['team_id'], 'team_season_'),
+    'player_season': (PLAYER_SEASON_STATS_CSV, lambda: pd.read_csv(PLAYER_SEASON_STATS_CSV),
+                      ['player_id', 'team_id'], 'player_season_'),
+}
+
+# Métricas de temporada que se añaden al informe (las que existan en la tabla)
+SEASON_CONTEXT_COLUMNS = [
+    'team_season_goals_pg', 'team_season_np_xg_pg', 'team_season_np_shots_pg', 'team_season_possession',
+    'team_season_passing_ratio', 'team_season_pressures_pg', 'team_season_counterpressures_pg',
+    'team_season_ppda', 'team_season_deep_progressions_pg', 'team_season_obv_pg',
+    'team_season_np_xg_conceded_pg', 'team_season_goals_conceded_pg',
+]
+
+# Métricas en las que un valor más bajo es mejor
+LOWER_IS_BETTER = {
+    'team_season_goals_conceded_pg', 'team_season_np_xg_conceded_pg', 'team_season_np_shots_conceded_pg',
+    'team_season_ppda', 'team_match_turnovers', 'team_match_dispossessions',
+    'player_season_turnovers_90', 'player_season_dispossessions_90',
+}
+
+_distributions = {}
+_distributions_lock = threading.Lock()
+
+
+class MetricDistributions:
+    """Distribuciones ordenadas de las métricas de una tabla de la liga."""
+
+    def __init__(self, frame, keys, metrics=None, prefix=''):
+        self.keys = list(keys)
+        if metrics is None:
+            metrics = [col for col in frame.columns
+                       if col.startswith(prefix) and col not in self.keys and pd.api.types.is_numeric_dtype(frame[col])]
+        self.metrics = list(metrics)
+        self.values = self._index(frame)
+        self.sorted = {metric: np.sort(self._finite(self.values[metric])) for metric in self.metrics}
+
+    def _index(self, frame):
+        frame = frame.drop_duplicates(self.keys, keep='last').set_index(self.keys)
+        return frame.reindex(columns=self.metrics).astype('float64')
+
+    @staticmethod
+    def _finite(values):
+        values = np.asarray(values, dtype='float64')
+        return values[~np.isnan(values)]
+
+    def size(self, metric):
+        """Número de valores de la liga para una métrica."""
+        return len(self.sorted[metric])
+
+    # --------------------------
+    # Actualización incremental
+    # --------------------------
+    def update(self, frame):
+        """
+        Aplica una nueva versión de la tabla: quita de los arrays los valores de las
+        filas eliminadas o modificadas e inserta los de las filas nuevas o modificadas.
+
+        Returns:
+            int: Número de filas que cambiaron
+        """
+        new = self._index(frame)
+        common = new.index.intersection(self.values.index)
+        old_common, new_common = self.values.loc[common], new.loc[common]
+        changed = ~((old_common == new_common) | (old_common.isna() & new_common.isna())).all(axis=1)
+        outgoing = self.values.loc[self.values.index.difference(new.index).append(common[changed.to_numpy()])]
+        incoming = new.loc[new.index.difference(self.values.index).append(common[changed.to_numpy()])]
+
+        for metric in self.metrics:
+            self.sorted[metric] = self._insert(self._delete(self.sorted[metric], outgoing[metric]), incoming[metric])
+        self.values = new
+        return len(incoming) + len(outgoing) - int(changed.sum())
+
+    def _delete(self, array, values):
+        values = np.sort(self._finite(values))
+        if not len(values) or not len(array):
+            return array
+        # Valores repetidos: cada copia borra una posición distinta del bloque de iguales
+        offsets = np.arange(len(values)) - np.searchsorted(values, values, 'left')
+        return np.delete(array, np.searchsorted(array, values, 'left') + offsets)
+
+    def _insert(self, array, values):
+        values = np.sort(self._finite(values))
+        if not len(values):
+            return array
+        return np.insert(array, np.searchsorted(array, values), values)
+
+    # --------------------------
+    # Consultas
+    # --------------------------
+    def percentiles(self, frame, metrics=None):
+        """
+        Percentil de liga (0-100) de cada valor de ``frame`` en su métrica.
+
+        Los empates reciben el percentil medio del bloque de valores iguales. En las
+        métricas de LOWER_IS_BETTER se invierte (100 = valor más bajo de la liga).
+
+        Args:
+            frame: DataFrame con columnas de métricas (p. ej. filas de la propia tabla)
+            metrics: Métricas a consultar (por defecto, todas las de la tabla presentes en ``frame``)
+
+        Returns:
+            pd.DataFrame: Alineado con ``frame``
+        """
+        metrics = [m for m in (metrics or self.metrics) if m in frame.columns and m in self.sorted]
+        result = {}
+        for metric in metrics:
+            array = self.sorted[metric]
+            values = frame[metric].to_numpy(dtype='float64')
+            below = np.searchsorted(array, values, 'left')
+            upto = np.searchsorted(array, values, 'right')
+            pct = (below + upto) / 2 / max(len(array), 1) * 100
+            if metric in LOWER_IS_BETTER:
+                pct = 100 - pct
+            result[metric] = np.where(np.isnan(values) | (len(array) == 0), np.nan, pct)
+        return pd.DataFrame(result, index=frame.index)
+
+    def ranks(self, frame, metrics=None):
+        """
+        Posición en la liga de cada valor (1 = valor más alto, o más bajo en las
+        métricas de LOWER_IS_BETTER; ver ``size`` para el total).
+
+        Returns:
+            pd.DataFrame: Alineado con ``frame``
+        """
+        metrics = [m for m in (metrics or self.metrics) if m in frame.columns and m in self.sorted]
+        result = {}
+        for metric in metrics:
+            array = self.sorted[metric]
+            values = frame[metric].to_numpy(dtype='float64')
+            if metric in LOWER_IS_BETTER:
+                rank = np.searchsorted(array, values, 'left') + 1
+            else:
+                rank = len(array) - np.searchsorted(array, values, 'right') + 1
+            result[metric] = np.where(np.isnan(values), np.nan, rank)
+        return pd.DataFrame(result, index=frame.index)
+
+    def lookup(self, keys, metrics=None):
+        """
+        Percentiles de entidades de la propia tabla.
+
+        Args:
+            keys: Claves (valores de ``self.keys``; tuplas si hay varias columnas clave)
+
+        Returns:
+            pd.DataFrame: Percentiles indexados por clave (nulo si la clave no existe)
+        """
+        return self.percentiles(self.values.reindex(keys), metrics)
+
+
+def league_distributions(source):
+    """
+    Distribuciones de una tabla de la liga (``SOURCES``), actualizadas de forma
+    incremental cuando el archivo de la tabla cambia.
+
+    Returns:
+        MetricDistributions | None: None si la tabla todavía no existe
+    """
+    path, load, keys, prefix = SOURCES[source]
+    if not os.path.exists(path):
+        return None
+    mtime = os.path.getmtime(path)
+    with _distributions_lock:
+        cached = _distributions.get(source)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        frame = load()
+        if cached is None:
+            distributions = MetricDistributions(frame, keys, prefix=prefix)
+        else:
+            distributions = cached[1]
+            changed = distributions.update(frame)
+            print(f'Percentiles {source}: {changed} filas actualizadas')
+        _distributions[source] = (mtime, distributions)
+        return distributions
+
+
+def player_percentiles(player_id, metrics=None):
+    """
+    Percentiles de liga de las estadísticas de temporada de un jugador.
+
+    Args:
+        player_id: ID del jugador
+        metrics: Métricas a consultar (por defecto todas las ``player_season_*``)
+
+    Returns:
+        pd.Series: Percentil por métrica (vacía si no hay tabla o el jugador no está)
+    """
+    distributions = league_distributions('player_season')
+    if distributions is None:
+        return pd.Series(dtype='float64')
+    rows = distributions.values[distributions.values.index.get_level_values('player_id') == int(player_id)]
+    if rows.empty:
+        return pd.Series(dtype='float64')
+    # Jugador con varios equipos en la temporada: la última fila de la tabla
+    return distributions.percentiles(rows.tail(1), metrics).iloc[0].round(1)
+
+
+def league_context(teams, match_id=None, match_columns=CONTEXT_COLUMNS, season_columns=SEASON_CONTEXT_COLUMNS):
+    """
+    Percentil y posición en la liga de los equipos de un partido, para el informe.
+
+    Args:
+        teams: Nombres de los equipos
+        match_id: ID del partido (percentiles de sus estadísticas entre todos los
+            partidos de la liga)
+        match_columns: Métricas de partido a incluir
+        season_columns: Métricas de temporada a incluir
+
+    Returns:
+        dict: {equipo: {'partido': {métrica: percentil}, 'temporada': {métrica:
+            {'valor', 'percentil', 'posicion', 'equipos'}}}}
+    """
+    context = {team: {} for team in teams}
+
+    match_stats = league_distributions('team_match')
+    if match_stats is not None and match_id is not None:
+        table = load_team_match_stats()[0]
+        rows = table[(table['match_id'] == int(match_id)).to_numpy() & table['team_name'].isin(teams).to_numpy()]
+        pct = match_stats.percentiles(rows, match_columns).round(1)
+        for team, values in zip(rows['team_name'], pct.to_dict('records')):
+            context[team]['partido'] = values
+
+    season_stats = league_distributions('team_season')
+    if season_stats is not None:
+        table = pd.read_csv(TEAM_SEASON_STATS_CSV)
+        rows = table[table['team_name'].isin(teams).to_numpy()]
+        columns = [col for col in season_columns if col in season_stats.metrics]
+        pct = season_stats.percentiles(rows, columns).round(1)
+        ranks = season_stats.ranks(rows, columns)
+        for i, team in enumerate(rows['team_name']):
+            context[team]['temporada'] = {
+                col: {'valor': None if pd.isna(rows[col].iloc[i]) else round(float(rows[col].iloc[i]), 3),
+                      'percentil': None if pd.isna(pct[col].iloc[i]) else float(pct[col].iloc[i]),
+                      'posicion': None if pd.isna(ranks[col].iloc[i]) else int(ranks[col].iloc[i]),
+                      'equipos': season_stats.size(col)}
+                for col in columns
+            }
+    return {team: entry for team, entry in context.items() if entry}
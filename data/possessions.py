@@ -0,0 +1,125 @@
+"""
+Cadenas de posesión.
+
+Cada posesión de StatsBomb (``match_id``, ``possession``) se resume en una fila
+con su evento de inicio, zona de inicio, duración, progresión y si terminó en
+tiro, usando solo agregaciones por grupo sobre los eventos del equipo en posesión.
+Funciona igual con un partido que con los eventos de una temporada completa.
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from data.event_frames import add_coordinate_columns
+from data.sequences import order_events
+from data.zones import assign_zones
+
+# Eventos con los que un equipo recupera el balón
+REGAIN_TYPES = ['Ball Recovery', 'Interception']
+
+# Contragolpe: posesión que empieza con una recuperación (o que StatsBomb marca
+# como 'From Counter') y avanza al menos COUNTER_MIN_PROGRESSION en COUNTER_MAX_SECONDS
+COUNTER_MIN_PROGRESSION = 30
+COUNTER_MAX_SECONDS = 15
+
+_chains = {}
+_chains_lock = threading.Lock()
+_MAX_MATCHES = 8
+
+
+def possession_chains(events, grid='thirds'):
+    """
+    Resume los eventos en una fila por posesión.
+
+    Args:
+        events: Eventos (de uno o varios partidos) con ``possession`` y ``possession_team_id``
+        grid: Rejilla de ``data.zones`` para la zona de inicio
+
+    Returns:
+        pd.DataFrame: Una fila por (match_id, possession) con ``team_id``, ``team``,
+            ``start_index``, ``start_type``, ``play_pattern``, ``start_x``/``start_y``,
+            ``start_zone``, ``end_x``/``end_y``, ``duration``, ``progression``,
+            ``events``, ``passes``, ``shots``, ``xg``, ``ended_in_shot``, ``regain`` y ``counterattack``
+    """
+    events = order_events(add_coordinate_columns(events))
+    if 'match_id' not in events.columns:
+        events = events.assign(match_id=0)
+    # Solo las acciones del equipo en posesión describen la cadena
+    own = events[(events['team_id'] == events['possession_team_id']).fillna(False).to_numpy(dtype=bool)]
+    if own.empty:
+        return pd.DataFrame()
+
+    own = own.assign(
+        clock=own['minute'].astype('float64') * 60 + own['second'].astype('float64'),
+        reach_x=np.fmax(own['location_x'].to_numpy(dtype=float), own['end_x'].to_numpy(dtype=float)),
+        point_x=own['end_x'].fillna(own['location_x']),
+        point_y=own['end_y'].fillna(own['location_y']),
+        is_pass=(own['type'] == 'Pass').to_numpy(),
+        is_shot=(own['type'] == 'Shot').to_numpy(),
+        shot_xg=own['shot_statsbomb_xg'] if 'shot_statsbomb_xg' in own.columns else 0.0,
+    )
+    chains = own.groupby(['match_id', 'possession'], sort=False, observed=True).agg(
+        team_id=('possession_team_id', 'first'),
+        team=('possession_team', 'first'),
+        period=('period', 'first'),
+        start_index=('index', 'first'),
+        start_type=('type', 'first'),
+        play_pattern=('play_pattern', 'first'),
+        start_x=('location_x', 'first'),
+        start_y=('location_y', 'first'),
+        end_x=('point_x', 'last'),
+        end_y=('point_y', 'last'),
+        start_clock=('clock', 'min'),
+        end_clock=('clock', 'max'),
+        reach_x=('reach_x', 'max'),
+        events=('index', 'size'),
+        passes=('is_pass', 'sum'),
+        shots=('is_shot', 'sum'),
+        xg=('shot_xg', 'sum'),
+    ).reset_index()
+
+    chains['start_type'] = chains['start_type'].astype(object)
+    chains['play_pattern'] = chains['play_pattern'].astype(object)
+    chains['start_zone'] = assign_zones(chains['start_x'], chains['start_y'], grid)
+    chains['duration'] = chains.pop('end_clock') - chains.pop('start_clock')
+    chains['progression'] = chains.pop('reach_x') - chains['start_x']
+    chains['ended_in_shot'] = chains['shots'] > 0
+    chains['regain'] = chains['start_type'].isin(REGAIN_TYPES)
+    chains['counterattack'] = (
+        (chains['play_pattern'] == 'From Counter') |
+        (chains['regain'] & (chains['progression'] >= COUNTER_MIN_PROGRESSION) &
+         (chains['duration'] <= COUNTER_MAX_SECONDS))
+    )
+    return chains
+
+
+def _team_counts(events):
+    return events['team_id'].value_counts().to_dict()
+
+
+def chains_for(events):
+    """
+    Cadenas de posesión de un partido, calculadas una sola vez.
+
+    El análisis de transiciones (todos los eventos) y las figuras (eventos de un
+    equipo) comparten el resultado: si ya hay cadenas del partido que incluyen a
+    los equipos pedidos con los mismos eventos, se reutilizan filtradas.
+    """
+    if events.empty or 'match_id' not in events.columns or events['match_id'].nunique() != 1:
+        return possession_chains(events)
+    match_id = int(events['match_id'].iloc[0])
+    counts = _team_counts(events)
+    with _chains_lock:
+        cached = _chains.get(match_id)
+    if cached is not None and all(cached[0].get(team) == n for team, n in counts.items()):
+        chains = cached[1]
+        return chains[chains['team_id'].isin(list(counts))].reset_index(drop=True)
+
+    chains = possession_chains(events)
+    with _chains_lock:
+        if len(_chains) >= _MAX_MATCHES and match_id not in _chains:
+            _chains.pop(next(iter(_chains)))
+        _chains[match_id] = (counts, chains)
+    return chains
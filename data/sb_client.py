@@ -0,0 +1,281 @@
+"""
+Capa única de acceso HTTP a la API de StatsBomb.
+
+Sustituye la descarga de ``statsbombpy`` (``api_client.get_resource``) por una
+versión con:
+- Sesión HTTP compartida con pool de conexiones (sin handshakes TLS repetidos).
+- Reintentos con backoff exponencial ante 429/5xx y errores de red.
+- Limitador token-bucket común a todos los hilos y sesiones de Streamlit del proceso.
+- Contadores de peticiones, reintentos y esperas por limitación (``stats()``).
+- Archivo local de respuestas crudas: en modo ``record`` se guarda el JSON de cada
+  respuesta comprimido en gzip; en modo ``replay`` las llamadas se sirven desde ese
+  archivo sin red (benchmarks offline, reproducción exacta de incidencias).
+
+Los módulos del proyecto importan ``sb`` desde aquí para garantizar que la capa
+esté instalada antes de la primera llamada.
+"""
+
+import glob
+import gzip
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from statsbombpy import api_client, sb
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+    _json_loads = json.loads
+
+# --------------------------
+# Configuración
+# --------------------------
+RATE_PER_SECOND = float(os.getenv("SB_RATE_PER_SECOND", "5"))
+RATE_BURST = int(os.getenv("SB_RATE_BURST", "10"))
+MAX_RETRIES = int(os.getenv("SB_MAX_RETRIES", "5"))
+BACKOFF_SECONDS = float(os.getenv("SB_BACKOFF_SECONDS", "0.5"))
+POOL_SIZE = int(os.getenv("SB_POOL_SIZE", "16"))
+TIMEOUT_SECONDS = float(os.getenv("SB_TIMEOUT_SECONDS", "60"))
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# Archivo de respuestas crudas: 'off', 'record' o 'replay'
+ARCHIVE_MODE = os.getenv("SB_ARCHIVE_MODE", "off")
+ARCHIVE_DIR = os.getenv("SB_ARCHIVE_DIR", "outs_data/sb_archive")
+
+
+class TokenBucket:
+    """Limitador token-bucket seguro entre hilos."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Bloquea hasta obtener un token. Devuelve los segundos esperados."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+_limiter = TokenBucket(RATE_PER_SECOND, RATE_BURST)
+
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE))
+_session.mount("http://", HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE))
+
+_counters = {
+    "requests": 0,
+    "retries": 0,
+    "throttle_waits": 0,
+    "throttle_wait_seconds": 0.0,
+}
+_counters_lock = threading.Lock()
+
+
+def _count(name, value=1):
+    with _counters_lock:
+        _counters[name] += value
+
+
+def stats():
+    """Copia de los contadores de la capa HTTP (peticiones, reintentos, esperas)."""
+    with _counters_lock:
+        return dict(_counters)
+
+
+def _retry_delay(attempt, response=None):
+    """Segundos a esperar antes del reintento ``attempt`` (respeta Retry-After)."""
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+    return BACKOFF_SECONDS * (2 ** attempt) + random.uniform(0, BACKOFF_SECONDS)
+
+
+def fetch_json(url, auth=None):
+    """
+    Descarga un recurso JSON pasando por el limitador y con reintentos.
+
+    Returns:
+        requests.Response: Última respuesta obtenida (200 o un estado no reintentable)
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        waited = _limiter.acquire()
+        if waited > 0:
+            _count("throttle_waits")
+            _count("throttle_wait_seconds", waited)
+        _count("requests")
+
+        response = None
+        try:
+            response = _session.get(url, auth=auth, timeout=TIMEOUT_SECONDS)
+            if response.status_code not in RETRY_STATUS:
+                return response
+            error = requests.HTTPError(f"{url} -> {response.status_code}", response=response)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = e
+
+        if attempt == MAX_RETRIES:
+            raise error
+        _count("retries")
+        time.sleep(_retry_delay(attempt, response))
+
+
+# --------------------------
+# Archivo de respuestas (record/replay)
+# --------------------------
+def set_archive_mode(mode):
+    """Cambia el modo del archivo de respuestas: 'off', 'record' o 'replay'."""
+    global ARCHIVE_MODE
+    if mode not in ("off", "record", "replay"):
+        raise ValueError(f"Modo de archivo no válido: {mode}")
+    ARCHIVE_MODE = mode
+
+
+def _archive_path(url):
+    """Ruta del archivo de una URL, p. ej. ``.../events/3871964`` -> ``api_v8_events_3871964.json.gz``."""
+    name = urlsplit(url).path.strip("/").replace("/", "_")
+    return os.path.join(ARCHIVE_DIR, f"{name}.json.gz")
+
+
+def _write_archive(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with gzip.open(tmp_path, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def _read_archive(path):
+    with gzip.open(path, "rb") as f:
+        return f.read()
+
+
+def _archived_events_path(match_id):
+    matches = glob.glob(os.path.join(ARCHIVE_DIR, f"api_*_events_{int(match_id)}.json.gz"))
+    return matches[0] if matches else None
+
+
+def get_resource(url, creds):
+    """Reemplazo de ``statsbombpy.api_client.get_resource`` con el mismo contrato."""
+    if ARCHIVE_MODE == "replay":
+        path = _archive_path(url)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No hay respuesta archivada para {url} ({path})")
+        return _json_loads(_read_archive(path))
+
+    auth = requests.auth.HTTPBasicAuth(creds["user"], creds["passwd"])
+    response = fetch_json(url, auth=auth)
+    if response.status_code != 200:
+        print(f"{url} -> {response.status_code}")
+        return []
+    if ARCHIVE_MODE == "record":
+        _write_archive(_archive_path(url), response.content)
+    return response.json()
+
+
+# --------------------------
+# Lectura rápida de eventos archivados
+# --------------------------
+# Columnas {id, name} cuyo id se conserva en <columna>_id (las mismas que ``statsbombpy``)
+_ID_COLUMNS = {
+    "player", "team", "possession_team", "pass_recipient", "substitution_outcome", "substitution_replacement",
+}
+
+
+def _attributes_key(type_name):
+    """Clave del objeto de atributos de un tipo de evento (``Ball Receipt*`` -> ``ball_receipt``)."""
+    if type_name == "Goal Keeper":
+        return "goalkeeper"
+    return type_name.lower().replace(" ", "_").replace("*", "")
+
+
+def flatten_events(raw_events, match_id):
+    """
+    Aplana el JSON de eventos directamente en columnas, con los mismos nombres
+    que produce ``sb.events`` (``type``, ``pass_end_location``, ``shot_outcome``...):
+    el objeto de atributos del tipo de evento se expande en ``<tipo>_<campo>``,
+    cada objeto {id, name} se reduce a su nombre y las columnas de ``_ID_COLUMNS``
+    conservan además el id en ``<columna>_id``.
+
+    Args:
+        raw_events: Lista de eventos tal como la devuelve la API
+        match_id: ID del partido
+
+    Returns:
+        pd.DataFrame: Eventos del partido, ordenados por ``index``
+    """
+    n = len(raw_events)
+    columns = {}
+
+    def put(col, i, value):
+        if isinstance(value, dict) and "name" in value:
+            if col in _ID_COLUMNS:
+                put(f"{col}_id", i, value["id"])
+            value = value["name"]
+        column = columns.get(col)
+        if column is None:
+            column = columns[col] = [None] * n
+        column[i] = value
+
+    for i, event in enumerate(raw_events):
+        type_name = event["type"]["name"]
+        attributes = _attributes_key(type_name)
+        for key, value in event.items():
+            if key == attributes:
+                # Objeto de atributos del tipo: pass, shot, duel, carry...
+                for sub_key, sub_value in value.items():
+                    put(f"{key}_{sub_key}", i, sub_value)
+            else:
+                put(key, i, value)
+
+    events = pd.DataFrame(columns)
+    events["match_id"] = int(match_id)
+    if "index" in events.columns:
+        events = events.sort_values("index", ignore_index=True)
+    return events
+
+
+def events(match_id, creds):
+    """
+    Eventos de un partido. En modo ``replay`` se leen del archivo con el parser
+    rápido y ``flatten_events``; en otro caso se usa ``sb.events``.
+    """
+    if ARCHIVE_MODE == "replay":
+        path = _archived_events_path(match_id)
+        if path is None:
+            raise FileNotFoundError(f"No hay eventos archivados para el partido {match_id}")
+        return flatten_events(_json_loads(_read_archive(path)), match_id)
+    return sb.events(match_id=int(match_id), creds=creds)
+
+
+def install():
+    """Instala la capa en ``statsbombpy`` (idempotente)."""
+    if not hasattr(api_client, "get_resource"):
+        print("statsbombpy no expone api_client.get_resource; se usa su cliente HTTP por defecto")
+        return
+    api_client.get_resource = get_resource
+
+
+install()
@@ -0,0 +1,125 @@
+"""
+Paquete de scouting de un rival.
+
+Reúne los últimos N partidos de un equipo (eventos del almacén local, o de
+StatsBomb si aún no están, descargados en paralelo), calcula las secciones del
+análisis de todos ellos en una sola pasada con ``get_season_analysis`` y resume
+cada estadística con su media, desviación, mínimo y máximo entre partidos.
+"""
+
+import pandas as pd
+
+from data import event_store
+from data.event_frames import compact_events
+from data.extraccion_datos import MATCHES_CSV, fetch_concurrently, get_credentials, get_season_analysis
+
+# Número de partidos por defecto del paquete de scouting
+SCOUTING_MATCHES = 5
+
+# Secciones cuyas estadísticas clave forman el perfil
+PROFILE_SECTIONS = ['offensive', 'defensive', 'transitions', 'set_pieces']
+
+
+def recent_matches(matches, team, n=SCOUTING_MATCHES, before=None):
+    """
+    Últimos ``n`` partidos jugados por un equipo.
+
+    Args:
+        matches: Lista de partidos (``sb_matches.csv``)
+        team: Nombre del equipo
+        n: Número de partidos
+        before: Fecha límite (solo partidos anteriores)
+
+    Returns:
+        pd.DataFrame: Partidos del más reciente al más antiguo
+    """
+    played = matches[((matches['home_team'] == team) | (matches['away_team'] == team)).to_numpy(dtype=bool)]
+    played = played[played['home_score'].notna().to_numpy(dtype=bool)]
+    dates = pd.to_datetime(played['match_date'])
+    if before is not None:
+        played, dates = played[(dates < pd.Timestamp(before)).to_numpy()], dates[dates < pd.Timestamp(before)]
+    return played.assign(match_date=dates).sort_values('match_date', ascending=False, kind='stable').head(n)
+
+
+def load_match_events(match_ids, versions=None, creds=None, max_workers=None):
+    """
+    Eventos de varios partidos, leídos en paralelo desde el almacén local (o StatsBomb).
+
+    Returns:
+        pd.DataFrame: Eventos concatenados y compactados
+    """
+    versions = versions or {}
+    creds = creds or get_credentials()
+    frames = fetch_concurrently(lambda id: event_store.get_events(id, creds, version=versions.get(id)), match_ids,
+                                max_workers=max_workers, label='events')
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+    # Las categorías difieren entre partidos: se vuelven a compactar tras concatenar
+    return compact_events(pd.concat(frames, ignore_index=True), report=False)
+
+
+def _opponents(matches, team):
+    home = (matches['home_team'] == team).to_numpy(dtype=bool)
+    return pd.Series(matches['away_team'].where(home, matches['home_team']).to_numpy(), index=matches['match_id'])
+
+
+def scouting_profile(team, n=SCOUTING_MATCHES, matches=None, before=None, creds=None, max_workers=None):
+    """
+    Perfil de un equipo en sus últimos ``n`` partidos.
+
+    Args:
+        team: Nombre del equipo
+        n: Número de partidos
+        matches: Lista de partidos (por defecto ``MATCHES_CSV``)
+        before: Fecha límite (solo partidos anteriores)
+        creds: Credenciales de la API
+        max_workers: Número máximo de descargas simultáneas
+
+    Returns:
+        dict: {'team', 'matches' (partidos analizados), 'per_match' (estadísticas por
+            partido), 'profile' (media, desviación, mínimo, máximo y coeficiente de
+            variación por estadística) y 'formations' (veces que usó cada formación)}
+    """
+    if matches is None:
+        matches = pd.read_csv(MATCHES_CSV)
+    selected = recent_matches(matches, team, n=n, before=before)
+    if selected.empty:
+        raise ValueError(f'No hay partidos jugados de {team}')
+
+    match_ids = [int(m) for m in selected['match_id']]
+    versions = {}
+    if 'last_updated' in selected.columns:
+        versions = {int(m): (None if pd.isna(v) else v) for m, v in zip(selected['match_id'], selected['last_updated'])}
+    events = load_match_events(match_ids, versions, creds=creds, max_workers=max_workers)
+    if events.empty:
+        raise ValueError(f'No hay eventos disponibles para los partidos de {team}')
+
+    season = get_season_analysis(events, team)
+    per_match = pd.concat({section: season[section]['key_stats'] for section in PROFILE_SECTIONS}, axis=1)
+    per_match.columns = [f'{section}.{stat}' for section, stat in per_match.columns]
+    per_match = per_match.apply(pd.to_numeric, errors='coerce').dropna(axis=1, how='all')
+
+    profile = pd.DataFrame({
+        'mean': per_match.mean(),
+        'std': per_match.std(ddof=0),
+        'min': per_match.min(),
+        'max': per_match.max(),
+    })
+    profile['cv'] = (profile['std'] / profile['mean'].where(profile['mean'] != 0)).abs()
+
+    formations = pd.Series([summary['formations'].get(team) for summary in season['general'].values()],
+                           dtype=object).dropna().value_counts()
+
+    played = selected.set_index('match_id').loc[per_match.index]
+    return {
+        'team': team,
+        'matches': pd.DataFrame({
+            'match_date': played['match_date'].dt.date,
+            'opponent': _opponents(selected, team).reindex(per_match.index),
+            'score': played['home_score'].astype('Int64').astype(str) + '-' + played['away_score'].astype('Int64').astype(str),
+        }, index=per_match.index),
+        'per_match': per_match,
+        'profile': profile.round(3),
+        'formations': formations.to_dict(),
+    }
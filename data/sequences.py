@@ -0,0 +1,72 @@
+"""
+Enlace de eventos con los que les siguen, sin recorrer el DataFrame fila a fila.
+
+El orden de los eventos lo da ``index`` (los ``id`` de StatsBomb son UUID y no
+tienen orden). Sobre los eventos ordenados, el evento siguiente se obtiene con
+``shift`` y las secuencias de una jugada a balón parado con un ``groupby`` por
+posesión, tanto para un partido como para una temporada completa.
+"""
+
+import pandas as pd
+
+
+def order_events(events):
+    """Ordena los eventos por partido e ``index`` (orden real del juego)."""
+    keys = [col for col in ('match_id', 'index') if col in events.columns]
+    if not keys:
+        return events
+    return events.sort_values(keys, kind='stable', ignore_index=True)
+
+
+def next_events(events, columns=None, offset=1):
+    """
+    Columnas del evento ``offset`` posiciones después de cada evento, en el mismo partido.
+
+    Args:
+        events: Eventos ordenados con ``order_events``
+        columns: Columnas a traer (por defecto todas)
+        offset: Número de eventos hacia delante
+
+    Returns:
+        pd.DataFrame: Alineado con ``events``; nulo cuando no hay evento siguiente
+    """
+    selected = events if columns is None else events[list(columns)]
+    if 'match_id' in events.columns:
+        return selected.groupby(events['match_id'], sort=False).shift(-offset)
+    return selected.shift(-offset)
+
+
+def link_to_restarts(events, restarts):
+    """
+    Asigna a cada evento el ``index`` de la última jugada a balón parado de su
+    posesión (nulo si la posesión no tiene ninguna antes del evento).
+
+    Args:
+        events: Eventos ordenados con ``order_events``
+        restarts: Máscara booleana de los eventos que inician la jugada
+
+    Returns:
+        pd.Series: ``index`` de la jugada de origen por evento
+    """
+    keys = [events[col] for col in ('match_id', 'possession') if col in events.columns]
+    origin = events['index'].where(restarts)
+    return origin.groupby(keys, sort=False).ffill() if keys else origin.ffill()
+
+
+def restart_sequences(events, restarts, types=None):
+    """
+    Eventos posteriores a cada jugada a balón parado dentro de la misma posesión.
+
+    Args:
+        events: Eventos ordenados con ``order_events``
+        restarts: Máscara booleana de los eventos que inician la jugada
+        types: Tipos de evento a conservar (p. ej. ['Pass', 'Shot'])
+
+    Returns:
+        pd.DataFrame: Eventos de seguimiento con la columna ``restart_index``
+    """
+    origin = link_to_restarts(events, restarts)
+    follow_up = origin.notna() & ~pd.Series(restarts, index=events.index)
+    if types is not None:
+        follow_up &= events['type'].isin(types)
+    return events[follow_up].assign(restart_index=origin[follow_up].astype('int64'))
@@ -0,0 +1,137 @@
+"""
+Índice de similitud entre jugadores de la liga.
+
+Las estadísticas de temporada de ``extract_player_season_stats`` se estandarizan
+(z-score por métrica) y se guardan como una matriz densa float32, una fila por
+jugador. La búsqueda de los k jugadores más parecidos a uno dado es una distancia
+euclídea contra toda la matriz más un ``argpartition``, de modo que una consulta
+sobre la liga completa tarda milisegundos.
+"""
+
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from data.percentiles import PLAYER_SEASON_STATS_CSV
+
+# Métricas por 90 minutos que describen el perfil de un jugador (las que existan en la tabla)
+SIMILARITY_COLUMNS = [
+    'player_season_np_xg_90', 'player_season_np_shots_90', 'player_season_xa_90',
+    'player_season_key_passes_90', 'player_season_dribbles_90', 'player_season_deep_progressions_90',
+    'player_season_touches_inside_box_90', 'player_season_crosses_90', 'player_season_long_balls_90',
+    'player_season_passing_ratio', 'player_season_pressures_90', 'player_season_tackles_90',
+    'player_season_interceptions_90', 'player_season_ball_recoveries_90', 'player_season_aerial_wins_90',
+    'player_season_obv_90',
+]
+
+# Minutos mínimos en la temporada para entrar en el índice
+MIN_MINUTES = float(os.getenv("SMARTAUDAX_SIMILARITY_MIN_MINUTES", "300"))
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+class SimilarityIndex:
+    """Matriz estandarizada de perfiles de jugador con búsqueda de vecinos."""
+
+    def __init__(self, stats, columns=None, min_minutes=MIN_MINUTES):
+        if columns is None:
+            columns = [col for col in SIMILARITY_COLUMNS if col in stats.columns]
+            if len(columns) < 2:
+                columns = [col for col in stats.columns
+                           if col.endswith('_90') and pd.api.types.is_numeric_dtype(stats[col])]
+        self.columns = list(columns)
+
+        if 'player_season_minutes' in stats.columns:
+            stats = stats[(stats['player_season_minutes'] >= min_minutes).to_numpy(dtype=bool)]
+        stats = stats.drop_duplicates('player_id', keep='last').reset_index(drop=True)
+        self.players = pd.DataFrame({
+            'player_id': stats['player_id'].astype('int64'),
+            'player_name': stats['player_name'] if 'player_name' in stats.columns else stats['player_id'].astype(str),
+            'team_name': stats['team_name'] if 'team_name' in stats.columns else None,
+            'position': stats['primary_position'] if 'primary_position' in stats.columns else None,
+            'minutes': stats['player_season_minutes'] if 'player_season_minutes' in stats.columns else np.nan,
+        })
+        self._row = pd.Index(self.players['player_id'])
+
+        values = stats[self.columns].to_numpy(dtype='float64')
+        self.mean = np.nanmean(values, axis=0) if len(values) else np.zeros(len(self.columns))
+        std = np.nanstd(values, axis=0) if len(values) else np.ones(len(self.columns))
+        self.std = np.where(std > 0, std, 1.0)
+        # Valores faltantes: media de la liga (0 tras estandarizar)
+        self.matrix = np.nan_to_num((values - self.mean) / self.std).astype(np.float32)
+
+    def __len__(self):
+        return len(self.players)
+
+    def position(self, player):
+        """Fila de un jugador en la matriz a partir de su ID o nombre (None si no está)."""
+        if isinstance(player, str):
+            rows = np.flatnonzero((self.players['player_name'] == player).to_numpy())
+            return int(rows[0]) if len(rows) else None
+        row = self._row.get_indexer([int(player)])[0]
+        return None if row < 0 else int(row)
+
+    def similar(self, player, k=10, position=None):
+        """
+        Los ``k`` jugadores más parecidos a ``player``.
+
+        Args:
+            player: ID o nombre del jugador
+            k: Número de resultados
+            position: Limitar a una posición principal (``primary_position``)
+
+        Returns:
+            pd.DataFrame: Jugadores ordenados por distancia, con ``distance`` y ``similarity`` (0-100)
+        """
+        row = self.position(player)
+        if row is None:
+            raise ValueError(f'El jugador {player} no está en el índice de similitud')
+        distances = np.sqrt(((self.matrix - self.matrix[row]) ** 2).sum(axis=1))
+        candidates = np.ones(len(self.matrix), dtype=bool)
+        candidates[row] = False
+        if position is not None:
+            candidates &= (self.players['position'] == position).to_numpy(dtype=bool)
+        rows = np.flatnonzero(candidates)
+        if not len(rows):
+            return self.players.iloc[[]].assign(distance=[], similarity=[])
+        k = min(k, len(rows))
+        top = rows[np.argpartition(distances[rows], k - 1)[:k]]
+        top = top[np.argsort(distances[top], kind='stable')]
+        # Similitud relativa a la distancia típica entre jugadores del índice
+        scale = np.median(distances[rows]) or 1.0
+        return self.players.iloc[top].assign(
+            distance=distances[top].round(3),
+            similarity=(100 * np.exp(-distances[top] / scale)).round(1),
+        ).reset_index(drop=True)
+
+    def profile(self, player):
+        """Valores estandarizados (z-score) de un jugador por métrica."""
+        row = self.position(player)
+        if row is None:
+            raise ValueError(f'El jugador {player} no está en el índice de similitud')
+        return pd.Series(self.matrix[row], index=self.columns)
+
+
+def similarity_index(path=PLAYER_SEASON_STATS_CSV, columns=None, min_minutes=MIN_MINUTES):
+    """
+    Índice de similitud de la tabla de estadísticas de temporada, reconstruido solo
+    cuando el archivo cambia.
+
+    Returns:
+        SimilarityIndex | None: None si la tabla no existe
+    """
+    if not os.path.exists(path):
+        return None
+    key = (path, tuple(columns) if columns is not None else None, min_minutes)
+    mtime = os.path.getmtime(path)
+    with _indexes_lock:
+        cached = _indexes.get(key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+    index = SimilarityIndex(pd.read_csv(path), columns=columns, min_minutes=min_minutes)
+    with _indexes_lock:
+        _indexes[key] = (mtime, index)
+    return index
@@ -0,0 +1,128 @@
+"""
+Asignación de zonas del campo a los eventos.
+
+Una rejilla se describe con un diccionario:
+- Rectangular: ``{'x': [cortes en x], 'y': [cortes en y]}``; las zonas se numeran
+  de la propia portería hacia la rival y, dentro de cada franja, de y=0 a y=80.
+  Un punto sobre un corte cuenta en la zona siguiente, salvo los cortes listados
+  en ``'x_closed'``/``'y_closed'``, que cierran la zona anterior.
+- Polígonos: ``{'polygons': {nombre: [(x, y), ...]}}``; la zona es el índice del
+  primer polígono que contiene el punto.
+
+``assign_zones`` calcula el ID de zona de todos los eventos a la vez (-1 si el
+evento no tiene coordenadas o cae fuera de todos los polígonos) y ``zone_table``
+resume cualquier tipo de evento por zona con un único ``groupby``.
+Coordenadas de StatsBomb: campo de 120 x 80.
+"""
+
+import numpy as np
+from matplotlib.path import Path
+
+PITCH_LENGTH = 120
+PITCH_WIDTH = 80
+
+GRIDS = {
+    # Tercios a lo largo del campo, con los cortes históricos del informe:
+    # x < 33 defensivo, 33 <= x <= 66 medio, x > 66 ofensivo
+    'thirds': {'x': [33, 66], 'y': [], 'x_closed': [66]},
+    # Cinco carriles: bandas, carriles interiores y centro
+    'channels': {'x': [], 'y': [18, 30, 50, 62]},
+    # 6 franjas x 3 carriles
+    'zones18': {'x': [20, 40, 60, 80, 100], 'y': [80 / 3, 160 / 3]},
+}
+
+
+def _grid(grid):
+    return GRIDS[grid] if isinstance(grid, str) else grid
+
+
+def _bins(edges, values, closed):
+    bins = np.searchsorted(edges, values, side='right')
+    if closed:
+        bins -= np.isin(values, closed)
+    return bins
+
+
+def zone_labels(grid):
+    """Nombres de las zonas de una rejilla, en el orden de sus IDs."""
+    grid = _grid(grid)
+    if 'polygons' in grid:
+        return list(grid['polygons'])
+    n_y = len(grid.get('y', [])) + 1
+    n_x = len(grid.get('x', [])) + 1
+    return [f'x{ix}_y{iy}' if n_y > 1 and n_x > 1 else (f'x{ix}' if n_y == 1 else f'y{iy}')
+            for ix in range(n_x) for iy in range(n_y)]
+
+
+def assign_zones(x, y, grid):
+    """
+    ID de zona de cada punto.
+
+    Args:
+        x: Coordenadas x (array o Serie)
+        y: Coordenadas y (array o Serie)
+        grid: Nombre de una rejilla de GRIDS o diccionario de rejilla
+
+    Returns:
+        np.ndarray: IDs de zona (int16), -1 sin zona
+    """
+    grid = _grid(grid)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    valid = ~(np.isnan(x) | np.isnan(y))
+    zones = np.full(len(x), -1, dtype=np.int16)
+
+    if 'polygons' in grid:
+        points = np.column_stack([x, y])
+        for zone_id, polygon in reversed(list(enumerate(grid['polygons'].values()))):
+            # Recorrido inverso: ante solapamientos gana el primer polígono
+            inside = valid & Path(polygon).contains_points(points)
+            zones[inside] = zone_id
+        return zones
+
+    y_edges = grid.get('y', [])
+    ix = _bins(grid.get('x', []), x[valid], grid.get('x_closed'))
+    iy = _bins(y_edges, y[valid], grid.get('y_closed'))
+    zones[valid] = ix * (len(y_edges) + 1) + iy
+    return zones
+
+
+def add_zone_column(events, grid, name='zone', point='start'):
+    """
+    Añade a los eventos una columna con su zona.
+
+    Args:
+        events: Eventos con ``location_x``/``location_y`` (``add_coordinate_columns``)
+        grid: Rejilla (nombre o diccionario)
+        name: Nombre de la columna
+        point: 'start' (``location``) o 'end' (destino del pase, conducción o tiro)
+    """
+    x_col, y_col = ('location_x', 'location_y') if point == 'start' else ('end_x', 'end_y')
+    return events.assign(**{name: assign_zones(events[x_col], events[y_col], grid)})
+
+
+def zone_table(events, grid, by='team_id', types=None, value=None, point='start'):
+    """
+    Tabla de eventos por zona: filas según ``by`` y una columna por zona.
+
+    Args:
+        events: Eventos con columnas de coordenadas
+        grid: Rejilla (nombre o diccionario)
+        by: Columna o lista de columnas de agrupación ('team_id', 'player_id', 'type'...)
+        types: Tipos de evento a incluir (por defecto todos)
+        value: Columna a sumar (p. ej. 'shot_statsbomb_xg'); por defecto se cuentan eventos
+        point: 'start' o 'end'
+
+    Returns:
+        pd.DataFrame: Conteos (o sumas) con una columna por ID de zona
+    """
+    if types is not None:
+        events = events[events['type'].isin(types)]
+    zones = add_zone_column(events, grid, name='_zone', point=point)
+    zones = zones[zones['_zone'] >= 0]
+    keys = ([by] if isinstance(by, str) else list(by)) + ['_zone']
+    grouped = zones.groupby(keys, observed=True)
+    table = grouped[value].sum() if value is not None else grouped.size()
+    table = table.unstack('_zone', fill_value=0)
+    table = table.reindex(columns=range(len(zone_labels(grid))), fill_value=0)
+    return table.rename_axis(columns='zone')
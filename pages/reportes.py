@@ -7,6 +7,13 @@ import os
 import re
 from io import BytesIO
 from data.extraccion_datos import update_matches_only
+from data.event_frames import add_coordinate_columns
+from data.event_graph import graph_for
+from data.possessions import chains_for
+from data.similarity import similarity_index
+from data.percentiles import player_percentiles
+from data.fingerprints import fingerprint_index
+from data.scouting import SCOUTING_MATCHES, scouting_profile
 import matplotlib.pyplot as plt
 import mplsoccer
 from mplsoccer import Pitch
@@ -83,14 +90,16 @@ def actualizar_extraccion():
     Actualiza únicamente el archivo de matches sin extraer todos los datos.
     """
     try:
-        update_matches_only()
-        return True, "Lista de partidos actualizada exitosamente."
+        delta = update_matches_only()
+        return True, f"Lista de partidos actualizada: {len(delta['new'])} nuevos, {len(delta['changed'])} actualizados."
     except Exception as e:
         return False, f"Error al actualizar la lista de partidos: {str(e)}"
 
 
 def generar_visualizaciones_ataque(attack_data, pdf):
     """Genera visualizaciones para la sección de ataque."""
+    attack_data = add_coordinate_columns(attack_data)
+
     # Crear figura con dos subplots
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(20, 10))
     
@@ -99,16 +108,10 @@ def generar_visualizaciones_ataque(attack_data, pdf):
     pitch.draw(ax=ax1)
     
     # Filtrar eventos de tiro
-    shots = attack_data[attack_data["type"] == "Shot"].copy()
-    
-    # Extraer coordenadas de inicio y fin
-    shots['start_x'] = shots['location'].apply(lambda x: float(x[0]) if isinstance(x, list) and len(x) >= 2 else None)
-    shots['start_y'] = shots['location'].apply(lambda x: float(x[1]) if isinstance(x, list) and len(x) >= 2 else None)
-    shots['end_x'] = shots['shot_end_location'].apply(lambda x: float(x[0]) if isinstance(x, list) and len(x) >= 2 else None)
-    shots['end_y'] = shots['shot_end_location'].apply(lambda x: float(x[1]) if isinstance(x, list) and len(x) >= 2 else None)
+    shots = attack_data[attack_data["type"] == "Shot"]
     
     # Eliminar filas con coordenadas inválidas
-    shots = shots.dropna(subset=['start_x', 'start_y', 'end_x', 'end_y'])
+    shots = shots.dropna(subset=['location_x', 'location_y', 'end_x', 'end_y'])
     
     # Separar tiros por resultado
     goals = shots[shots["shot_outcome"] == "Goal"]
@@ -117,29 +120,39 @@ def generar_visualizaciones_ataque(attack_data, pdf):
     
     # Plotear tiros
     if not goals.empty:
-        pitch.scatter(goals['start_x'], goals['start_y'], ax=ax1, color='green', marker='*', s=200, label='Goles')
+        pitch.scatter(goals['location_x'], goals['location_y'], ax=ax1, color='green', marker='*', s=200, label='Goles')
         pitch.arrows(
-            goals['start_x'], goals['start_y'],
+            goals['location_x'], goals['location_y'],
             goals['end_x'], goals['end_y'],
             ax=ax1, color='green', width=2, headwidth=5, headlength=5, alpha=0.6
         )
     
     if not on_target.empty:
-        pitch.scatter(on_target['start_x'], on_target['start_y'], ax=ax1, color='yellow', marker='o', s=100, label='A puerta')
+        pitch.scatter(on_target['location_x'], on_target['location_y'], ax=ax1, color='yellow', marker='o', s=100, label='A puerta')
         pitch.arrows(
-            on_target['start_x'], on_target['start_y'],
+            on_target['location_x'], on_target['location_y'],
             on_target['end_x'], on_target['end_y'],
             ax=ax1, color='yellow', width=2, headwidth=5, headlength=5, alpha=0.6
         )
     
     if not off_target.empty:
-        pitch.scatter(off_target['start_x'], off_target['start_y'], ax=ax1, color='red', marker='x', s=100, label='Fuera')
+        pitch.scatter(off_target['location_x'], off_target['location_y'], ax=ax1, color='red', marker='x', s=100, label='Fuera')
         pitch.arrows(
-            off_target['start_x'], off_target['start_y'],
+            off_target['location_x'], off_target['location_y'],
             off_target['end_x'], off_target['end_y'],
             ax=ax1, color='red', width=2, headwidth=5, headlength=5, alpha=0.6
         )
     
+    # Pases clave que generaron los tiros (enlazados por pass_assisted_shot_id)
+    key_passes = graph_for(attack_data).key_pass_shots()
+    key_passes = key_passes.dropna(subset=['location_x', 'location_y', 'end_x', 'end_y'])
+    if not key_passes.empty:
+        pitch.lines(
+            key_passes['location_x'], key_passes['location_y'],
+            key_passes['end_x'], key_passes['end_y'],
+            ax=ax1, color='white', lw=1.5, alpha=0.5, label='Pases clave'
+        )
+    
     # Configurar vista de mitad del campo (solo zona ofensiva)
     ax1.set_xlim(60, 120)  # Solo mostrar desde la línea media hacia adelante
     ax1.set_title('Mapa de Tiros (Zona Ofensiva)', fontsize=15)
@@ -150,26 +163,20 @@ def generar_visualizaciones_ataque(attack_data, pdf):
     pitch2.draw(ax=ax2)
     
     # Filtrar pases
-    passes = attack_data[attack_data["type"] == "Pass"].copy()
-    
-    # Extraer coordenadas de inicio y fin
-    passes['start_x'] = passes['location'].apply(lambda x: float(x[0]) if isinstance(x, list) and len(x) >= 2 else None)
-    passes['start_y'] = passes['location'].apply(lambda x: float(x[1]) if isinstance(x, list) and len(x) >= 2 else None)
-    passes['end_x'] = passes['pass_end_location'].apply(lambda x: float(x[0]) if isinstance(x, list) and len(x) >= 2 else None)
-    passes['end_y'] = passes['pass_end_location'].apply(lambda x: float(x[1]) if isinstance(x, list) and len(x) >= 2 else None)
+    passes = attack_data[attack_data["type"] == "Pass"]
     
     # Eliminar filas con coordenadas inválidas
-    passes = passes.dropna(subset=['start_x', 'start_y', 'end_x', 'end_y'])
+    passes = passes.dropna(subset=['location_x', 'location_y', 'end_x', 'end_y'])
     
     # Calcular pases progresivos
     # Un pase es progresivo si:
     # 1. Se mueve al menos 10 metros hacia adelante
     # 2. El punto final está en el tercio ofensivo del campo
-    passes['distance_forward'] = passes['end_x'] - passes['start_x']
-    passes['is_progressive'] = (passes['distance_forward'] >= 10) & (passes['end_x'] >= 80)
+    distance_forward = passes['end_x'] - passes['location_x']
+    is_progressive = (distance_forward >= 10) & (passes['end_x'] >= 80)
     
     # Filtrar pases progresivos
-    progressive_passes = passes[passes['is_progressive']]
+    progressive_passes = passes[is_progressive]
     
     # Separar pases completados e incompletos
     completed_passes = progressive_passes[progressive_passes['pass_outcome'].isna()]
@@ -178,8 +185,8 @@ def generar_visualizaciones_ataque(attack_data, pdf):
     # Plotear pases progresivos completados
     if not completed_passes.empty:
         pitch2.arrows(
-            completed_passes['start_x'],
-            completed_passes['start_y'],
+            completed_passes['location_x'],
+            completed_passes['location_y'],
             completed_passes['end_x'],
             completed_passes['end_y'],
             ax=ax2,
@@ -194,8 +201,8 @@ def generar_visualizaciones_ataque(attack_data, pdf):
     # Plotear pases progresivos incompletos
     if not incomplete_passes.empty:
         pitch2.arrows(
-            incomplete_passes['start_x'],
-            incomplete_passes['start_y'],
+            incomplete_passes['location_x'],
+            incomplete_passes['location_y'],
             incomplete_passes['end_x'],
             incomplete_passes['end_y'],
             ax=ax2,
@@ -222,6 +229,7 @@ def generar_visualizaciones_ataque(attack_data, pdf):
 
 def generar_visualizaciones_defensa(defense_data, pdf):
     """Genera visualizaciones para la sección de defensa."""
+    defense_data = add_coordinate_columns(defense_data)
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(20, 10))
     
     # 1. Línea media de recuperaciones y pérdidas
@@ -229,34 +237,28 @@ def generar_visualizaciones_defensa(defense_data, pdf):
     pitch.draw(ax=ax1)
     
     # Filtrar recuperaciones y pérdidas
-    recoveries = defense_data[defense_data["type"] == "Ball Recovery"].copy()
-    dispossessions = defense_data[defense_data["type"] == "Dispossessed"].copy()
-    
-    # Extraer coordenadas
-    recoveries['x'] = recoveries['location'].apply(lambda x: float(x[0]) if isinstance(x, list) and len(x) >= 2 else None)
-    recoveries['y'] = recoveries['location'].apply(lambda x: float(x[1]) if isinstance(x, list) and len(x) >= 2 else None)
-    dispossessions['x'] = dispossessions['location'].apply(lambda x: float(x[0]) if isinstance(x, list) and len(x) >= 2 else None)
-    dispossessions['y'] = dispossessions['location'].apply(lambda x: float(x[1]) if isinstance(x, list) and len(x) >= 2 else None)
+    recoveries = defense_data[defense_data["type"] == "Ball Recovery"]
+    dispossessions = defense_data[defense_data["type"] == "Dispossessed"]
     
     # Eliminar filas con coordenadas inválidas
-    recoveries = recoveries.dropna(subset=['x', 'y'])
-    dispossessions = dispossessions.dropna(subset=['x', 'y'])
+    recoveries = recoveries.dropna(subset=['location_x', 'location_y'])
+    dispossessions = dispossessions.dropna(subset=['location_x', 'location_y'])
     
     # Plotear recuperaciones y pérdidas
     if not recoveries.empty:
-        pitch.scatter(recoveries['x'], recoveries['y'], ax=ax1, color='green', marker='o', s=100, label='Recuperaciones')
+        pitch.scatter(recoveries['location_x'], recoveries['location_y'], ax=ax1, color='green', marker='o', s=100, label='Recuperaciones')
         
         # Calcular y mostrar línea promedio de recuperaciones en X (profundidad)
-        avg_recovery_x = recoveries['x'].mean()
+        avg_recovery_x = recoveries['location_x'].mean()
         
         # Dibujar línea vertical en la posición promedio de recuperaciones
         ax1.axvline(x=avg_recovery_x, color='green', linestyle='-', alpha=0.8, linewidth=5, label=f'Línea Promedio Recuperaciones (X={avg_recovery_x:.1f})')
         
         # Calcular porcentaje de recuperaciones por tercio
         # Tercio defensivo: 0-40, Tercio medio: 40-80, Tercio ofensivo: 80-120
-        defensive_third = len(recoveries[recoveries['x'] <= 40])
-        middle_third = len(recoveries[(recoveries['x'] > 40) & (recoveries['x'] <= 80)])
-        offensive_third = len(recoveries[recoveries['x'] > 80])
+        defensive_third = int((recoveries['location_x'] <= 40).sum())
+        middle_third = int(((recoveries['location_x'] > 40) & (recoveries['location_x'] <= 80)).sum())
+        offensive_third = int((recoveries['location_x'] > 80).sum())
         total_recoveries = len(recoveries)
         
         defensive_pct = (defensive_third / total_recoveries) * 100
@@ -277,29 +279,21 @@ def generar_visualizaciones_defensa(defense_data, pdf):
     pitch2.draw(ax=ax2)
     
     # Filtrar presiones y tackles
-    pressures = defense_data[defense_data["type"] == "Pressure"].copy()
-    tackles = defense_data[defense_data["type"] == "Tackle"].copy()
-    interceptions = defense_data[defense_data["type"] == "Interception"].copy()
-    
-    # Extraer coordenadas
-    pressures['x'] = pressures['location'].apply(lambda x: float(x[0]) if isinstance(x, list) and len(x) >= 2 else None)
-    pressures['y'] = pressures['location'].apply(lambda x: float(x[1]) if isinstance(x, list) and len(x) >= 2 else None)
-    tackles['x'] = tackles['location'].apply(lambda x: float(x[0]) if isinstance(x, list) and len(x) >= 2 else None)
-    tackles['y'] = tackles['location'].apply(lambda x: float(x[1]) if isinstance(x, list) and len(x) >= 2 else None)
-    interceptions['x'] = interceptions['location'].apply(lambda x: float(x[0]) if isinstance(x, list) and len(x) >= 2 else None)
-    interceptions['y'] = interceptions['location'].apply(lambda x: float(x[1]) if isinstance(x, list) and len(x) >= 2 else None)
+    pressures = defense_data[defense_data["type"] == "Pressure"]
+    tackles = defense_data[defense_data["type"] == "Tackle"]
+    interceptions = defense_data[defense_data["type"] == "Interception"]
     
     # Eliminar filas con coordenadas inválidas
-    pressures = pressures.dropna(subset=['x', 'y'])
-    tackles = tackles.dropna(subset=['x', 'y'])
-    interceptions = interceptions.dropna(subset=['x', 'y'])
+    pressures = pressures.dropna(subset=['location_x', 'location_y'])
+    tackles = tackles.dropna(subset=['location_x', 'location_y'])
+    interceptions = interceptions.dropna(subset=['location_x', 'location_y'])
     
     # Crear mapa de calor de presiones
     if not pressures.empty:
         # Crear bins para el mapa de calor
         bin_statistic = pitch2.bin_statistic(
-            pressures['x'],
-            pressures['y'],
+            pressures['location_x'],
+            pressures['location_y'],
             statistic='count',
             bins=(6, 4)
         )
@@ -314,9 +308,9 @@ def generar_visualizaciones_defensa(defense_data, pdf):
     
     # Plotear tackles e intercepciones
     if not tackles.empty:
-        pitch2.scatter(tackles['x'], tackles['y'], ax=ax2, color='orange', marker='s', s=80, label='Tackles', zorder=3)
+        pitch2.scatter(tackles['location_x'], tackles['location_y'], ax=ax2, color='orange', marker='s', s=80, label='Tackles', zorder=3)
     if not interceptions.empty:
-        pitch2.scatter(interceptions['x'], interceptions['y'], ax=ax2, color='yellow', marker='^', s=80, label='Intercepciones', zorder=3)
+        pitch2.scatter(interceptions['location_x'], interceptions['location_y'], ax=ax2, color='yellow', marker='^', s=80, label='Intercepciones', zorder=3)
     
     # Añadir zonas defensivas
     # Zona de presión alta (último tercio)
@@ -341,6 +335,7 @@ def generar_visualizaciones_defensa(defense_data, pdf):
 
 def generar_visualizaciones_pelota_parada(set_piece_data, pdf):
     """Genera visualizaciones para la sección de pelota parada."""
+    set_piece_data = add_coordinate_columns(set_piece_data)
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(20, 10))
     
     # 1. Mapa de córners
@@ -349,32 +344,24 @@ def generar_visualizaciones_pelota_parada(set_piece_data, pdf):
 
     
     # Filtrar córners (pases desde las esquinas)
+    x = set_piece_data["location_x"]
+    y = set_piece_data["location_y"]
     corners = set_piece_data[
         (set_piece_data["type"] == "Pass") &
         (
             # Esquina superior derecha
-            ((set_piece_data["location"].apply(lambda x: float(x[0]) if isinstance(x, list) and len(x) >= 2 else 0) >= 120) &
-             (set_piece_data["location"].apply(lambda x: float(x[1]) if isinstance(x, list) and len(x) >= 2 else 0) == 80)) |
+            ((x >= 120) & (y == 80)) |
             # Esquina superior izquierda
-            ((set_piece_data["location"].apply(lambda x: float(x[0]) if isinstance(x, list) and len(x) >= 2 else 0) >= 120) &
-             (set_piece_data["location"].apply(lambda x: float(x[1]) if isinstance(x, list) and len(x) >= 2 else 0) == 0)) |
+            ((x >= 120) & (y == 0)) |
             # Esquina inferior derecha
-            ((set_piece_data["location"].apply(lambda x: float(x[0]) if isinstance(x, list) and len(x) >= 2 else 0) <= 0) &
-             (set_piece_data["location"].apply(lambda x: float(x[1]) if isinstance(x, list) and len(x) >= 2 else 0) == 80)) |
+            ((x <= 0) & (y == 80)) |
             # Esquina inferior izquierda
-            ((set_piece_data["location"].apply(lambda x: float(x[0]) if isinstance(x, list) and len(x) >= 2 else 0) <= 0) &
-             (set_piece_data["location"].apply(lambda x: float(x[1]) if isinstance(x, list) and len(x) >= 2 else 0) == 0))
+            ((x <= 0) & (y == 0))
         )
-    ].copy()
-    
-    # Extraer coordenadas de inicio y fin
-    corners['start_x'] = corners['location'].apply(lambda x: float(x[0]) if isinstance(x, list) and len(x) >= 2 else None)
-    corners['start_y'] = corners['location'].apply(lambda x: float(x[1]) if isinstance(x, list) and len(x) >= 2 else None)
-    corners['end_x'] = corners['pass_end_location'].apply(lambda x: float(x[0]) if isinstance(x, list) and len(x) >= 2 else None)
-    corners['end_y'] = corners['pass_end_location'].apply(lambda x: float(x[1]) if isinstance(x, list) and len(x) >= 2 else None)
+    ]
     
     # Eliminar filas con coordenadas inválidas
-    corners = corners.dropna(subset=['start_x', 'start_y', 'end_x', 'end_y'])
+    corners = corners.dropna(subset=['location_x', 'location_y', 'end_x', 'end_y'])
     
     # Separar córners completados e incompletos
     completed_corners = corners[corners.get("pass_outcome", "") == "Success"]
@@ -383,7 +370,7 @@ def generar_visualizaciones_pelota_parada(set_piece_data, pdf):
     if not completed_corners.empty:
         # Plotear córners completados como flechas verdes
         pitch.arrows(
-            completed_corners['start_x'], completed_corners['start_y'],
+            completed_corners['location_x'], completed_corners['location_y'],
             completed_corners['end_x'], completed_corners['end_y'],
             ax=ax1, color='green', alpha=0.6,
             width=2, headwidth=5, headlength=5,
@@ -393,7 +380,7 @@ def generar_visualizaciones_pelota_parada(set_piece_data, pdf):
     if not incomplete_corners.empty:
         # Plotear córners incompletos como flechas rojas
         pitch.arrows(
-            incomplete_corners['start_x'], incomplete_corners['start_y'],
+            incomplete_corners['location_x'], incomplete_corners['location_y'],
             incomplete_corners['end_x'], incomplete_corners['end_y'],
             ax=ax1, color='red', alpha=0.6,
             width=2, headwidth=5, headlength=5,
@@ -410,19 +397,16 @@ def generar_visualizaciones_pelota_parada(set_piece_data, pdf):
     # Filtrar tiros libres (faltas en el último tercio)
     free_kicks = set_piece_data[
         (set_piece_data["type"] == "Foul Won") &
-        (set_piece_data["location"].apply(lambda x: float(x[0]) if isinstance(x, list) and len(x) >= 2 else 0) >= 80)
-    ].copy()
-    # Extraer coordenadas
-    free_kicks['x'] = free_kicks['location'].apply(lambda x: float(x[0]) if isinstance(x, list) and len(x) >= 2 else None)
-    free_kicks['y'] = free_kicks['location'].apply(lambda x: float(x[1]) if isinstance(x, list) and len(x) >= 2 else None)
+        (set_piece_data["location_x"] >= 80)
+    ]
     
     # Eliminar filas con coordenadas inválidas
-    free_kicks = free_kicks.dropna(subset=['x', 'y'])
+    free_kicks = free_kicks.dropna(subset=['location_x', 'location_y'])
     
     if not free_kicks.empty:
         # Plotear tiros libres como puntos
         pitch2.scatter(
-            free_kicks['x'], free_kicks['y'],
+            free_kicks['location_x'], free_kicks['location_y'],
             ax=ax2, color='red', marker='o', s=100,
             label='Tiros libres'
         )
@@ -442,37 +426,22 @@ def generar_visualizaciones_pelota_parada(set_piece_data, pdf):
 
 def generar_visualizaciones_transiciones(transition_data, pdf):
     """Genera visualizaciones para la sección de transiciones."""
+    transition_data = add_coordinate_columns(transition_data)
     fig, (ax1) = plt.subplots(1, figsize=(10, 10))
     
     # 1. Mapa de contragolpes y carreras progresivas
     pitch = Pitch(pitch_type='statsbomb', line_zorder=2, pitch_color='#22312b', line_color='#c7d5cc')
     pitch.draw(ax=ax1)
     
-    # Filtrar contragolpes (recuperaciones seguidas de pases o carreras)
-    counter_attacks = transition_data[
-        (transition_data["type"].isin(["Ball Recovery", "Interception"])) |
-        (transition_data["type"].isin(["Pass", "Carry"]))
-    ].copy()
-    
-    # Agrupar eventos por secuencia
-    counter_attacks['sequence'] = counter_attacks.groupby(
-        (counter_attacks['type'].isin(['Ball Recovery', 'Interception'])).cumsum()
-    ).cumcount()
-    
-    # Filtrar solo las primeras acciones después de recuperación (secuencia 1)
-    counter_attacks = counter_attacks[counter_attacks['sequence'] == 1]
-    
-    # Extraer coordenadas
-    counter_attacks['start_x'] = counter_attacks['location'].apply(lambda x: float(x[0]) if isinstance(x, list) and len(x) >= 2 else None)
-    counter_attacks['start_y'] = counter_attacks['location'].apply(lambda x: float(x[1]) if isinstance(x, list) and len(x) >= 2 else None)
-    counter_attacks['end_x'] = counter_attacks['pass_end_location'].apply(lambda x: float(x[0]) if isinstance(x, list) and len(x) >= 2 else None)
-    counter_attacks['end_y'] = counter_attacks['pass_end_location'].apply(lambda x: float(x[1]) if isinstance(x, list) and len(x) >= 2 else None)
+    # Contragolpes: cadenas de posesión que empiezan con una recuperación y avanzan rápido
+    chains = chains_for(transition_data)
+    counter_attacks = chains[chains['counterattack']] if not chains.empty else chains
     
     # Eliminar filas con coordenadas inválidas
-    counter_attacks = counter_attacks.dropna(subset=['start_x', 'start_y', 'end_x', 'end_y'])
+    counter_attacks = counter_attacks.dropna(subset=['start_x', 'start_y', 'end_x', 'end_y']) if not counter_attacks.empty else counter_attacks
     
     if not counter_attacks.empty:
-        # Plotear contragolpes como flechas
+        # Plotear contragolpes como flechas (inicio -> fin de la posesión)
         pitch.arrows(
             counter_attacks['start_x'], counter_attacks['start_y'],
             counter_attacks['end_x'], counter_attacks['end_y'],
@@ -484,28 +453,22 @@ def generar_visualizaciones_transiciones(transition_data, pdf):
     # Filtrar carreras progresivas (avance significativo)
     progressive_carries = transition_data[
         (transition_data["type"] == "Carry")
-    ].copy()
-    
-    # Extraer coordenadas
-    progressive_carries['start_x'] = progressive_carries['location'].apply(lambda x: float(x[0]) if isinstance(x, list) and len(x) >= 2 else None)
-    progressive_carries['start_y'] = progressive_carries['location'].apply(lambda x: float(x[1]) if isinstance(x, list) and len(x) >= 2 else None)
-    progressive_carries['end_x'] = progressive_carries['carry_end_location'].apply(lambda x: float(x[0]) if isinstance(x, list) and len(x) >= 2 else None)
-    progressive_carries['end_y'] = progressive_carries['carry_end_location'].apply(lambda x: float(x[1]) if isinstance(x, list) and len(x) >= 2 else None)
+    ]
     
     # Eliminar filas con coordenadas inválidas
-    progressive_carries = progressive_carries.dropna(subset=['start_x', 'start_y', 'end_x', 'end_y'])
+    progressive_carries = progressive_carries.dropna(subset=['location_x', 'location_y', 'end_x', 'end_y'])
     
     if not progressive_carries.empty:
         # Calcular progresión (avance en el eje x)
-        progressive_carries['progression'] = progressive_carries['end_x'] - progressive_carries['start_x']
+        progression = progressive_carries['end_x'] - progressive_carries['location_x']
         
         # Filtrar solo carreras con progresión significativa (> 10 metros)
-        progressive_carries = progressive_carries[progressive_carries['progression'] > 10]
+        progressive_carries = progressive_carries[progression > 10]
         
         if not progressive_carries.empty:
             # Plotear carreras progresivas como flechas
             pitch.arrows(
-                progressive_carries['start_x'], progressive_carries['start_y'],
+                progressive_carries['location_x'], progressive_carries['location_y'],
                 progressive_carries['end_x'], progressive_carries['end_y'],
                 ax=ax1, color='yellow', alpha=0.6,
                 width=2, headwidth=5, headlength=5,
@@ -773,6 +736,110 @@ def generar_reporte(id_partido, local, visitante):
         st.error(f"Error al generar el reporte: {str(e)}")
 
 
+def mostrar_jugadores_similares():
+    """
+    Buscador de jugadores con perfil estadístico parecido (estadísticas de temporada de la liga).
+    """
+    indice = similarity_index()
+    if indice is None or len(indice) == 0:
+        st.info("No hay estadísticas de temporada de jugadores. Ejecuta la extracción completa de datos primero.")
+        return
+
+    jugadores = indice.players.sort_values("player_name")
+    etiquetas = {
+        int(j.player_id): f"{j.player_name} ({j.team_name})" if isinstance(j.team_name, str) else str(j.player_name)
+        for j in jugadores.itertuples()
+    }
+    col_jugador, col_posicion, col_k = st.columns([3, 2, 1])
+    with col_jugador:
+        jugador = st.selectbox("Jugador", list(etiquetas), format_func=etiquetas.get, key="similares_jugador")
+    with col_posicion:
+        posiciones = sorted(p for p in indice.players["position"].dropna().unique())
+        posicion = st.selectbox("Posición", ["Todas"] + posiciones, key="similares_posicion")
+    with col_k:
+        k = st.number_input("Resultados", min_value=1, max_value=50, value=10, key="similares_k")
+
+    similares = indice.similar(jugador, k=int(k), position=None if posicion == "Todas" else posicion)
+    st.dataframe(
+        similares.rename(columns={
+            "player_name": "Jugador", "team_name": "Equipo", "position": "Posición",
+            "minutes": "Minutos", "similarity": "Similitud",
+        }).drop(columns=["player_id", "distance"]),
+        hide_index=True,
+        use_container_width=True,
+    )
+    st.caption("Métricas comparadas: " + ", ".join(c.replace("player_season_", "") for c in indice.columns))
+
+    percentiles = player_percentiles(jugador, indice.columns)
+    if not percentiles.empty:
+        st.markdown(f"**Percentiles en la liga de {etiquetas[jugador]}**")
+        st.dataframe(
+            percentiles.rename(lambda c: c.replace("player_season_", "")).rename("Percentil").to_frame(),
+            use_container_width=True,
+        )
+
+
+def mostrar_partidos_similares(match_id, df_matches, k=5):
+    """
+    Partidos con la huella más parecida (posesión, xG, presión...) a la del partido indicado.
+    Usa solo las huellas ya calculadas; no vuelve a cargar eventos.
+    """
+    indice = fingerprint_index()
+    if indice is None or match_id not in indice:
+        st.info("Este partido aún no tiene huella: se calcula al sincronizar los partidos si sus eventos están en el dataset de eventos (carga histórica).")
+        return
+
+    similares = indice.similar(match_id, k=k).reset_index()
+    similares = similares.merge(
+        df_matches[["match_id", "match_date", "home_team", "away_team", "home_score", "away_score"]],
+        on="match_id", how="left",
+    )
+    similares["Resultado"] = similares["home_score"].astype("Int64").astype(str) + "-" + similares["away_score"].astype("Int64").astype(str)
+    st.dataframe(
+        similares.rename(columns={
+            "match_date": "Fecha", "home_team": "Local", "away_team": "Visitante", "distance": "Distancia",
+        })[["Fecha", "Local", "Visitante", "Resultado", "Distancia"]],
+        hide_index=True,
+        use_container_width=True,
+    )
+
+
+def mostrar_scouting(df_matches):
+    """
+    Perfil de un rival en sus últimos N partidos: estadísticas clave por partido y su
+    media y variabilidad, calculadas en un solo lote.
+    """
+    equipos = sorted(set(df_matches["home_team"]) | set(df_matches["away_team"]))
+    col_equipo, col_n, col_boton = st.columns([3, 1, 1])
+    with col_equipo:
+        equipo = st.selectbox("Equipo", equipos, key="scouting_equipo")
+    with col_n:
+        n = st.number_input("Partidos", min_value=1, max_value=15, value=SCOUTING_MATCHES, key="scouting_n")
+    with col_boton:
+        generar = st.button("Generar perfil", key="scouting_generar")
+
+    if not generar:
+        return
+    with st.spinner(f"Analizando los últimos {int(n)} partidos de {equipo}..."):
+        try:
+            perfil = scouting_profile(equipo, n=int(n), matches=df_matches)
+        except Exception as e:
+            st.error(f"❌ Error al generar el perfil: {str(e)}")
+            return
+
+    st.write("**Partidos analizados**")
+    st.dataframe(perfil["matches"].rename(columns={"match_date": "Fecha", "opponent": "Rival", "score": "Resultado"}),
+                 hide_index=True, use_container_width=True)
+    if perfil["formations"]:
+        st.write("**Formaciones:** " + ", ".join(f"{f} ({v})" for f, v in perfil["formations"].items()))
+    st.write("**Perfil (media y variabilidad entre partidos)**")
+    st.dataframe(perfil["profile"].rename(columns={
+        "mean": "Media", "std": "Desviación", "min": "Mínimo", "max": "Máximo", "cv": "Coef. variación",
+    }), use_container_width=True)
+    with st.expander("Estadísticas por partido"):
+        st.dataframe(perfil["per_match"].T, use_container_width=True)
+
+
 def main():
     st.set_page_config(page_title="Reportes Post-Partido", layout="wide", initial_sidebar_state="collapsed")
     
@@ -827,12 +894,24 @@ def main():
     if st.button("🔄 Actualizar Partidos", help="Actualiza la lista de partidos desde StatsBomb API"):
         with st.spinner("Actualizando lista de partidos..."):
             try:
-                update_matches_only()
-                st.success("✅ Lista de partidos actualizada exitosamente")
-                st.rerun()
+                delta = update_matches_only()
+                if delta['new'] or delta['changed'] or delta['removed']:
+                    st.success(f"✅ Lista de partidos actualizada: {len(delta['new'])} nuevos, "
+                               f"{len(delta['changed'])} actualizados, {len(delta['removed'])} eliminados")
+                    st.rerun()
+                else:
+                    st.success("✅ La lista de partidos ya estaba al día")
             except Exception as e:
                 st.error(f"❌ Error al actualizar: {str(e)}")
 
+    # Scouting: perfil de un rival en sus últimos partidos
+    with st.expander("🔭 Scouting de rival"):
+        mostrar_scouting(df_matches)
+
+    # Scouting: jugadores parecidos a uno dado
+    with st.expander("🧭 Jugadores similares"):
+        mostrar_jugadores_similares()
+
     st.markdown("---")
     
     # Filtros en una misma línea usando columnas
@@ -884,7 +963,7 @@ def main():
         return
     
     # Encabezados de la tabla
-    col_header1, col_header2, col_header3, col_header4, col_header5 = st.columns([2, 2.5, 2.5, 1.5, 1.5])
+    col_header1, col_header2, col_header3, col_header4, col_header5, col_header6 = st.columns([2, 2.5, 2.5, 1.5, 1.5, 1.2])
     with col_header1:
         st.write("**Fecha**")
     with col_header2:
@@ -895,12 +974,14 @@ def main():
         st.write("**Resultado**")
     with col_header5:
         st.write("**Acción**")
+    with col_header6:
+        st.write("**Parecidos**")
     
     st.markdown("---")
     
     # Mostrar cada partido
     for i, row in df_filtrado.iterrows():
-        col1, col2, col3, col4, col5 = st.columns([2, 2.5, 2.5, 1.5, 1.5])
+        col1, col2, col3, col4, col5, col6 = st.columns([2, 2.5, 2.5, 1.5, 1.5, 1.2])
         
         # Determinar si es partido de Audax para mostrar indicador
         es_audax = row["home_team"] == "Audax Italiano" or row["away_team"] == "Audax Italiano"
@@ -955,6 +1036,12 @@ def main():
                 
             if st.button(button_text, key=f"reporte_{i}", help=button_help):
                 generar_reporte(row["match_id"], row["home_team"], row["away_team"])
+
+        with col6:
+            ver_parecidos = st.button("🧬", key=f"parecidos_{i}", help="Buscar partidos con una huella parecida")
+
+        if ver_parecidos:
+            mostrar_partidos_similares(row["match_id"], df_matches)
         
         # Añadir una línea sutil entre partidos
         if i < len(df_filtrado) - 1:
@@ -0,0 +1,72 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data import dimensions  # noqa: E402
+
+AUDAX_ID = 10
+RIVAL_ID = 20
+
+
+@pytest.fixture(autouse=True)
+def empty_dimensions(tmp_path, monkeypatch):
+    """Los nombres salen de los eventos de prueba, no de las dimensiones locales."""
+    monkeypatch.setattr(dimensions, 'DIMENSIONS_DIR', str(tmp_path / 'dimensions'))
+    dimensions._tables.clear()
+
+
+def event(type, team, player, x=None, **fields):
+    team_id = AUDAX_ID if team == 'Audax Italiano' else RIVAL_ID
+    return {
+        'id': fields.pop('id', None),
+        'match_id': fields.pop('match_id', 1),
+        'type': type,
+        'team': team,
+        'team_id': team_id,
+        'player': player,
+        'player_id': fields.pop('player_id', None),
+        'location': None if x is None else [float(x), 40.0],
+        **fields,
+    }
+
+
+@pytest.fixture
+def match_events():
+    """Un partido pequeño con tiros, pases, presiones, duelos, recuperaciones y conducciones."""
+    audax, rival = 'Audax Italiano', 'Rival'
+    rows = [
+        event('Shot', audax, 'A1', 100, id='s1', shot_statsbomb_xg=0.3, shot_outcome='Goal'),
+        event('Shot', audax, 'A2', 95, id='s2', shot_statsbomb_xg=0.1, shot_outcome='Saved'),
+        event('Pass', audax, 'A1', 60, pass_length=25.0, pass_assisted_shot_id='s1'),
+        event('Pass', audax, 'A1', 40, pass_length=10.0),
+        event('Pass', audax, 'A2', 50, pass_length=30.0, pass_outcome='Incomplete'),
+        event('Pass', audax, 'A2', 45, pass_length=5.0),
+        event('Pressure', audax, 'A1', 70, counterpress=True),
+        event('Pressure', audax, 'A2', 50),
+        event('Duel', audax, 'A1', 30, duel_type='Tackle', duel_outcome='Won'),
+        event('Duel', audax, 'A2', 60, duel_type='Aerial Lost'),
+        event('Ball Recovery', audax, 'A1', 20),
+        event('Ball Recovery', audax, 'A2', 33),
+        event('Ball Recovery', audax, 'A1', 66),
+        event('Ball Recovery', audax, 'A2', 80),
+        event('Carry', audax, 'A1', 33),
+        event('Carry', audax, 'A2', 66),
+        event('Carry', audax, 'A1', 67),
+        event('Interception', audax, 'A2', 25),
+        event('Block', audax, 'A1', 10),
+        event('Clearance', audax, 'A2', 5),
+        event('Pass', rival, 'R1', 50, pass_length=22.0),
+        event('Shot', rival, 'R1', 105, id='s3', shot_statsbomb_xg=0.05, shot_outcome='Off T'),
+        event('Duel', rival, 'R1', 60, duel_type='Aerial Lost'),
+        event('Duel', rival, 'R1', 55, duel_type='Aerial Lost'),
+        event('Pressure', rival, 'R1', 40),
+    ]
+    events = pd.DataFrame(rows)
+    player_ids = {'A1': 101, 'A2': 102, 'R1': 201}
+    events['player_id'] = events['player'].map(player_ids)
+    events['index'] = range(1, len(events) + 1)
+    return events
@@ -0,0 +1,65 @@
+import gzip
+import os
+
+import pytest
+
+from data import analysis_cache
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(analysis_cache, 'ANALYSIS_CACHE_DIR', str(tmp_path / 'analysis'))
+
+
+def counter():
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {'general': {'key_stats': {'total_shots': len(calls)}}}
+    return compute, calls
+
+
+def test_cached_analysis_is_reused():
+    compute, calls = counter()
+    first = analysis_cache.cached_analysis(1, compute, team='Audax Italiano', version='v1')
+    second = analysis_cache.cached_analysis(1, compute, team='Audax Italiano', version='v1')
+    assert first == second and len(calls) == 1
+    # Cada equipo tiene su propia entrada
+    analysis_cache.cached_analysis(1, compute, team=None, version='v1')
+    assert len(calls) == 2
+
+
+def test_new_data_version_invalidates():
+    compute, calls = counter()
+    analysis_cache.cached_analysis(1, compute, version='v1')
+    assert analysis_cache.load(1, version='v2') is None
+    analysis_cache.cached_analysis(1, compute, version='v2')
+    assert len(calls) == 2
+
+
+def test_new_code_version_invalidates(monkeypatch):
+    compute, calls = counter()
+    analysis_cache.cached_analysis(1, compute, version='v1')
+    monkeypatch.setattr(analysis_cache, 'CODE_VERSION', 'changed')
+    assert analysis_cache.load(1, version='v1') is None
+    assert not os.path.exists(analysis_cache._path(1, None))
+
+
+def test_code_version_covers_the_analysis_modules():
+    base = os.path.dirname(os.path.abspath(analysis_cache.__file__))
+    for name in analysis_cache.ANALYSIS_MODULES:
+        assert os.path.exists(os.path.join(base, name)), name
+
+
+def test_invalidate_and_corrupt_entries():
+    compute, calls = counter()
+    for match_id in (1, 12):
+        analysis_cache.cached_analysis(match_id, compute, team='Audax Italiano', version='v1')
+    analysis_cache.invalidate([1])
+    assert analysis_cache.load(1, team='Audax Italiano', version='v1') is None
+    assert analysis_cache.load(12, team='Audax Italiano', version='v1') is not None
+
+    with gzip.open(analysis_cache._path(12, 'Audax Italiano'), 'wb') as f:
+        f.write(b'not a pickle')
+    assert analysis_cache.load(12, team='Audax Italiano', version='v1') is None
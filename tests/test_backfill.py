@@ -0,0 +1,71 @@
+import types
+
+import pandas as pd
+import pytest
+
+from data import backfill
+
+
+@pytest.fixture
+def season(tmp_path, monkeypatch):
+    """Temporada de tres partidos con un conjunto de datos cuyo partido 2 falla la primera vez."""
+    state = {'versions': {1: 'v1', 2: 'v1', 3: 'v1'}, 'fetched': [], 'failing': {2}}
+
+    def matches(competition_id, season_id, creds):
+        return pd.DataFrame({'match_id': list(state['versions']), 'last_updated': list(state['versions'].values()),
+                             'match_status': 'available'})
+
+    def fetch(creds, match_id):
+        state['fetched'].append(match_id)
+        if match_id in state['failing']:
+            raise RuntimeError('timeout')
+        return pd.DataFrame({'match_id': [match_id], 'value': [1]})
+
+    monkeypatch.setattr(backfill, 'get_credentials', lambda: {})
+    monkeypatch.setattr(backfill, 'sb', types.SimpleNamespace(matches=matches))
+    monkeypatch.setitem(backfill.DATASETS, 'stats', (str(tmp_path / 'stats'), fetch))
+    state['run'] = lambda **kwargs: backfill.backfill(seasons=[(103, 315)], datasets=['stats'],
+                                                      manifest_path=str(tmp_path / 'manifest.json'), **kwargs)
+    return state
+
+
+def test_backfill_resumes_from_the_manifest(season):
+    assert season['run']() == {'done': 2, 'failed': 1}
+    assert sorted(season['fetched']) == [1, 2, 3]
+
+    # Segunda ejecución: solo el partido que falló
+    season['fetched'].clear()
+    season['failing'].clear()
+    assert season['run']() == {'done': 1, 'failed': 0}
+    assert season['fetched'] == [2]
+
+    # Nada pendiente hasta que StatsBomb corrige un partido
+    season['fetched'].clear()
+    assert season['run']() == {'done': 0, 'failed': 0}
+    season['versions'][3] = 'v2'
+    assert season['run']() == {'done': 1, 'failed': 0}
+    assert season['fetched'] == [3]
+
+
+def test_retry_failed_only(season):
+    season['run']()
+    season['fetched'].clear()
+    season['versions'][3] = 'v2'
+    season['failing'].clear()
+    assert season['run'](retry_failed_only=True) == {'done': 1, 'failed': 0}
+    assert season['fetched'] == [2]
+
+
+def test_manifest_is_flushed_in_batches(tmp_path):
+    path = str(tmp_path / 'manifest.json')
+    manifest = {'seasons': {}}
+    for match_id in (1, 2):
+        backfill.mark_item(manifest, 103, 315, match_id, 'events', 'done', path=path, flush_every=3)
+    assert backfill.load_manifest(path) == {'seasons': {}}
+
+    backfill.mark_item(manifest, 103, 315, 3, 'events', 'done', path=path, flush_every=3)
+    assert set(backfill.load_manifest(path)['seasons']['103/315']) == {'1', '2', '3'}
+
+    backfill.mark_item(manifest, 103, 315, 4, 'events', 'failed', error='timeout', path=path, flush_every=3)
+    backfill.flush_manifest(manifest, path)
+    assert backfill.load_manifest(path)['seasons']['103/315']['4']['events']['status'] == 'failed'
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data import baseline
+from data.baseline import baseline as team_baseline
+from data.baseline import last_matches, rolling_baselines, team_history
+
+MATCHES = pd.DataFrame({
+    'match_id': [1, 2, 3, 4, 5, 6],
+    'match_date': ['2025-02-01', '2025-02-08', '2025-02-15', '2025-02-22', '2025-03-01', '2025-03-08'],
+})
+
+
+def team_match_stats():
+    """Audax (10) juega los seis partidos con 0..5 goles; el rival (20) solo los pares."""
+    rows = [{'match_id': m, 'team_id': 10, 'team_name': 'Audax Italiano', 'team_match_goals': float(m - 1)}
+            for m in MATCHES['match_id']]
+    rows += [{'match_id': m, 'team_id': 20, 'team_name': 'Rival', 'team_match_goals': float(m)}
+             for m in (2, 4, 6)]
+    return pd.DataFrame(rows).sample(frac=1, random_state=0)
+
+
+@pytest.fixture
+def history(tmp_path, monkeypatch):
+    path = tmp_path / 'team_match_stats.parquet'
+    path.write_bytes(b'')
+    monkeypatch.setattr(baseline, 'TEAM_MATCH_STATS_PATH', str(path))
+    monkeypatch.setattr(baseline, 'load_team_match_stats', lambda: (team_match_stats(), {}))
+
+    def no_updates(*args, **kwargs):
+        raise AssertionError('sin credenciales no se completa la tabla')
+    monkeypatch.setattr(baseline, 'update_team_match_stats', no_updates)
+    baseline._history.clear()
+    return team_history(MATCHES)
+
+
+def test_team_history_is_sorted_by_team_and_date(history):
+    assert history['team_id'].tolist() == [10] * 6 + [20] * 3
+    assert history['match_id'].tolist() == [1, 2, 3, 4, 5, 6, 2, 4, 6]
+    assert team_history(MATCHES) is history
+
+
+def test_last_matches(history):
+    window = last_matches(history, 'Audax Italiano', '2025-03-01', n=3)
+    assert window['match_id'].tolist() == [2, 3, 4]
+    # Los partidos de la fecha de referencia no cuentan
+    assert last_matches(history, 10, '2025-02-01').empty
+    assert last_matches(history, 20, '2025-03-08', n=5)['match_id'].tolist() == [2, 4]
+    assert last_matches(history, 'Desconocido', '2025-03-08').empty
+    assert team_baseline(history, 10, '2025-03-01', n=3)['team_match_goals'] == pytest.approx(2.0)
+
+
+def test_rolling_baselines_match_last_matches(history):
+    rolled = rolling_baselines(history, n=3)
+    for i, row in history.iterrows():
+        expected = team_baseline(history, row['team_id'], row['match_date'], n=3)['team_match_goals']
+        if np.isnan(expected):
+            assert np.isnan(rolled.loc[i, 'team_match_goals'])
+        else:
+            assert rolled.loc[i, 'team_match_goals'] == pytest.approx(expected)
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.event_frames import compact_events, prepare_events
+from data.metrics import evaluate_season, match_view
+
+
+def test_prepare_events_splits_coordinates(match_events):
+    match_events['shot_end_location'] = [[120.0, 38.0, 1.5]] + [None] * (len(match_events) - 1)
+    events = prepare_events(match_events)
+    assert events.loc[0, ['location_x', 'location_y']].tolist() == [100.0, 40.0]
+    assert events.loc[0, ['end_x', 'end_y', 'end_z']].tolist() == [120.0, 38.0, 1.5]
+    assert np.isnan(events.loc[1, 'end_x'])
+    # Idempotente: unos eventos ya normalizados no se tocan
+    assert prepare_events(events) is events
+
+
+def test_compact_events_types(match_events):
+    events = compact_events(prepare_events(match_events), report=False)
+    assert isinstance(events['type'].dtype, pd.CategoricalDtype)
+    assert events['counterpress'].dtype == bool
+    assert events['counterpress'].sum() == 1
+    assert events['player_id'].dtype == 'Int32'
+    assert events['location_x'].dtype == np.float32
+    assert events['index'].dtype == np.int8
+    assert 'location' not in events.columns
+    assert 'location' in compact_events(prepare_events(match_events), full_width=True, report=False).columns
+
+
+def test_compact_events_keep_the_analysis(match_events):
+    events = prepare_events(match_events)
+    raw = {name: match_view(section) for name, section in evaluate_season(events, team='Audax Italiano').items()}
+    compact = evaluate_season(compact_events(events, report=False), team='Audax Italiano')
+    for name, section in compact.items():
+        for stat, value in match_view(section)['key_stats'].items():
+            assert value == pytest.approx(raw[name]['key_stats'][stat], rel=1e-6), (name, stat)
@@ -0,0 +1,60 @@
+import pandas as pd
+import pytest
+
+from data.event_graph import EventGraph, graph_for
+
+
+def graph_events():
+    """Posesión 1: pase clave -> tiro; posesión 2: conducción presionada y duelo con regate."""
+    rows = [
+        {'id': 'p1', 'index': 1, 'possession': 1, 'type': 'Pass', 'team': 'A', 'related_events': None,
+         'pass_assisted_shot_id': 's1'},
+        {'id': 's1', 'index': 2, 'possession': 1, 'type': 'Shot', 'team': 'A', 'related_events': None,
+         'shot_key_pass_id': 'p1', 'shot_statsbomb_xg': 0.25},
+        {'id': 'c1', 'index': 3, 'possession': 2, 'type': 'Carry', 'team': 'B', 'related_events': ['pr1']},
+        {'id': 'pr1', 'index': 4, 'possession': 2, 'type': 'Pressure', 'team': 'A', 'related_events': ['c1']},
+        {'id': 'dr1', 'index': 5, 'possession': 2, 'type': 'Dribble', 'team': 'B', 'related_events': ['du1', 'x']},
+        {'id': 'du1', 'index': 6, 'possession': 2, 'type': 'Duel', 'team': 'A', 'related_events': ['dr1']},
+        {'id': 's2', 'index': 7, 'possession': 2, 'type': 'Shot', 'team': 'B', 'related_events': None,
+         'shot_statsbomb_xg': 0.05},
+    ]
+    events = pd.DataFrame(rows)
+    events['match_id'] = 1
+    # Desordenados: el índice se construye sobre los eventos ordenados por ``index``
+    return events.sample(frac=1, random_state=0)
+
+
+def test_key_pass_links():
+    graph = EventGraph(graph_events())
+    assert graph.shot_for_key_pass('p1')['id'] == 's1'
+    assert graph.key_pass_for_shot('s1')['id'] == 'p1'
+    assert graph.key_pass_for_shot('s2') is None
+    assert graph.shot_for_key_pass('missing') is None
+
+    key_passes = graph.key_pass_shots()
+    assert key_passes['id'].tolist() == ['p1']
+    assert key_passes['shot_xg'].tolist() == [pytest.approx(0.25)]
+
+
+def test_related_events():
+    graph = EventGraph(graph_events())
+    assert graph.pressures_on('c1')['id'].tolist() == ['pr1']
+    # Los ids desconocidos en related_events se ignoran
+    assert graph.related('dr1')['id'].tolist() == ['du1']
+    assert graph.duel_partner('du1')['id'].tolist() == ['dr1']
+    assert graph.related('missing').empty
+
+    pairs = graph.related_pairs(graph.events['type'] == 'Carry', target_types=['Pressure'])
+    assert graph.events['id'].iloc[pairs['source']].tolist() == ['c1']
+    assert graph.events['id'].iloc[pairs['target']].tolist() == ['pr1']
+
+
+def test_chain_to_shot():
+    graph = EventGraph(graph_events())
+    assert graph.chain_to_shot('s1')['id'].tolist() == ['p1', 's1']
+    assert graph.chain_to_shot('s2')['id'].tolist() == ['c1', 'pr1', 'dr1', 'du1', 's2']
+
+
+def test_graph_for_reuses_the_index():
+    events = graph_events().sort_values('index')
+    assert graph_for(events) is graph_for(events.copy())
@@ -0,0 +1,70 @@
+import os
+
+import pandas as pd
+import pytest
+
+from data import event_store
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(event_store, 'CACHE_DIR', str(tmp_path / 'cache'))
+    return tmp_path / 'cache'
+
+
+def raw_events():
+    return pd.DataFrame({
+        'id': ['a', 'b'],
+        'index': [1, 2],
+        'location': [[60, 40], None],
+        'pass_end_location': [[80.5, 30.0], None],
+        'tactics': [{'formation': 442, 'lineup': [{'player': {'id': 1}}]}, None],
+        'shot_freeze_frame': [None, [{'location': [110.0, 40.0], 'teammate': False}]],
+        'under_pressure': [True, None],
+    })
+
+
+def test_parquet_round_trip(tmp_path):
+    path = str(tmp_path / 'events.parquet')
+    event_store.write_parquet(raw_events(), path, version='2025-01-01')
+
+    events = event_store.read_parquet(path)
+    assert event_store.stored_version(path) == '2025-01-01'
+    assert events['location'].tolist() == [[60.0, 40.0], None]
+    assert events['pass_end_location'].iloc[0] == [80.5, 30.0]
+    assert events['tactics'].iloc[0] == {'formation': 442, 'lineup': [{'player': {'id': 1}}]}
+    assert events['shot_freeze_frame'].iloc[1] == [{'location': [110.0, 40.0], 'teammate': False}]
+    assert events['tactics'].iloc[1] is None
+
+
+def test_cached_refetches_when_the_version_changes(cache_dir):
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return raw_events()
+
+    event_store.cached('events', 1, fetch, version='v1')
+    event_store.cached('events', 1, fetch, version='v1')
+    assert len(calls) == 1
+    event_store.cached('events', 1, fetch, version='v2')
+    assert len(calls) == 2
+
+    event_store.invalidate([1])
+    assert event_store.load('events', 1) is None
+
+
+def test_size_cap_evicts_least_recently_used(cache_dir):
+    for match_id in (1, 2, 3):
+        event_store.write_parquet(raw_events(), event_store._path('events', match_id))
+        path = event_store._path('events', match_id)
+        os.utime(path, (1000 + match_id, 1000 + match_id))
+    # Leer el partido 1 lo marca como el más reciente
+    assert event_store.load('events', 1) is not None
+
+    size = os.path.getsize(event_store._path('events', 1))
+    event_store.enforce_size_cap(max_mb=2.5 * size / (1024 * 1024))
+
+    assert os.path.exists(event_store._path('events', 1))
+    assert not os.path.exists(event_store._path('events', 2))
+    assert os.path.exists(event_store._path('events', 3))
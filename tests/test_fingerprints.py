@@ -0,0 +1,75 @@
+import pandas as pd
+import pytest
+
+from data import fingerprints
+from data.extraccion_datos import read_match_dataset, write_match_partition
+from data.fingerprints import FingerprintIndex, match_features, refresh_fingerprints, stale_matches, update_fingerprints
+
+
+def copy_match(events, match_id):
+    """Los IDs de evento de StatsBomb son únicos entre partidos."""
+    columns = [col for col in ('id', 'pass_assisted_shot_id') if col in events.columns]
+    ids = {col: events[col].map(lambda v: v if pd.isna(v) else f'{match_id}-{v}') for col in columns}
+    return events.assign(match_id=match_id, **ids)
+
+
+def season_events(match_events):
+    """Partido 1, partido 2 idéntico y partido 3 sin los tiros de Audax."""
+    third = match_events[~((match_events['type'] == 'Shot') & (match_events['team'] == 'Audax Italiano'))]
+    return pd.concat([match_events, copy_match(match_events, 2), copy_match(third, 3)], ignore_index=True)
+
+
+def test_match_features(match_events):
+    features = match_features(match_events).loc[1]
+    # Equipo 'a': el que más pasa (Audax, 4 pases contra 1)
+    assert features['team_a'] == 'Audax Italiano' and features['team_b'] == 'Rival'
+    assert features['possession_a'] == pytest.approx(0.8)
+    assert features['xg_a'] == pytest.approx(0.4) and features['xg_b'] == pytest.approx(0.05)
+    assert features['xg_share_a'] == pytest.approx(0.4 / 0.45)
+    assert features['shots_a'] == 2 and features['shots_b'] == 1
+
+
+def test_match_features_ignore_event_order(match_events):
+    shuffled = match_events.sample(frac=1, random_state=1)
+    pd.testing.assert_frame_equal(match_features(match_events), match_features(shuffled))
+
+
+def test_update_and_stale_matches(match_events, tmp_path):
+    path = str(tmp_path / 'fingerprints.parquet')
+    events = season_events(match_events)
+    table = update_fingerprints(events, path, versions={1: 'v1', 2: 'v1', 3: 'v1'})
+    assert table.index.tolist() == [1, 2, 3]
+    assert stale_matches(table, [1, 2, 3, 4], {1: 'v1', 2: 'v2', 3: 'v1'}) == [2, 4]
+    assert stale_matches(table, [1, 4]) == [4]
+
+
+def test_similar_matches(match_events, tmp_path):
+    path = str(tmp_path / 'fingerprints.parquet')
+    index = FingerprintIndex(update_fingerprints(season_events(match_events), path))
+    assert len(index) == 3 and 2 in index
+    similar = index.similar(1, k=2)
+    assert similar.index.tolist() == [2, 3]
+    assert similar['distance'].iloc[0] == 0
+    assert index.nearest(index.vector(match_features(match_events).loc[1]), k=1).index[0] in (1, 2)
+    with pytest.raises(ValueError):
+        index.similar(99)
+
+
+def test_refresh_from_the_events_dataset(match_events, tmp_path, monkeypatch):
+    root, path = str(tmp_path / 'sb_events'), str(tmp_path / 'fingerprints.parquet')
+    for match_id, events in season_events(match_events).groupby('match_id'):
+        write_match_partition(events, root, 315, match_id)
+    reads = []
+
+    def reader(root, season_id=None, match_ids=None):
+        reads.append(list(match_ids))
+        return read_match_dataset(root, season_id=season_id, match_ids=match_ids)
+
+    table = refresh_fingerprints(root, reader, path=path, match_ids=[1, 3], batch_size=1)
+    assert table.index.tolist() == [1, 3]
+    assert reads == [[1], [3]]
+
+    table = refresh_fingerprints(root, reader, path=path)
+    assert table.index.tolist() == [1, 2, 3]
+    assert reads[-1] == [2]
+    assert fingerprints.stored_matches(root, 315) == [1, 2, 3]
@@ -0,0 +1,63 @@
+import pandas as pd
+import pytest
+
+from data.lineups import LINEUP_COLUMNS, lineups_to_table, players_used, starters
+
+
+def player(player_id, name, positions):
+    return {'player_id': player_id, 'player_name': name, 'player_nickname': None, 'jersey_number': player_id,
+            'positions': positions}
+
+
+def spell(position_id, position, start, end, start_reason, end_reason, start_period=1, end_period=None):
+    return {'position_id': position_id, 'position': position, 'from': start, 'to': end,
+            'from_period': start_period, 'to_period': end_period, 'start_reason': start_reason,
+            'end_reason': end_reason}
+
+
+# Formato 'dict' de sb.lineups: 1 juega todo el partido cambiando de posición,
+# 2 sale en el 60:30 por 3 y 4 no juega
+LINEUPS = {
+    'Audax Italiano': {'team_id': 10, 'lineup': [
+        player(1, 'Uno', [spell(10, 'Center Defensive Midfield', '00:00', '45:00', 'Starting XI',
+                                'Tactical Shift', end_period=1),
+                          spell(19, 'Center Attacking Midfield', '45:00', None, 'Tactical Shift',
+                                'Final Whistle', start_period=2)]),
+        player(2, 'Dos', [spell(23, 'Center Forward', '00:00', '60:30', 'Starting XI', 'Substitution - Off (Tactical)',
+                                end_period=2)]),
+        player(3, 'Tres', [spell(23, 'Center Forward', '60:30', None, 'Substitution - On (Tactical)',
+                                 'Final Whistle', start_period=2)]),
+        player(4, 'Cuatro', []),
+    ]},
+}
+
+
+def test_lineups_to_table():
+    table = lineups_to_table(LINEUPS, 7)
+    assert list(table.columns) == LINEUP_COLUMNS
+    assert len(table) == 5
+    assert (table['match_id'] == 7).all()
+    assert table['player_id'].dtype == 'Int32'
+
+    one = table[table['player_id'] == 1]
+    assert one['position'].tolist() == ['Center Defensive Midfield', 'Center Attacking Midfield']
+    assert one['starter'].all()
+    two = table[table['player_id'] == 2].iloc[0]
+    assert two['end_minute'] == pytest.approx(60.5)
+    three = table[table['player_id'] == 3].iloc[0]
+    assert not three['starter']
+    assert pd.isna(three['end_minute'])
+    four = table[table['player_id'] == 4].iloc[0]
+    assert pd.isna(four['position_id']) and not four['starter']
+
+
+def test_starters_and_players_used():
+    table = lineups_to_table(LINEUPS, 7)
+    assert starters(table)['player_id'].tolist() == [1, 2]
+    assert starters(table)['position'].tolist() == ['Center Defensive Midfield', 'Center Forward']
+    assert players_used(table)['player_id'].tolist() == [1, 2, 3]
+
+
+def test_empty_lineups():
+    table = lineups_to_table({}, 7)
+    assert table.empty and list(table.columns) == LINEUP_COLUMNS
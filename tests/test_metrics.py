@@ -0,0 +1,115 @@
+import pandas as pd
+import pytest
+
+from data.metrics import evaluate_season, match_view
+
+
+def legacy_offensive(events):
+    """Estadísticas clave de la versión escrita a mano de ``get_offensive_analysis``."""
+    events_audax = events[events['team'] == 'Audax Italiano']
+    shots = events_audax[events_audax['type'] == 'Shot']
+    passes = events_audax[events_audax['type'] == 'Pass']
+    successful_passes = passes[passes['pass_outcome'].isna()]
+    long_passes = passes[passes['pass_length'] > 20]
+    successful_long_passes = successful_passes[successful_passes['pass_length'] > 20]
+    key_stats = {
+        'total_shots': len(shots),
+        'total_passes': len(passes),
+        'successful_passes': len(successful_passes),
+        'pass_accuracy': len(successful_passes) / len(passes) if len(passes) > 0 else 0,
+        'long_passes': len(long_passes),
+        'successful_long_passes': len(successful_long_passes),
+        'long_pass_accuracy': len(successful_long_passes) / len(long_passes) if len(long_passes) > 0 else 0,
+        'xG_total': shots['shot_statsbomb_xg'].sum().round(2),
+    }
+    passing_stats = pd.DataFrame({
+        'total_passes': passes['player'].value_counts(),
+        'successful_passes': successful_passes['player'].value_counts(),
+    }).fillna(0)
+    return key_stats, passing_stats
+
+
+def legacy_defensive(events):
+    """Estadísticas clave de la versión escrita a mano de ``get_defensive_analysis``."""
+    events_audax = events[events['team'] == 'Audax Italiano']
+    pressures = events_audax[events_audax['type'] == 'Pressure']
+    duels = events_audax[events_audax['type'] == 'Duel']
+    successful_pressures = pressures[pressures['counterpress'] == True]
+    won_duels = duels[duels['duel_outcome'].apply(lambda x: x == 'Won' or x == 'Success In Play')]
+    aerial_duels = len(events[events['duel_type'].apply(lambda x: x == 'Aerial Lost')])
+    won_aerial_duels = aerial_duels - len(duels[duels['duel_type'].apply(lambda x: x == 'Aerial Lost')])
+    return {
+        'pressures': len(pressures),
+        'successful_pressures': len(successful_pressures),
+        'pressure_success_rate': len(successful_pressures) / len(pressures) if len(pressures) > 0 else 0,
+        'duels': len(duels),
+        'won_duels': len(won_duels),
+        'duel_success_rate': len(won_duels) / len(duels) if len(duels) > 0 else 0,
+        'aerial_duels': aerial_duels,
+        'won_aerial_duels': won_aerial_duels,
+        'aerial_success_rate': won_aerial_duels / aerial_duels if aerial_duels > 0 else 0,
+        'blocks': (events_audax['type'] == 'Block').sum(),
+        'interceptions': (events_audax['type'] == 'Interception').sum(),
+        'ball_recoveries': (events_audax['type'] == 'Ball Recovery').sum(),
+        'clearances': (events_audax['type'] == 'Clearance').sum(),
+    }
+
+
+def legacy_transitions(events):
+    """Recuperaciones y conducciones por tercio de la versión escrita a mano de ``get_transitions_analysis``."""
+    events_audax = events[events['team'] == 'Audax Italiano']
+    x = events_audax['location'].apply(lambda point: point[0])
+    recoveries = events_audax['type'] == 'Ball Recovery'
+    carries = events_audax['type'] == 'Carry'
+    return {
+        'recoveries_def_3rd': (recoveries & (x < 33)).sum(),
+        'recoveries_mid_3rd': (recoveries & (x >= 33) & (x <= 66)).sum(),
+        'recoveries_att_3rd': (recoveries & (x > 66)).sum(),
+        'carries_from_def_3rd': (carries & (x < 33)).sum(),
+        'carries_from_mid_3rd': (carries & (x >= 33) & (x <= 66)).sum(),
+        'carries_from_att_3rd': (carries & (x > 66)).sum(),
+    }
+
+
+@pytest.fixture
+def sections(match_events):
+    season = evaluate_season(match_events, team='Audax Italiano')
+    return {name: match_view(section) for name, section in season.items()}
+
+
+def test_offensive_key_stats_match_legacy(match_events, sections):
+    expected, _ = legacy_offensive(match_events)
+    key_stats = sections['offensive']['key_stats']
+    for name, value in expected.items():
+        assert key_stats[name] == pytest.approx(value), name
+
+
+def test_offensive_passing_table_matches_legacy(match_events, sections):
+    _, expected = legacy_offensive(match_events)
+    table = sections['offensive']['all_passing_stats']
+    for player, row in expected.iterrows():
+        assert table.loc[player, 'total_passes'] == row['total_passes']
+        assert table.loc[player, 'successful_passes'] == row['successful_passes']
+
+
+def test_defensive_key_stats_match_legacy(match_events, sections):
+    key_stats = sections['defensive']['key_stats']
+    for name, value in legacy_defensive(match_events).items():
+        assert key_stats[name] == pytest.approx(value), name
+
+
+def test_transition_thirds_match_legacy(match_events, sections):
+    key_stats = sections['transitions']['key_stats']
+    for name, value in legacy_transitions(match_events).items():
+        assert key_stats[name] == value, name
+
+
+def test_key_passes_and_xa(sections):
+    key_stats = sections['offensive']['key_stats']
+    assert key_stats['key_passes'] == 1
+    assert key_stats['xA_total'] == pytest.approx(0.3)
+
+
+def test_only_requested_sections_are_evaluated(match_events):
+    season = evaluate_season(match_events, team='Audax Italiano', sections=['defensive'])
+    assert list(season) == ['defensive']
@@ -0,0 +1,63 @@
+import pandas as pd
+import pytest
+
+from data.minutes import minutes_played, per90
+
+
+def lineup_event(team_id, player_ids):
+    return {'match_id': 1, 'team_id': team_id, 'player_id': None, 'type': 'Starting XI', 'minute': 0, 'second': 0,
+            'tactics': {'formation': 442, 'lineup': [{'player': {'id': pid}} for pid in player_ids]}}
+
+
+def match_events():
+    """Titulares 1 y 2 (equipo 10) y 3 (equipo 20); 4 entra por 2 en el 60 y 3 es expulsado en el 80."""
+    return pd.DataFrame([
+        lineup_event(10, [1, 2]),
+        lineup_event(20, [3]),
+        {'match_id': 1, 'team_id': 10, 'player_id': 2, 'type': 'Substitution', 'minute': 60, 'second': 0,
+         'substitution_replacement_id': 4},
+        {'match_id': 1, 'team_id': 20, 'player_id': 3, 'type': 'Foul Committed', 'minute': 80, 'second': 0,
+         'foul_committed_card': 'Red Card'},
+        {'match_id': 1, 'team_id': 10, 'player_id': 1, 'type': 'Pass', 'minute': 93, 'second': 0},
+    ])
+
+
+def test_minutes_from_events():
+    minutes = minutes_played(events=match_events())
+    assert minutes.loc[(1, 10, 1)] == pytest.approx(93)
+    assert minutes.loc[(1, 10, 2)] == pytest.approx(60)
+    assert minutes.loc[(1, 10, 4)] == pytest.approx(33)
+    assert minutes.loc[(1, 20, 3)] == pytest.approx(80)
+
+
+def test_lineups_take_precedence_over_events():
+    lineups = pd.DataFrame({
+        'match_id': [1, 1], 'team_id': [10, 10], 'player_id': [1, 5],
+        'position_id': [1, None], 'start_minute': [0.0, None], 'end_minute': [45.0, None],
+    })
+    minutes = minutes_played(lineups=lineups, events=match_events())
+    assert minutes.loc[(1, 10, 1)] == pytest.approx(45)
+    # Suplente sin entrar al campo: sin minutos
+    assert (1, 10, 5) not in minutes.index
+    # El partido tiene alineaciones: los tramos de los eventos no se usan
+    assert (1, 20, 3) not in minutes.index
+
+
+def test_open_spells_close_at_the_last_event():
+    lineups = pd.DataFrame({
+        'match_id': [1], 'team_id': [10], 'player_id': [1],
+        'position_id': [1], 'start_minute': [30.0], 'end_minute': [None],
+    })
+    minutes = minutes_played(lineups=lineups, events=match_events())
+    assert minutes.loc[(1, 10, 1)] == pytest.approx(63)
+
+
+def test_per90_scales_counts_and_filters_by_minutes():
+    minutes = minutes_played(events=match_events())
+    stats = pd.DataFrame({'passes': [30.0, 11.0], 'tackles': [3.0, 2.0]},
+                         index=pd.MultiIndex.from_tuples([(1, 1), (1, 4)], names=['match_id', 'player_id']))
+    result = per90(stats, minutes, ['passes', 'tackles'], min_minutes=45)
+    assert list(result.index) == [(1, 1)]
+    assert result.loc[(1, 1), 'minutes'] == pytest.approx(93)
+    assert result.loc[(1, 1), 'passes'] == pytest.approx(round(30 * 90 / 93, 2))
+    assert result.loc[(1, 1), 'tackles'] == pytest.approx(round(3 * 90 / 93, 2))
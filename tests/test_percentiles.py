@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.percentiles import MetricDistributions
+
+
+def season_table(seed, rows=40):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'team_id': np.arange(rows),
+        'team_season_goals_pg': rng.integers(0, 5, rows).astype(float),
+        'team_season_ppda': rng.normal(10, 2, rows).round(1),
+    })
+
+
+def test_percentiles_and_ranks():
+    table = pd.DataFrame({'team_id': [1, 2, 3, 4], 'team_season_goals_pg': [1.0, 2.0, 2.0, 3.0],
+                          'team_season_ppda': [8.0, 9.0, 10.0, np.nan]})
+    distributions = MetricDistributions(table, ['team_id'], prefix='team_season_')
+
+    pct = distributions.percentiles(table)
+    assert pct['team_season_goals_pg'].tolist() == [12.5, 50.0, 50.0, 87.5]
+    # Métrica de LOWER_IS_BETTER: el valor más bajo tiene el percentil más alto
+    assert pct['team_season_ppda'].iloc[0] > pct['team_season_ppda'].iloc[2]
+    assert np.isnan(pct['team_season_ppda'].iloc[3])
+
+    ranks = distributions.ranks(table)
+    assert ranks['team_season_goals_pg'].tolist() == [4, 2, 2, 1]
+    assert ranks['team_season_ppda'].iloc[:3].tolist() == [1, 2, 3]
+    assert distributions.size('team_season_ppda') == 3
+
+
+def test_incremental_update_matches_full_rebuild():
+    old, new = season_table(0), season_table(1)
+    # Filas sin cambios, filas modificadas, una eliminada y dos nuevas
+    new.iloc[:20] = old.iloc[:20].to_numpy()
+    new = pd.concat([new.iloc[1:], season_table(2, rows=2).assign(team_id=[100, 101])], ignore_index=True)
+    new.loc[5, 'team_season_ppda'] = np.nan
+
+    distributions = MetricDistributions(old, ['team_id'], prefix='team_season_')
+    distributions.update(new)
+    rebuilt = MetricDistributions(new, ['team_id'], prefix='team_season_')
+
+    for metric in rebuilt.metrics:
+        np.testing.assert_array_equal(distributions.sorted[metric], rebuilt.sorted[metric])
+    pd.testing.assert_frame_equal(distributions.percentiles(new), rebuilt.percentiles(new))
+    assert distributions.lookup([100])['team_season_goals_pg'].iloc[0] == pytest.approx(
+        rebuilt.lookup([100])['team_season_goals_pg'].iloc[0])
+
+
+def test_update_counts_changed_rows():
+    old = season_table(0, rows=5)
+    distributions = MetricDistributions(old, ['team_id'], prefix='team_season_')
+    assert distributions.update(old) == 0
+    new = old.copy()
+    new.loc[0, 'team_season_goals_pg'] += 1
+    assert distributions.update(new.iloc[:4]) == 2
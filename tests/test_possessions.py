@@ -0,0 +1,60 @@
+import pandas as pd
+import pytest
+
+from data import possessions
+from data.possessions import chains_for, possession_chains
+
+
+def chain_event(index, possession, team_id, type, x, minute, second, end_x=None, xg=None):
+    return {
+        'id': f'e{index}', 'index': index, 'period': 1, 'minute': minute, 'second': second,
+        'possession': possession, 'possession_team_id': team_id, 'possession_team': f'T{team_id}',
+        'team_id': team_id, 'team': f'T{team_id}', 'type': type, 'play_pattern': 'Regular Play',
+        'location': [float(x), 40.0], 'pass_end_location': None if end_x is None else [float(end_x), 40.0],
+        'shot_statsbomb_xg': xg,
+    }
+
+
+def chain_events(match_id):
+    """Posesión 1 (equipo 20): pases sin tiro. Posesión 2 (equipo 10): recuperación, pase largo y tiro en 8 s."""
+    events = pd.DataFrame([
+        chain_event(1, 1, 20, 'Pass', 20, 0, 0, end_x=40),
+        chain_event(2, 1, 20, 'Pass', 40, 0, 5, end_x=50),
+        chain_event(3, 2, 10, 'Ball Recovery', 30, 0, 10),
+        chain_event(4, 2, 10, 'Pass', 32, 0, 12, end_x=90),
+        chain_event(5, 2, 10, 'Shot', 105, 0, 18, xg=0.2),
+    ])
+    events['match_id'] = match_id
+    return events
+
+
+def test_possession_chains():
+    chains = possession_chains(chain_events(1)).set_index('possession')
+    assert chains.loc[1, 'team_id'] == 20
+    assert chains.loc[1, 'passes'] == 2
+    assert not chains.loc[1, 'ended_in_shot']
+    assert not chains.loc[1, 'counterattack']
+
+    counter = chains.loc[2]
+    assert counter['start_type'] == 'Ball Recovery' and counter['regain']
+    assert counter['duration'] == pytest.approx(8)
+    assert counter['progression'] == pytest.approx(75)
+    assert counter['ended_in_shot'] and counter['xg'] == pytest.approx(0.2)
+    assert counter['counterattack']
+
+
+def test_chains_for_reuses_the_match_chains(monkeypatch):
+    events = chain_events(9001)
+    calls = []
+    compute = possessions.possession_chains
+    monkeypatch.setattr(possessions, 'possession_chains', lambda events: calls.append(1) or compute(events))
+
+    all_chains = chains_for(events)
+    team_chains = chains_for(events[events['team_id'] == 10])
+    assert len(calls) == 1
+    assert team_chains['possession'].tolist() == [2]
+    assert len(all_chains) == 2
+
+    # Eventos distintos del mismo partido: se recalcula
+    chains_for(events.iloc[1:])
+    assert len(calls) == 2
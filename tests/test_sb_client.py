@@ -0,0 +1,160 @@
+import gzip
+import json
+import types
+
+import pandas as pd
+import pytest
+import requests
+
+from data import sb_client
+from data.minutes import minutes_played
+from data.sb_client import sb
+
+MATCH_ID = 3900001
+CREDS = {'user': 'user', 'passwd': 'passwd'}
+
+AUDAX = {'id': 10, 'name': 'Audax Italiano'}
+RIVAL = {'id': 20, 'name': 'Rival'}
+
+
+def raw_event(index, type_name, team=AUDAX, player=None, **fields):
+    event = {
+        'id': f'e{index}', 'index': index, 'period': 1, 'timestamp': f'00:00:{index:02d}.000',
+        'minute': index, 'second': 0, 'type': {'id': index, 'name': type_name},
+        'possession': 1, 'possession_team': AUDAX, 'play_pattern': {'id': 1, 'name': 'Regular Play'},
+        'team': team, 'duration': 1.0,
+    }
+    if player is not None:
+        event['player'] = {'id': player, 'name': f'P{player}'}
+        event['position'] = {'id': 10, 'name': 'Center Defensive Midfield'}
+        event['location'] = [60.0, 40.0]
+    event.update(fields)
+    return event
+
+
+RAW_EVENTS = [
+    raw_event(1, 'Starting XI', tactics={'formation': 442, 'lineup': [
+        {'player': {'id': 101, 'name': 'P101'}, 'position': {'id': 10, 'name': 'Center Defensive Midfield'},
+         'jersey_number': 5}]}),
+    raw_event(3, 'Pass', player=101, related_events=['e4'], under_pressure=True, **{'pass': {
+        'recipient': {'id': 102, 'name': 'P102'}, 'length': 20.5, 'angle': 0.3, 'end_location': [80.0, 40.0],
+        'height': {'id': 1, 'name': 'Ground Pass'}, 'body_part': {'id': 40, 'name': 'Right Foot'},
+        'type': {'id': 62, 'name': 'Free Kick'}, 'cross': True}}),
+    raw_event(2, 'Pressure', team=RIVAL, player=201, counterpress=True),
+    raw_event(4, 'Ball Receipt*', player=102, ball_receipt={'outcome': {'id': 9, 'name': 'Incomplete'}}),
+    raw_event(5, 'Shot', player=102, shot={
+        'statsbomb_xg': 0.12, 'end_location': [120.0, 38.0, 1.0], 'outcome': {'id': 97, 'name': 'Goal'},
+        'technique': {'id': 93, 'name': 'Normal'}, 'freeze_frame': [
+            {'location': [110.0, 40.0], 'player': {'id': 201, 'name': 'P201'},
+             'position': {'id': 1, 'name': 'Goalkeeper'}, 'teammate': False}]}),
+    raw_event(6, 'Goal Keeper', team=RIVAL, player=201, goalkeeper={
+        'type': {'id': 28, 'name': 'Goal Conceded'}, 'position': {'id': 44, 'name': 'Set'}}),
+    raw_event(7, 'Duel', team=RIVAL, player=201, duel={
+        'type': {'id': 11, 'name': 'Tackle'}, 'outcome': {'id': 4, 'name': 'Won'}}),
+    raw_event(8, '50/50', player=101, **{'50_50': {'outcome': {'id': 108, 'name': 'Won'}}}),
+    raw_event(9, 'Foul Committed', team=RIVAL, player=201, foul_committed={'card': {'id': 7, 'name': 'Yellow Card'}}),
+    raw_event(10, 'Substitution', player=101, substitution={
+        'outcome': {'id': 103, 'name': 'Tactical'}, 'replacement': {'id': 103, 'name': 'P103'}}),
+]
+
+
+def same_values(left, right):
+    return left.isna().equals(right.isna()) and all(
+        json.dumps(a) == json.dumps(b) for a, b in zip(left[left.notna()], right[right.notna()]))
+
+
+def test_flatten_events_matches_statsbombpy(tmp_path, monkeypatch):
+    monkeypatch.setattr(sb_client, 'ARCHIVE_MODE', 'replay')
+    monkeypatch.setattr(sb_client, 'ARCHIVE_DIR', str(tmp_path))
+    with gzip.open(tmp_path / f'api_v8_events_{MATCH_ID}.json.gz', 'wt') as f:
+        json.dump(RAW_EVENTS, f)
+
+    expected = sb.events(match_id=MATCH_ID, creds=CREDS, version='v8')
+    expected = expected.sort_values('index', ignore_index=True)
+    events = sb_client.events(MATCH_ID, CREDS)
+
+    assert sorted(events.columns) == sorted(expected.columns)
+    for col in expected.columns:
+        assert same_values(events[col].astype(object), expected[col].astype(object)), col
+    substitution = events[events['type'] == 'Substitution'].iloc[0]
+    assert substitution['substitution_replacement_id'] == 103
+    assert substitution['substitution_outcome_id'] == 103
+
+
+def test_flatten_events_keeps_substitutes_in_minutes():
+    events = sb_client.flatten_events(json.loads(json.dumps(RAW_EVENTS)), MATCH_ID)
+    events['player_id'] = pd.to_numeric(events['player_id'])
+    minutes = minutes_played(events=events)
+    assert (MATCH_ID, 10, 103) in minutes.index
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def test_token_bucket_allows_bursts_then_waits(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(sb_client, 'time', clock)
+    bucket = sb_client.TokenBucket(rate=2, capacity=3)
+
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.acquire() == pytest.approx(0.5)
+    assert bucket.acquire() == pytest.approx(0.5)
+    # Tras un segundo sin peticiones se recuperan dos tokens
+    clock.now += 1.0
+    assert [bucket.acquire() for _ in range(2)] == [0.0, 0.0]
+
+
+def test_fetch_json_retries_throttled_and_failed_requests(monkeypatch):
+    clock = FakeClock()
+    responses = [FakeResponse(429, {'Retry-After': '3'}), requests.ConnectionError('reset'), FakeResponse(200)]
+
+    def get(url, auth=None, timeout=None):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    monkeypatch.setattr(sb_client, 'time', clock)
+    monkeypatch.setattr(sb_client, '_limiter', sb_client.TokenBucket(rate=100, capacity=100))
+    monkeypatch.setattr(sb_client, '_session', types.SimpleNamespace(get=get))
+    monkeypatch.setattr(sb_client, 'BACKOFF_SECONDS', 0.5)
+    before = sb_client.stats()
+
+    assert sb_client.fetch_json('https://example.test/api').status_code == 200
+    assert clock.sleeps[0] == 3.0
+    assert 1.0 <= clock.sleeps[1] <= 1.5
+    after = sb_client.stats()
+    assert after['requests'] - before['requests'] == 3
+    assert after['retries'] - before['retries'] == 2
+
+
+def test_fetch_json_gives_up_after_max_retries(monkeypatch):
+    attempts = []
+
+    def get(url, auth=None, timeout=None):
+        attempts.append(url)
+        return FakeResponse(503)
+
+    monkeypatch.setattr(sb_client, 'time', FakeClock())
+    monkeypatch.setattr(sb_client, '_limiter', sb_client.TokenBucket(rate=100, capacity=100))
+    monkeypatch.setattr(sb_client, '_session', types.SimpleNamespace(get=get))
+    monkeypatch.setattr(sb_client, 'MAX_RETRIES', 2)
+    with pytest.raises(requests.HTTPError):
+        sb_client.fetch_json('https://example.test/api')
+    assert len(attempts) == 3
@@ -0,0 +1,70 @@
+import pandas as pd
+import pytest
+
+from data import scouting
+from data.scouting import recent_matches, scouting_profile
+
+MATCHES = pd.DataFrame({
+    'match_id': [1, 2, 3, 4, 5],
+    'match_date': ['2025-02-01', '2025-02-08', '2025-02-15', '2025-02-22', '2025-02-22'],
+    'home_team': ['Audax Italiano', 'Rival', 'Audax Italiano', 'Audax Italiano', 'Otro'],
+    'away_team': ['Rival', 'Audax Italiano', 'Otro', 'Rival', 'Rival'],
+    'home_score': [1, 0, 2, None, 1],
+    'away_score': [0, 0, 2, None, 1],
+})
+
+
+def copy_match(events, match_id, xg_scale=1.0):
+    """
+    Copia del partido con los campos de un partido completo: IDs de evento únicos
+    (como los UUID de StatsBomb), reloj, posesiones por equipo y el xG escalado.
+    """
+    lineups = pd.DataFrame({
+        'id': ['xi10', 'xi20'], 'type': 'Starting XI', 'team': ['Audax Italiano', 'Rival'], 'team_id': [10, 20],
+        'index': 0, 'tactics': [{'formation': 433}, {'formation': 442}],
+    })
+    events = pd.concat([lineups, events], ignore_index=True)
+    ids = events['id'].fillna(events['index'].map(lambda i: f'e{i}'))
+    return events.assign(
+        match_id=match_id,
+        period=1, minute=events['index'], second=0, play_pattern='Regular Play', pass_cross=None,
+        possession=(events['team_id'] != events['team_id'].shift()).cumsum(),
+        possession_team_id=events['team_id'], possession_team=events['team'],
+        id=ids.map(lambda v: f'{match_id}-{v}'),
+        pass_assisted_shot_id=events['pass_assisted_shot_id'].map(lambda v: v if pd.isna(v) else f'{match_id}-{v}'),
+        shot_statsbomb_xg=events['shot_statsbomb_xg'] * xg_scale,
+    )
+
+
+def test_recent_matches():
+    recent = recent_matches(MATCHES, 'Audax Italiano', n=2)
+    # El partido 4 aún no se ha jugado
+    assert recent['match_id'].tolist() == [3, 2]
+    assert recent_matches(MATCHES, 'Audax Italiano', before='2025-02-15')['match_id'].tolist() == [2, 1]
+
+
+def test_scouting_profile(match_events, monkeypatch):
+    events = pd.concat([copy_match(match_events, m, xg_scale=m) for m in (1, 2, 3)], ignore_index=True)
+    requested = []
+
+    def load_events(match_ids, versions=None, creds=None, max_workers=None):
+        requested.extend(match_ids)
+        return events[events['match_id'].isin(match_ids)]
+    monkeypatch.setattr(scouting, 'load_match_events', load_events)
+
+    pack = scouting_profile('Audax Italiano', n=3, matches=MATCHES)
+    assert sorted(requested) == [1, 2, 3]
+    assert sorted(pack['per_match'].index) == [1, 2, 3]
+    assert pack['matches'].loc[2, 'opponent'] == 'Rival' and pack['matches'].loc[3, 'opponent'] == 'Otro'
+    assert pack['matches'].loc[1, 'score'] == '1-0'
+
+    xg = pack['per_match']['offensive.xG_total']
+    assert xg.loc[2] == pytest.approx(2 * xg.loc[1])
+    profile = pack['profile'].loc['offensive.xG_total']
+    assert profile['mean'] == pytest.approx(round(xg.mean(), 3))
+    assert profile['min'] == pytest.approx(round(xg.min(), 3)) and profile['max'] == pytest.approx(round(xg.max(), 3))
+    assert pack['profile'].loc['offensive.total_shots', 'std'] == 0
+    assert pack['formations'] == {433: 3}
+
+    with pytest.raises(ValueError):
+        scouting_profile('Sin partidos', matches=MATCHES)
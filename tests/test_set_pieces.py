@@ -0,0 +1,34 @@
+import pandas as pd
+import pytest
+
+from data.extraccion_datos import set_piece_stats
+
+
+def set_piece_events():
+    """Tres faltas recibidas: una seguida de pase completo, otra de pase fallado y otra de tiro."""
+    rows = [
+        ('Foul Won', 'Regular Play', None, None, None, None, 1),
+        ('Pass', 'From Free Kick', 'Free Kick', None, None, None, 1),
+        ('Foul Won', 'Regular Play', None, None, None, None, 2),
+        ('Pass', 'From Free Kick', 'Free Kick', 'Incomplete', None, None, 2),
+        ('Foul Won', 'Regular Play', None, None, None, None, 3),
+        ('Shot', 'From Free Kick', None, None, 'Goal', None, 3),
+        ('Pass', 'From Corner', 'Corner', None, None, True, 4),
+        ('Shot', 'From Corner', None, None, 'Saved', None, 4),
+    ]
+    events = pd.DataFrame(rows, columns=['type', 'play_pattern', 'pass_type', 'pass_outcome', 'shot_outcome',
+                                         'pass_cross', 'possession'])
+    events['match_id'] = 1
+    events['index'] = range(1, len(events) + 1)
+    return events
+
+
+def test_free_kick_pass_accuracy_counts_only_completed_passes():
+    stats = set_piece_stats(set_piece_events())
+    assert stats['free_kicks'] == 3
+    assert stats['passes_from_free_kicks'] == 2
+    assert stats['successful_passes_free_kicks'] == 1
+    assert stats['free_kick_pass_accuracy'] == pytest.approx(0.5)
+    assert stats['goals_from_free_kicks'] == 1
+    assert stats['corners'] == 1
+    assert stats['shots_after_corners'] == 1
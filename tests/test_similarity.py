@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.similarity import SimilarityIndex
+
+COLUMNS = ['player_season_np_xg_90', 'player_season_xa_90', 'player_season_pressures_90']
+
+
+def season_stats(rows=30):
+    rng = np.random.default_rng(0)
+    stats = pd.DataFrame(rng.normal(size=(rows, len(COLUMNS))), columns=COLUMNS)
+    stats['player_id'] = np.arange(1, rows + 1)
+    stats['player_name'] = [f'J{i}' for i in stats['player_id']]
+    stats['primary_position'] = ['Center Forward' if i % 2 else 'Left Back' for i in stats['player_id']]
+    stats['player_season_minutes'] = 900.0
+    stats.loc[0, 'player_season_minutes'] = 100.0
+    stats.loc[3, 'player_season_xa_90'] = np.nan
+    return stats
+
+
+def test_similar_players_match_brute_force():
+    stats = season_stats()
+    index = SimilarityIndex(stats, min_minutes=300)
+    assert len(index) == len(stats) - 1 and index.position(1) is None
+
+    kept = stats[stats['player_season_minutes'] >= 300]
+    values = kept[COLUMNS].to_numpy()
+    z = np.nan_to_num((values - np.nanmean(values, axis=0)) / np.nanstd(values, axis=0))
+    distances = np.sqrt(((z - z[kept['player_id'].tolist().index(5)]) ** 2).sum(axis=1))
+    order = kept['player_id'].to_numpy()[np.argsort(distances)][1:6]
+
+    similar = index.similar(5, k=5)
+    assert similar['player_id'].tolist() == order.tolist()
+    assert similar['distance'].is_monotonic_increasing
+    assert similar['similarity'].between(0, 100).all()
+    assert index.similar('J5', k=5)['player_id'].tolist() == order.tolist()
+
+
+def test_similar_by_position_and_unknown_player():
+    index = SimilarityIndex(season_stats(), min_minutes=300)
+    similar = index.similar(5, k=50, position='Left Back')
+    assert (similar['position'] == 'Left Back').all() and len(similar) == 15
+    assert index.profile(4)['player_season_xa_90'] == 0
+    with pytest.raises(ValueError):
+        index.similar(1)
@@ -0,0 +1,72 @@
+import pandas as pd
+
+from data import analysis_cache, event_store, extraccion_datos, fingerprints
+from data.extraccion_datos import diff_matches, sync_matches, update_team_match_stats
+
+
+def matches(rows):
+    return pd.DataFrame(rows, columns=['match_id', 'last_updated', 'last_updated_360', 'match_status'])
+
+
+OLD = matches([
+    (1, '2025-01-01', None, 'available'),
+    (2, '2025-01-01', None, 'available'),
+    (3, '2025-01-01', None, 'available'),
+])
+NEW = matches([
+    (1, '2025-01-01', None, 'available'),
+    (2, '2025-02-01', None, 'available'),
+    (4, '2025-02-01', None, 'available'),
+])
+
+
+def test_diff_matches():
+    assert diff_matches(OLD, NEW) == {'new': [4], 'changed': [2], 'removed': [3]}
+    assert diff_matches(OLD, OLD) == {'new': [], 'changed': [], 'removed': []}
+    assert diff_matches(pd.DataFrame(), NEW) == {'new': [1, 2, 4], 'changed': [], 'removed': []}
+
+
+def test_diff_matches_detects_360_data():
+    new = OLD.copy()
+    new.loc[new['match_id'] == 3, 'last_updated_360'] = '2025-03-01'
+    assert diff_matches(OLD, new)['changed'] == [3]
+
+
+def test_sync_matches_updates_only_the_delta(tmp_path, monkeypatch):
+    filepath = tmp_path / 'sb_matches.csv'
+    OLD.to_csv(filepath, index=False)
+    monkeypatch.setattr(event_store, 'CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(analysis_cache, 'ANALYSIS_CACHE_DIR', str(tmp_path / 'analysis'))
+    monkeypatch.setattr(extraccion_datos, 'extract_matches_only', lambda creds: NEW)
+    calls = {}
+    monkeypatch.setattr(extraccion_datos, 'update_team_match_stats',
+                        lambda ids, versions, creds=None, only=None: calls.update(ids=list(ids), only=only))
+    monkeypatch.setattr(fingerprints, 'refresh_fingerprints',
+                        lambda *args, match_ids=None, **kwargs: calls.update(fingerprints=match_ids))
+
+    delta = sync_matches(creds={}, filepath=str(filepath))
+
+    assert delta == {'new': [4], 'changed': [2], 'removed': [3]}
+    assert calls == {'ids': [1, 2, 4], 'only': [4, 2], 'fingerprints': [4, 2]}
+    assert pd.read_csv(filepath)['match_id'].tolist() == [1, 2, 4]
+
+
+def test_update_team_match_stats_only_fetches_requested(tmp_path, monkeypatch):
+    path = str(tmp_path / 'team_match_stats.parquet')
+    fetched = []
+
+    def fake_stats(match_id, creds=None, version=None):
+        fetched.append(match_id)
+        return pd.DataFrame({'match_id': [match_id, match_id], 'team_id': [10, 20], 'team_match_goals': [1, 0]})
+
+    monkeypatch.setattr(extraccion_datos, 'get_team_match_stats', fake_stats)
+    versions = {1: 'a', 2: 'a', 3: 'a'}
+
+    table = update_team_match_stats([1, 2, 3], versions, creds={}, path=path, only=[2])
+    assert fetched == [2]
+    assert table['match_id'].unique().tolist() == [2]
+
+    # El resto de pendientes se completa en la carga completa; los eliminados se quitan
+    table = update_team_match_stats([1, 2], versions, creds={}, path=path)
+    assert sorted(fetched) == [1, 2]
+    assert table['match_id'].unique().tolist() == [1, 2]
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from data.metrics import TRANSITION_THIRDS
+from data.zones import GRIDS, assign_zones, zone_labels, zone_table
+
+
+def test_thirds_keep_the_report_boundaries():
+    x = [0, 32.9, 33, 50, 66, 66.1, 120]
+    zones = assign_zones(x, [40] * len(x), 'thirds')
+    # x < 33 defensivo, 33 <= x <= 66 medio, x > 66 ofensivo
+    assert zones.tolist() == [0, 0, 1, 1, 1, 2, 2]
+
+
+def test_transition_thirds_use_the_shared_grid():
+    assert TRANSITION_THIRDS is GRIDS['thirds']
+
+
+def test_cut_points_open_the_next_zone_by_default():
+    zones = assign_zones([19.9, 20, 40], [0, 0, 0], {'x': [20, 40], 'y': []})
+    assert zones.tolist() == [0, 1, 2]
+
+
+def test_closed_cut_points_close_the_previous_zone():
+    grid = {'x': [], 'y': [30, 50], 'y_closed': [50]}
+    zones = assign_zones([60, 60, 60, 60], [29, 30, 50, 51], grid)
+    assert zones.tolist() == [0, 1, 1, 2]
+
+
+def test_rectangular_ids_run_along_then_across():
+    grid = GRIDS['zones18']
+    assert len(zone_labels(grid)) == 18
+    zones = assign_zones([0, 0, 119], [0, 79, 79], grid)
+    assert zones.tolist() == [0, 2, 17]
+
+
+def test_missing_coordinates_have_no_zone():
+    zones = assign_zones([np.nan, 50], [40, np.nan], 'thirds')
+    assert zones.tolist() == [-1, -1]
+
+
+def test_polygons_first_match_wins():
+    grid = {'polygons': {'box': [(102, 18), (120, 18), (120, 62), (102, 62)],
+                         'half': [(60, 0), (120, 0), (120, 80), (60, 80)]}}
+    zones = assign_zones([110, 80, 10], [40, 40, 40], grid)
+    assert zones.tolist() == [0, 1, -1]
+
+
+def test_zone_table_counts_by_team():
+    events = pd.DataFrame({
+        'team_id': [1, 1, 1, 2],
+        'type': ['Pass', 'Pass', 'Shot', 'Pass'],
+        'location_x': [10, 66, 100, 50],
+        'location_y': [40, 40, 40, 40],
+    })
+    table = zone_table(events, 'thirds', types=['Pass'])
+    assert table.loc[1].tolist() == [1, 1, 0]
+    assert table.loc[2].tolist() == [0, 1, 0]